@@ -1,43 +1,23 @@
-import pymysql
-import pandas as pd
-from sqlalchemy import create_engine
-import json
+import numpy as np
 
-def get_monthly_data():
-    # MySQL 연결 정보
-    host = "shcrm.ddns.net"
-    port = 5001
-    database = "shcrm"
-    user = "root"
-    password = "9868"
-
-    # SQLAlchemy 연결 URL
-    engine = create_engine(f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}")
-
-    # SQL 쿼리로 사용금액 데이터 가져오기 (전체 데이터를 가져옴)
-    query = """
-        SELECT date, category, amount, payment_method
-        FROM 사용금액
-        ORDER BY date
-    """
-    df = pd.read_sql(query, engine)
+import usage_queries
 
-    # 날짜 컬럼을 datetime 형식으로 변환
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-
-    # 월별로 그룹화하여 카테고리별 금액 총합과 결제 방법별 금액 총합 계산
-    df['month'] = df['date'].dt.to_period('M')  # 월별로 그룹화
-
-    # 카테고리별 월간 총합 계산
-    df_category = df.groupby(['month', 'category'])['amount'].sum().reset_index()
-    df_category_pivot = df_category.pivot_table(index='month', columns='category', values='amount', aggfunc='sum').fillna(0)
+def get_monthly_data():
+    # 카테고리별/결제 방법별 월간 총합은 SQL GROUP BY로 계산해서 행렬로 받음
+    months, categories, category_matrix = usage_queries.monthly_matrix('category')
+    payment_months, payment_methods, payment_matrix = usage_queries.monthly_matrix('payment_method')
 
-    # 결제 방법별 월간 총합 계산
-    df_payment = df.groupby(['month', 'payment_method'])['amount'].sum().reset_index()
-    df_payment_pivot = df_payment.pivot_table(index='month', columns='payment_method', values='amount', aggfunc='sum').fillna(0)
+    # 결제 방법 행렬을 카테고리 기준 월 순서에 맞춤 (없는 월은 0)
+    payment_row = {month: i for i, month in enumerate(payment_months)}
+    aligned_payment = np.zeros((len(months), len(payment_methods)))
+    for i, month in enumerate(months):
+        if month in payment_row:
+            aligned_payment[i] = payment_matrix[payment_row[month]]
 
     # 월별 전체 총합 계산
-    df_category_pivot['total'] = df_category_pivot.sum(axis=1)
+    totals = category_matrix.sum(axis=1)
+    category_values = category_matrix.astype(int).tolist()
+    payment_values = aligned_payment.astype(int).tolist()
 
     # 결과를 JSON 형식으로 변환
     result_data = {
@@ -45,12 +25,12 @@ def get_monthly_data():
     }
 
     # 월별로 데이터 추가
-    for index in df_category_pivot.index:
+    for i, month in enumerate(months):
         monthly_data = {
-            "month": str(index),
-            "categories": df_category_pivot.loc[index].drop('total').astype(int).to_dict(),  # 카테고리별 금액 합계
-            "payment_method": df_payment_pivot.loc[index].astype(int).to_dict(),  # 결제 방법별 금액 합계
-            "total": int(df_category_pivot.loc[index]['total'])  # 월간 전체 합계
+            "month": month,
+            "categories": dict(zip(categories, category_values[i])),  # 카테고리별 금액 합계
+            "payment_method": dict(zip(payment_methods, payment_values[i])),  # 결제 방법별 금액 합계
+            "total": int(totals[i])  # 월간 전체 합계
         }
         result_data["monthly_totals"].append(monthly_data)
 
@@ -0,0 +1,63 @@
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# 영수증 원본 보관 설정 (환경 변수로 조정)
+RECEIPT_STORAGE_DIR = os.environ.get("RECEIPT_STORAGE_DIR", "receipts")
+RECEIPT_FILE_BASE_URL = os.environ.get("RECEIPT_FILE_BASE_URL", "http://shcrm.ddns.net:8080/file/")
+
+
+class ImageArchiver:
+    """업로드 원본 바이트를 백그라운드 스레드에서 저장 (재인코딩 없음)"""
+
+    def __init__(self, storage_dir=RECEIPT_STORAGE_DIR, base_url=RECEIPT_FILE_BASE_URL):
+        self.storage_dir = storage_dir
+        self.base_url = base_url
+        # 디스크 쓰기는 전용 스레드 하나가 순서대로 처리
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archive")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.written = 0
+        self.failed = 0
+
+    def archive(self, data, original_filename):
+        """저장을 예약하고 바로 파일 URL 반환"""
+        _, file_extension = os.path.splitext(original_filename or "")
+        filename = str(uuid.uuid4()) + file_extension.lower()
+        with self._lock:
+            self.pending += 1
+        self._executor.submit(self._write, filename, data)
+        return self.base_url + filename
+
+    def _write(self, filename, data):
+        try:
+            os.makedirs(self.storage_dir, exist_ok=True)
+            path = os.path.join(self.storage_dir, filename)
+            # 임시 파일에 다 쓴 뒤 rename해서 반쯤 쓰인 파일이 보이지 않도록 함
+            with open(path + ".part", "wb") as f:
+                f.write(data)
+            os.replace(path + ".part", path)
+            with self._lock:
+                self.written += 1
+        except Exception as e:
+            logging.error(f"영수증 원본 저장 중 오류 발생 ({filename}): {e}")
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def close(self):
+        # 남은 저장 작업을 마친 뒤 종료
+        self._executor.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "storage_dir": self.storage_dir,
+                "pending": self.pending,
+                "written": self.written,
+                "failed": self.failed,
+            }
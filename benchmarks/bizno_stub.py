@@ -0,0 +1,121 @@
+"""bizno.net 업종 페이지를 흉내 내는 로컬 스텁 서버 (오프라인 부하 테스트용)
+
+사용법:
+    python benchmarks/bizno_stub.py [--port 8900] [--latency-ms 80] [--jitter-ms 40]
+    BIZNO_BACKEND=http BIZNO_BASE_URL=http://127.0.0.1:8900/article/ uvicorn main:app
+
+/article/<사업자번호>에 bizno_lookup의 XPath와 같은 구조의 HTML을 돌려준다.
+업종은 category_mapping.json의 업종명 중 사업자번호로 정해지는 하나라서 매번 같은 결과가 나오고,
+끝자리가 0인 번호는 404(정보 없음)를 돌려준다. 응답마다 latency-ms ± jitter-ms 만큼 지연한다.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MAPPING_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "category_mapping.json")
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{name}</title></head>
+<body>
+<section><div>header</div></section>
+<section><div><div>
+  <div><div><div>
+    <div><div><a href="#"><h1>{name}</h1></a></div></div>
+    <table>
+      <tr><th>사업자등록번호</th><td>{number}</td></tr>
+      <tr><th>업종</th><td>대분류 : {levels[0]}<br>중분류 : {levels[1]}<br>소분류 : {levels[2]}<br>세분류 : {levels[3]}<br>세세분류 : {levels[4]}</td></tr>
+    </table>
+  </div></div></div>
+</div></div></section>
+</body></html>
+"""
+
+
+def load_keywords(path=MAPPING_PATH):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return [keyword for category in config["categories"] for keyword in category["keywords"]]
+
+
+def render_page(number, keywords):
+    """사업자번호로 정해지는 상호명/업종 페이지 (끝자리 0이면 None)"""
+    if number.endswith("0"):
+        return None
+    digest = int(hashlib.sha256(number.encode()).hexdigest(), 16)
+    detail = keywords[digest % len(keywords)]
+    levels = ["도매 및 소매업", f"{detail} 관련업", f"{detail} 소매업", detail, detail]
+    return PAGE_TEMPLATE.format(name=f"테스트상점{digest % 1000}", number=number, levels=levels)
+
+
+class StubServer:
+    """별도 스레드에서 도는 스텁 서버 (load_test.py에서 직접 띄울 때 사용)"""
+
+    def __init__(self, port=0, latency_ms=80.0, jitter_ms=40.0, host="127.0.0.1"):
+        keywords = load_keywords()
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.requests += 1
+                match = re.fullmatch(r"/article/(\d{10})", self.path)
+                page = render_page(match.group(1), keywords) if match else None
+                delay = max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+                time.sleep(delay)
+                body = (page or "<html><body>not found</body></html>").encode("utf-8")
+                self.send_response(200 if page else 404)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/article/"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="bizno-stub", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    stub = StubServer(args.port, args.latency_ms, args.jitter_ms, args.host)
+    print(f"bizno 스텁 서버: {stub.base_url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""업종명 -> 카테고리 분류 속도 비교 (이전 선형 탐색 vs CategoryClassifier)
+
+사용법:
+    python benchmarks/category_bench.py [--ksic KSIC_목록.csv] [--repeat 20] [--output 결과.json]
+
+--ksic에는 한국표준산업분류 목록을 준다. CSV면 행의 마지막 열, 텍스트 파일이면 한 줄을 업종명으로 쓴다.
+주지 않으면 category_mapping.json의 업종명으로만 측정한다.
+각 업종명은 원문, 공백을 뺀 표기, 한 글자가 틀린 표기(OCR/사이트 표기 차이)로 세 번씩 조회한다.
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from category_classifier import CategoryClassifier, CATEGORY_MAPPING_PATH
+
+
+def load_ksic_names(path):
+    with open(path, encoding="utf-8-sig") as f:
+        if path.lower().endswith(".csv"):
+            names = [row[-1].strip() for row in csv.reader(f) if row]
+        else:
+            names = [line.strip() for line in f]
+    return [name for name in names if name and not name.isdigit()]
+
+
+def legacy_classifier(config):
+    """이전 main.get_category_from_detailed_category 동작 (호출마다 id dict 생성 + 선형 탐색)"""
+    mapping = {category["categoryName"]: category["keywords"] for category in config["categories"]}
+
+    def classify(detailed_category):
+        category_mapping = {category["categoryName"]: category["categoryId"] for category in config["categories"]}
+        for category, keywords in mapping.items():
+            if detailed_category in keywords:
+                return {"categoryId": category_mapping.get(category), "categoryName": category}
+        return {"categoryId": None, "categoryName": "기타"}
+
+    return classify
+
+
+def variants(name):
+    """원문, 공백 제거, 가운데 글자 하나를 바꾼 표기"""
+    middle = len(name) // 2
+    typo = name[:middle] + ("가" if name[middle] != "가" else "나") + name[middle + 1:]
+    return [name, name.replace(" ", ""), typo]
+
+
+def time_lookups(classify, queries, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for query in queries:
+            classify(query)
+        samples.append((time.perf_counter() - started) / len(queries) * 1e6)
+    return round(statistics.median(samples), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ksic")
+    parser.add_argument("--mapping", default=CATEGORY_MAPPING_PATH)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    with open(args.mapping, encoding="utf-8") as f:
+        config = json.load(f)
+    names = load_ksic_names(args.ksic) if args.ksic else [
+        keyword for category in config["categories"] for keyword in category["keywords"]
+    ]
+    queries = [variant for name in names for variant in variants(name)]
+
+    legacy = legacy_classifier(config)
+    classifier = CategoryClassifier(args.mapping, reload_interval=float("inf"))
+
+    report = {"names": len(names), "queries": len(queries)}
+    report["legacy_us_per_lookup"] = time_lookups(legacy, queries, args.repeat)
+    # 첫 번째 반복은 유사 매칭 캐시가 비어 있는 상태
+    report["classifier_cold_us_per_lookup"] = time_lookups(
+        lambda query: classifier.classify({"세세분류": query}), queries, 1
+    )
+    report["classifier_us_per_lookup"] = time_lookups(
+        lambda query: classifier.classify({"세세분류": query}), queries, args.repeat
+    )
+
+    # 매칭 방식별 횟수는 조회 목록 한 번 분만 집계
+    classifier.counters.update(exact=0, normalized=0, fuzzy=0, default=0)
+    legacy_matched = sum(legacy(query)["categoryId"] is not None for query in queries)
+    classifier_matched = sum(classifier.classify({"세세분류": query})["categoryId"] is not None for query in queries)
+    report["legacy_matched"] = legacy_matched
+    report["classifier_matched"] = classifier_matched
+    report["match_types"] = {key: classifier.counters[key] for key in ("exact", "normalized", "fuzzy", "default")}
+
+    for key, value in report.items():
+        print(f"{key:32s} {value}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
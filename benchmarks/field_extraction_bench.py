@@ -0,0 +1,139 @@
+"""OCR 결과 필드 추출 속도/정확도 측정 (라벨 붙은 회귀 코퍼스 사용)
+
+사용법:
+    python benchmarks/field_extraction_bench.py [--corpus benchmarks/field_corpus.json] [--repeat 2000]
+                                                [--output 결과.json] [--min-accuracy 1.0]
+
+이전 방식(필드마다 정규식을 다시 컴파일하고 전체 줄을 따로 훑고 가장 큰 숫자를 금액으로 사용)과
+field_extraction.extract_fields를 같은 입력으로 비교한다.
+--min-accuracy를 주면 새 방식 정확도가 그 값보다 낮을 때 종료 코드 1로 끝난다.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from field_extraction import extract_fields
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "field_corpus.json")
+FIELDS = ("사업자번호", "가맹점명", "거래일시", "금액")
+
+
+def legacy_extract(results):
+    """이전 ImageProcessor.build_info_dict 동작 (비교 기준)"""
+    text_list = [detection[1] for detection in results]
+
+    business_number_pattern = re.compile(r'\b\d{3}-?\d{2}-?\d{5}\b')
+    business_numbers = [match for text in text_list for match in business_number_pattern.findall(text)]
+
+    store_name_pattern = re.compile(r'(매장명|상호명|회사명|업체명|가맣점명|[상싱성][호오]|[회훼]사)\s*[:;：]?\s*([^\s)]+(?:\s*\S*)*?[점]\s*?\S*)')
+    store_names = [match[1] for text in text_list for match in store_name_pattern.findall(text)]
+
+    def is_valid_date(date_str):
+        parts = re.split(r'[-/.]', date_str)
+        if len(parts) == 3:
+            if len(parts[0]) == 4 and len(parts[1]) == 2 and len(parts[2]) == 2:
+                year, month, day = map(int, parts)
+                return 2000 <= year <= 2100 and 1 <= month <= 12 and 1 <= day <= 31
+            elif len(parts[0]) == 2 and len(parts[1]) == 2 and len(parts[2]) == 4:
+                day, month, year = map(int, parts)
+                return 2000 <= year <= 2100 and 1 <= month <= 12 and 1 <= day <= 31
+            elif len(parts[0]) == 2 and len(parts[1]) == 2 and len(parts[2]) == 2:
+                month, day, year = map(int, parts)
+                year += 2000 if year < 100 else 0
+                return 2000 <= year <= 2100 and 1 <= month <= 12 and 1 <= day <= 31
+        return False
+
+    date_pattern = re.compile(r'([거기][래레][일닐]|[결겔]제[일닐]|거[래레]일시|[결겔]제날짜|날짜|일자)?\s*[:;：]?\s*' r'(\d{4}[-/.]\d{2}[-/.]\d{2}|\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}[-/.]\d{2}[-/.]\d{2})')
+    dates = [match[1] for text in text_list for match in date_pattern.findall(text) if is_valid_date(match[1])]
+
+    all_numbers = []
+    for text in text_list:
+        all_numbers.extend(int(num.replace(',', '')) for num in re.findall(r'\d{1,3}(?:,\d{3})*', text))
+
+    return {
+        "사업자번호": business_numbers,
+        "가맹점명": store_names,
+        "거래일시": dates,
+        "금액": max(all_numbers) if all_numbers else None,
+    }
+
+
+def to_readtext(lines):
+    """코퍼스의 [x0, y0, x1, y1] 상자를 readtext 결과 형식(네 꼭짓점, 텍스트, 신뢰도)으로 변환"""
+    return [([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], text, 1.0) for (x0, y0, x1, y1), text in lines]
+
+
+def score(extract, cases):
+    """필드별 정답률과 틀린 사례"""
+    correct = {field: 0 for field in FIELDS}
+    total = {field: 0 for field in FIELDS}
+    failures = []
+    for case in cases:
+        info_dict = extract(case["results"])
+        for field, expected in case["expected"].items():
+            total[field] += 1
+            if info_dict[field] == expected:
+                correct[field] += 1
+            else:
+                failures.append({"case": case["name"], "field": field, "expected": expected, "got": info_dict[field]})
+    accuracy = {field: round(correct[field] / total[field], 3) for field in FIELDS if total[field]}
+    overall = sum(correct.values()) / sum(total.values()) if sum(total.values()) else None
+    return accuracy, overall, failures
+
+
+def time_per_receipt(extract, cases, repeat):
+    """영수증 한 장당 추출 시간(us) 중앙값"""
+    samples = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for case in cases:
+                extract(case["results"])
+        samples.append((time.perf_counter() - started) / (repeat * len(cases)) * 1e6)
+    return round(statistics.median(samples), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--output")
+    parser.add_argument("--min-accuracy", type=float)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+    for case in cases:
+        case["results"] = to_readtext(case["lines"])
+
+    report = {}
+    for name, extract in (("legacy", legacy_extract), ("engine", extract_fields)):
+        accuracy, overall, failures = score(extract, cases)
+        report[name] = {
+            "us_per_receipt": time_per_receipt(extract, cases, args.repeat),
+            "accuracy": accuracy,
+            "overall_accuracy": round(overall, 3) if overall is not None else None,
+            "failures": failures,
+        }
+        print(f"{name:8s} {report[name]['us_per_receipt']:9.2f}us/영수증  정확도 {report[name]['overall_accuracy']}  "
+              f"{report[name]['accuracy']}")
+
+    for failure in report["engine"]["failures"]:
+        print(f"  실패: {failure['case']} {failure['field']} 기대={failure['expected']} 결과={failure['got']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.min_accuracy is not None and (report["engine"]["overall_accuracy"] or 0) < args.min_accuracy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
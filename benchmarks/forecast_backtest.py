@@ -0,0 +1,126 @@
+"""예측 엔진별 백테스트 (정확도와 학습/예측 지연 시간 비교)
+
+사용법:
+    python benchmarks/forecast_backtest.py [--source synthetic|db|CSV경로] [--engines ridge,smoothing,lstm]
+                                           [--holdout 6] [--output 결과.json]
+
+매 검증 월마다 그 이전 데이터로만 스케일러와 엔진을 학습하고 다음 달을 예측한다 (rolling origin).
+CSV는 month,category,amount 열을 가진 파일. synthetic은 계절성/추세/잡음을 넣은 가짜 월별 데이터.
+seasonal_naive(작년 같은 달 값)는 기준선으로 항상 함께 측정한다.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import forecasting
+
+
+class SeasonalNaive(forecasting.Forecaster):
+    """작년 같은 달 값을 그대로 예측 (기준선)"""
+
+    name = "seasonal_naive"
+
+    def fit(self, scaled):
+        return self
+
+    def predict(self, windows, verbose=0):
+        return np.asarray(windows)[:, 0]
+
+
+def synthetic_pivot(months=36, categories=5, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.period_range("2023-11", periods=months, freq="M").astype(str)
+    t = np.arange(months)[:, None]
+    base = rng.uniform(200_000, 2_000_000, categories)
+    season = 1 + rng.uniform(0.1, 0.4, categories) * np.sin(2 * np.pi * (t + rng.integers(0, 12, categories)) / 12)
+    trend = 1 + rng.uniform(-0.005, 0.02, categories) * t
+    noise = rng.normal(1, 0.08, (months, categories))
+    values = np.clip(base * season * trend * noise, 0, None)
+    return pd.DataFrame(values, index=pd.Index(index, name="Month"),
+                        columns=pd.Index([f"계정{i + 1}" for i in range(categories)], name="category"))
+
+
+def load_pivot(source):
+    if source == "synthetic":
+        return synthetic_pivot()
+    if source == "db":
+        import predict
+
+        _, _, df_pivot = predict.load_training_data()
+        return df_pivot
+    df = pd.read_csv(source)
+    return df.pivot_table(index="month", columns="category", values="amount", aggfunc="sum", fill_value=0)
+
+
+def backtest(engine, df_pivot, holdout, look_back):
+    values = df_pivot.to_numpy(dtype=float)
+    predictions, actuals, fit_ms, predict_ms = [], [], [], []
+    for t in range(len(values) - holdout, len(values)):
+        # 검증 월 이전 데이터로만 스케일러/엔진 학습
+        scaler = MinMaxScaler(feature_range=(0, 1)).fit(values[:t])
+        scaled = scaler.transform(values[:t])
+        forecaster = SeasonalNaive(look_back) if engine == SeasonalNaive.name else forecasting.create_forecaster(engine, look_back=look_back)
+
+        started = time.perf_counter()
+        forecaster.fit(scaled)
+        fit_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        predicted = forecaster.predict(scaled[-look_back:][None], verbose=0)
+        predict_ms.append((time.perf_counter() - started) * 1000)
+
+        predictions.append(scaler.inverse_transform(predicted)[0])
+        actuals.append(values[t])
+
+    errors = np.array(predictions) - np.array(actuals)
+    return {
+        "mae": round(float(np.abs(errors).mean()), 1),
+        "rmse": round(float(np.sqrt((errors ** 2).mean())), 1),
+        "wape": round(float(np.abs(errors).sum() / max(np.abs(actuals).sum(), 1e-9)), 4),
+        "fit_ms_median": round(statistics.median(fit_ms), 2),
+        "predict_ms_median": round(statistics.median(predict_ms), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", default="synthetic")
+    default_engines = ["ridge", "smoothing"] + (["lstm"] if importlib.util.find_spec("tensorflow") else [])
+    parser.add_argument("--engines", default=",".join(default_engines))
+    parser.add_argument("--holdout", type=int, default=6)
+    parser.add_argument("--look-back", type=int, default=forecasting.FORECAST_LOOK_BACK)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    df_pivot = load_pivot(args.source)
+    if len(df_pivot) - args.holdout <= args.look_back:
+        sys.exit(f"데이터가 부족합니다: {len(df_pivot)}개월 (look_back {args.look_back} + holdout {args.holdout} 초과 필요)")
+
+    report = {"months": len(df_pivot), "categories": df_pivot.shape[1], "holdout": args.holdout, "engines": {}}
+    for engine in [SeasonalNaive.name] + args.engines.split(","):
+        started = time.perf_counter()
+        result = backtest(engine, df_pivot, args.holdout, args.look_back)
+        # lstm은 첫 학습에 TensorFlow import 시간이 포함됨
+        result["total_seconds"] = round(time.perf_counter() - started, 3)
+        report["engines"][engine] = result
+        print(f"{engine:15s} MAE {result['mae']:>14,.1f}  WAPE {result['wape']:.4f}  "
+              f"학습 {result['fit_ms_median']:9.2f}ms  예측 {result['predict_ms_median']:8.3f}ms  "
+              f"전체 {result['total_seconds']:.2f}s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
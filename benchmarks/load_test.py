@@ -0,0 +1,528 @@
+"""/extract, /predict, /monthly_totals 부하 테스트 (동시 요청 수를 늘려가며 처리량과 지연 시간 측정)
+
+사용법:
+    # 1) 데이터 준비 (한 번만)
+    python benchmarks/seed_usage_db.py /tmp/usage_1m.db --rows 1m
+    python benchmarks/synthetic_receipts.py /tmp/receipts --count 5
+
+    # 2) 서버를 직접 띄워서 측정 (bizno 스텁도 함께 띄움, 네트워크 불필요)
+    python benchmarks/load_test.py --spawn --db /tmp/usage_1m.db --receipts /tmp/receipts
+                                   [--endpoints extract,predict,monthly_totals] [--concurrency 1,2,4,8,16]
+                                   [--requests 40] [--output 결과.json] [--compare 이전결과.json]
+
+    # 또는 이미 떠 있는 서버에 요청만 보냄
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --receipts /tmp/receipts
+
+    # serve.py 멀티 워커 모드를 워커 수별로 띄워서 처리량과 워커별 메모리 비교
+    python benchmarks/load_test.py --spawn --workers 1,2,4 --db /tmp/usage_1m.db --endpoints predict,monthly_totals
+
+결과 JSON에는 커밋 해시, 머신 정보, 동시 요청 수별 처리량/p50/p95/p99, 서버 메모리(RSS, 최고치),
+/metrics에서 읽은 단계별 평균 시간이 들어간다. --output을 주지 않으면 임시 디렉터리의 shcrm-load-<커밋>.json에 저장(경로는 실행 끝에 출력).
+--compare로 이전 결과를 주면 처리량/p95 변화를 출력하고, --max-regression을 넘으면 종료 코드 1로 끝난다.
+
+--spawn은 CPU 전용(OCR_GPU=0)으로 uvicorn 프로세스 하나를 띄운다. --workers를 주면 대신 워커 수마다
+serve.py를 띄우고, 결과 키를 "엔드포인트@N워커"로 저장한다. 워커별 메모리는 RSS와 함께 PSS(공유 페이지를
+공유하는 프로세스 수로 나눈 값)도 기록하므로, fork 전에 로드한 모델이 실제로 공유되는지 PSS 합계로 확인할 수 있다. /extract를 측정하려면
+easyocr 모델 파일이 미리 내려받아져 있어야 한다(~/.EasyOCR). 결과 캐시는 기본으로 끄고(--result-cache로 사용)
+bizno 캐시는 실행마다 새 파일로 시작한다. /predict는 기본으로 ridge 엔진을 쓰며, 모델이 없으면
+서버의 재학습 스케줄러가 학습을 끝낼 때까지 기다린다(--workers면 시작 전에 한 번 학습해 두고 함께 쓴다).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import re
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bizno_stub import StubServer
+
+IMAGE_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+# 엔드포인트별로 /readyz에서 준비되어야 하는 구성 요소
+REQUIRED_COMPONENTS = {"extract": ["ocr", "lookup"], "predict": ["model"], "monthly_totals": ["database"]}
+# 멀티 워커면 worker 라벨이 붙으므로 워커별 값을 합침
+STAGE_PATTERN = re.compile(r'^shcrm_stage_seconds_(sum|count)\{stage="(\w+)"(?:,[^}]*)?\} (\S+)$', re.MULTILINE)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit or None, dirty
+    except OSError:
+        return None, None
+
+
+def process_memory_mb(pid):
+    """리눅스 /proc에서 현재 RSS, 최고 RSS(VmHWM), PSS 읽기 (다른 OS면 None)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            status = dict(line.split(":", 1) for line in f if ":" in line)
+        memory = {key: round(int(status[name].split()[0]) / 1024, 1) for key, name in (("rss_mb", "VmRSS"), ("hwm_mb", "VmHWM"))}
+    except (OSError, KeyError, ValueError):
+        return {"rss_mb": None, "hwm_mb": None, "pss_mb": None}
+    memory["pss_mb"] = None
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    memory["pss_mb"] = round(int(line.split()[1]) / 1024, 1)
+                    break
+    except OSError:
+        pass
+    return memory
+
+
+def child_pids(pid):
+    """부모가 pid인 프로세스 목록 (리눅스 /proc)"""
+    children = []
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                # comm에 공백/괄호가 들어갈 수 있으므로 마지막 ')' 뒤에서 ppid를 읽음
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(name))
+    return sorted(children)
+
+
+def process_tree_memory_mb(pid):
+    """serve.py 부모와 워커들의 메모리 (합계와 워커별)"""
+    workers = [{"pid": child, **process_memory_mb(child)} for child in child_pids(pid)]
+    master = process_memory_mb(pid)
+    processes = [master] + workers
+
+    def total(key):
+        values = [p[key] for p in processes if p[key] is not None]
+        return round(sum(values), 1) if values else None
+
+    rss = [w["rss_mb"] for w in workers if w["rss_mb"] is not None]
+    return {
+        "rss_mb": total("rss_mb"),
+        "hwm_mb": total("hwm_mb"),
+        "pss_mb": total("pss_mb"),
+        "master_rss_mb": master["rss_mb"],
+        "worker_rss_mb": round(sum(rss) / len(rss), 1) if rss else None,
+        "workers": workers,
+    }
+
+
+def load_receipts(directory):
+    receipts = []
+    for filename in sorted(os.listdir(directory)):
+        content_type = IMAGE_TYPES.get(os.path.splitext(filename)[1].lower())
+        if content_type:
+            with open(os.path.join(directory, filename), "rb") as f:
+                receipts.append((filename, f.read(), content_type))
+    if not receipts:
+        raise SystemExit(f"영수증 이미지가 없습니다: {directory}")
+    return receipts
+
+
+def percentile_ms(latencies, q):
+    return round(float(np.percentile(latencies, q)) * 1000, 2) if latencies else None
+
+
+class ServerProcess:
+    """측정 대상 uvicorn 프로세스와 bizno 스텁"""
+
+    def __init__(self, db_path, workdir, engine, result_cache, stub_latency_ms, required, workers=None, model_dir=None):
+        self.stub = StubServer(latency_ms=stub_latency_ms, jitter_ms=stub_latency_ms / 2).start()
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.workers = workers
+        env = {
+            **os.environ,
+            "DB_URL": f"sqlite:///{os.path.abspath(db_path)}",
+            "USAGE_TENANT_COLUMN": "department",
+            "BIZNO_BACKEND": "http",
+            "BIZNO_BASE_URL": self.stub.base_url,
+            "BIZNO_CACHE_PATH": os.path.join(workdir, "bizno_cache.sqlite3"),
+            "RECEIPT_STORAGE_DIR": os.path.join(workdir, "receipts"),
+            "MODEL_ARTIFACT_DIR": model_dir or os.path.join(workdir, "models"),
+            "FORECAST_ENGINE": engine,
+            "OCR_GPU": "0",
+            "READY_REQUIRED_COMPONENTS": ",".join(required),
+            "LOG_LEVEL": "WARNING",
+        }
+        if not result_cache:
+            env["RESULT_CACHE_MAX_ENTRIES"] = "0"
+        if workers is None:
+            command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(self.port), "--log-level", "warning"]
+        else:
+            # serve.py: 부모에서 미리 로드하고 워커 수만큼 fork, 캐시/작업 상태는 SHARED_STATE_DIR로 공유
+            command = [sys.executable, "serve.py"]
+            env.update({
+                "SERVE_WORKERS": str(workers),
+                "SERVE_HOST": "127.0.0.1",
+                "SERVE_PORT": str(self.port),
+                "SHARED_STATE_DIR": os.path.join(workdir, "shared"),
+            })
+        self.log = open(os.path.join(workdir, "server.log"), "w")
+        self.started = time.perf_counter()
+        self.process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+
+    def memory(self):
+        if self.workers is None:
+            return process_memory_mb(self.process.pid)
+        return process_tree_memory_mb(self.process.pid)
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+        self.stub.stop()
+
+
+async def wait_ready(client, url, required, timeout, process=None, workers=1):
+    """/readyz에서 필요한 구성 요소가 모두 준비될 때까지 대기 (준비 실패한 구성 요소 목록 반환)
+
+    멀티 워커면 서로 다른 워커(pid) workers개가 준비되었다고 응답할 때까지 기다림
+    """
+    deadline = time.monotonic() + timeout
+    report = None
+    ready_workers = set()
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit("서버 프로세스가 종료되었습니다. 서버 로그를 확인하세요.")
+        try:
+            # 연결을 재사용하면 같은 워커만 응답하므로 매번 새 연결
+            report = (await client.get(f"{url}/readyz", headers={"Connection": "close"})).json()
+            components = report.get("components", {})
+            pending = [name for name in required if components.get(name, {}).get("state") != "ready"]
+            # 모델은 학습이 끝나면 준비되므로 failed여도 계속 기다림
+            failed = [name for name in pending if components.get(name, {}).get("state") == "failed" and name != "model"]
+            if all(name in failed for name in pending):
+                ready_workers.add(report.get("pid"))
+                if len(ready_workers) >= workers:
+                    return failed, report
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.1 if ready_workers else 0.5)
+    return [name for name in required], report
+
+
+async def stage_averages(client, url):
+    """/metrics의 단계별 (호출 수, 평균 ms)"""
+    try:
+        text = (await client.get(f"{url}/metrics")).text
+    except httpx.HTTPError:
+        return {}
+    values = {}
+    for kind, stage, value in STAGE_PATTERN.findall(text):
+        totals = values.setdefault(stage, {})
+        totals[kind] = totals.get(kind, 0.0) + float(value)
+    return {
+        stage: {"count": int(v.get("count", 0)), "avg_ms": round(v["sum"] / v["count"] * 1000, 3) if v.get("count") else None}
+        for stage, v in values.items()
+    }
+
+
+def request_factory(endpoint, receipts):
+    counter = itertools.count()
+
+    async def send(client, url):
+        if endpoint == "extract":
+            filename, data, content_type = receipts[next(counter) % len(receipts)]
+            return await client.post(f"{url}/extract", files={"file": (filename, data, content_type)})
+        if endpoint == "predict":
+            return await client.post(f"{url}/predict")
+        return await client.post(f"{url}/monthly_totals")
+
+    return send
+
+
+async def run_level(client, url, send, concurrency, total, warmup):
+    """동시 요청 concurrency개로 total건을 보내고 지연 시간 통계 반환 (처음 warmup건은 제외)"""
+    for _ in range(warmup):
+        await send(client, url)
+
+    latencies, errors, statuses = [], 0, {}
+    queue = asyncio.Queue()
+    for index in range(total):
+        queue.put_nowait(index)
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await send(client, url)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latency = time.perf_counter() - started
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if status == 200:
+                latencies.append(latency)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": percentile_ms(latencies, 50),
+        "p95_ms": percentile_ms(latencies, 95),
+        "p99_ms": percentile_ms(latencies, 99),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def compare(previous, current, max_regression):
+    """엔드포인트/동시 요청 수별 처리량과 p95 변화 출력 (허용치를 넘은 항목 수 반환)"""
+    print(f"\n비교 기준: {previous['meta'].get('commit')} -> {current['meta'].get('commit')}")
+    regressions = 0
+    for endpoint, levels in current["results"].items():
+        old_levels = previous.get("results", {}).get(endpoint)
+        # 건너뛴 엔드포인트는 {"skipped": [...]}로 저장됨
+        if not isinstance(levels, list) or not isinstance(old_levels, list):
+            continue
+        before = {level["concurrency"]: level for level in old_levels}
+        for level in levels:
+            old = before.get(level["concurrency"])
+            if not old or not old.get("p95_ms") or not level.get("p95_ms"):
+                continue
+            p95_change = level["p95_ms"] / old["p95_ms"] - 1
+            rps_change = level["throughput_rps"] / old["throughput_rps"] - 1 if old.get("throughput_rps") else 0
+            flag = ""
+            if max_regression is not None and (p95_change > max_regression or rps_change < -max_regression):
+                regressions += 1
+                flag = "  <- 회귀"
+            print(f"{endpoint:15s} c={level['concurrency']:<3d} 처리량 {rps_change:+7.1%}  p95 {p95_change:+7.1%}{flag}")
+    return regressions
+
+
+async def measure(args, client, url, server, endpoints, levels, receipts, required, suffix=""):
+    """서버 하나를 준비될 때까지 기다린 뒤 엔드포인트/동시 요청 수별로 측정 ({결과 키: 단계별 결과}, 서버 정보)"""
+    info = {}
+    results = {}
+    failed, readiness = await wait_ready(client, url, required, args.ready_timeout,
+                                         server.process if server else None, (server.workers or 1) if server else 1)
+    info["ready_seconds"] = round(time.perf_counter() - server.started, 2) if server else None
+    info["imports"] = (readiness or {}).get("imports")
+    if server:
+        info["memory_idle"] = server.memory()
+
+    for endpoint in endpoints:
+        key = f"{endpoint}{suffix}"
+        missing = [name for name in REQUIRED_COMPONENTS[endpoint] if name in failed]
+        if missing:
+            print(f"{key}: 준비되지 않은 구성 요소 {missing}, 건너뜀")
+            results[key] = {"skipped": missing}
+            continue
+        send = request_factory(endpoint, receipts)
+        if server and server.workers:
+            # 연결을 재사용하는 워밍업은 한 워커만 거치므로, 새 연결로 동시에 보내서 워커마다 첫 요청(캐시가 빈 경로)을 처리하게 함
+            async with httpx.AsyncClient(timeout=args.timeout, limits=httpx.Limits(max_keepalive_connections=0)) as warm_client:
+                await asyncio.gather(*(send(warm_client, url) for _ in range(server.workers * 2)), return_exceptions=True)
+        levels_results = []
+        for concurrency in levels:
+            total = max(args.requests, concurrency)
+            result = await run_level(client, url, send, concurrency, total, args.warmup)
+            if server:
+                result.update({name: value for name, value in server.memory().items() if name != "workers"})
+            levels_results.append(result)
+            print(f"{key:15s} c={concurrency:<3d} {result['throughput_rps']:8.2f} req/s  "
+                  f"p50 {result['p50_ms']}ms  p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms  "
+                  f"오류 {result['errors']}  RSS {result.get('rss_mb')}MB")
+        results[key] = levels_results
+    return results, info
+
+
+def pretrain(db_path, engine):
+    """serve.py가 fork 전에 모델을 로드할 수 있도록 미리 학습해 둔 모델 디렉터리 (워커 수별 실행에서 공유)"""
+    model_dir = tempfile.mkdtemp(prefix="shcrm-models-")
+    env = {
+        **os.environ,
+        "DB_URL": f"sqlite:///{os.path.abspath(db_path)}",
+        "USAGE_TENANT_COLUMN": "department",
+        "MODEL_ARTIFACT_DIR": model_dir,
+        "FORECAST_ENGINE": engine,
+        "LOG_LEVEL": "WARNING",
+    }
+    subprocess.run([sys.executable, "-c", "import training; training.run_training_job()"], cwd=ROOT, env=env, check=True)
+    return model_dir
+
+
+def scaling_summary(report, endpoints, worker_counts):
+    """워커 수별 최고 처리량(1워커 대비 배수)과 메모리 요약"""
+    summary = []
+    baseline = {}
+    for workers in worker_counts:
+        server = report["server"].get(str(workers), {})
+        memory = server.get("memory_idle") or {}
+        row = {
+            "workers": workers,
+            "pss_mb": memory.get("pss_mb"),
+            "rss_mb": memory.get("rss_mb"),
+            "master_rss_mb": memory.get("master_rss_mb"),
+            "worker_rss_mb": memory.get("worker_rss_mb"),
+            "throughput_rps": {},
+            "speedup": {},
+        }
+        for endpoint in endpoints:
+            levels = report["results"].get(f"{endpoint}@{workers}w")
+            if not isinstance(levels, list):
+                continue
+            best = max((level["throughput_rps"] or 0) for level in levels)
+            row["throughput_rps"][endpoint] = best
+            baseline.setdefault(endpoint, best)
+            row["speedup"][endpoint] = round(best / baseline[endpoint], 2) if baseline[endpoint] else None
+        summary.append(row)
+
+    print("\n워커 수별 최고 처리량 (1워커 대비)과 대기 중 메모리")
+    for row in summary:
+        throughput = "  ".join(f"{endpoint} {rps:.1f}req/s(x{row['speedup'][endpoint]})"
+                               for endpoint, rps in row["throughput_rps"].items())
+        print(f"워커 {row['workers']:<3d} {throughput}  PSS 합계 {row['pss_mb']}MB  "
+              f"부모 RSS {row['master_rss_mb']}MB  워커 평균 RSS {row['worker_rss_mb']}MB")
+    return summary
+
+
+async def run(args):
+    endpoints = args.endpoints.split(",")
+    levels = [int(value) for value in args.concurrency.split(",")]
+    worker_counts = [int(value) for value in args.workers.split(",")] if args.workers else [None]
+    receipts = load_receipts(args.receipts) if "extract" in endpoints else []
+    required = sorted({name for endpoint in endpoints for name in REQUIRED_COMPONENTS[endpoint]})
+
+    commit, dirty = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "server": {},
+        "results": {},
+        "stages": {},
+    }
+
+    model_dir = None
+    if args.spawn and args.workers and "predict" in endpoints:
+        # 워커 수마다 처음부터 학습하면 워커가 각자 모델을 로드해서 메모리 비교가 왜곡되므로 한 번만 학습
+        model_dir = pretrain(args.db, args.engine)
+
+    limits = httpx.Limits(max_connections=max(levels) * 2, max_keepalive_connections=max(levels) * 2)
+    for workers in worker_counts:
+        server = None
+        url = args.url
+        if args.spawn:
+            # 워커 수마다 새 작업 디렉터리(모델, 캐시, 공유 저장소)에서 시작
+            workdir = tempfile.mkdtemp(prefix="shcrm-load-")
+            server = ServerProcess(args.db, workdir, args.engine, args.result_cache, args.stub_latency_ms, required,
+                                   workers, model_dir)
+            url = server.url
+        suffix = f"@{workers}w" if workers is not None else ""
+        info, stages = {}, {}
+        try:
+            async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+                results, info = await measure(args, client, url, server, endpoints, levels, receipts, required, suffix)
+                report["results"].update(results)
+                stages = await stage_averages(client, url)
+        finally:
+            if server:
+                info["memory"] = server.memory()
+                info["bizno_stub_requests"] = server.stub.requests
+                server.stop()
+        if workers is None:
+            report["server"], report["stages"] = info, stages
+        else:
+            report["server"][str(workers)] = info
+            report["stages"][str(workers)] = stages
+
+    if args.workers:
+        report["scaling"] = scaling_summary(report, endpoints, worker_counts)
+
+    # 클라이언트(이 프로세스) 최고 RSS (리눅스는 KB 단위)
+    report["client_max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--spawn", action="store_true")
+    target.add_argument("--url")
+    parser.add_argument("--db", help="--spawn에서 사용할 SQLite 파일 (seed_usage_db.py로 생성)")
+    parser.add_argument("--receipts", help="영수증 이미지 디렉터리 (synthetic_receipts.py로 생성)")
+    parser.add_argument("--endpoints", default="extract,predict,monthly_totals")
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--requests", type=int, default=40, help="동시 요청 수 단계마다 보낼 요청 수")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--workers", help="--spawn에서 serve.py 워커 수 목록 (예: 1,2,4)")
+    parser.add_argument("--engine", default="ridge")
+    parser.add_argument("--result-cache", action="store_true")
+    parser.add_argument("--stub-latency-ms", type=float, default=80.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--ready-timeout", type=float, default=900.0)
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    parser.add_argument("--max-regression", type=float, help="예: 0.2면 p95 20%% 증가나 처리량 20%% 감소를 회귀로 봄")
+    args = parser.parse_args()
+    if args.spawn and not args.db:
+        parser.error("--spawn에는 --db가 필요합니다.")
+    if args.workers and not args.spawn:
+        parser.error("--workers는 --spawn과 함께 써야 합니다.")
+    if "extract" in args.endpoints.split(",") and not args.receipts:
+        parser.error("extract를 측정하려면 --receipts가 필요합니다.")
+
+    report = asyncio.run(run(args))
+
+    # 저장소 안에 결과 파일이 쌓이지 않도록 기본은 임시 디렉터리 (남겨 둘 결과는 --output으로 지정)
+    output = args.output or os.path.join(tempfile.gettempdir(), f"shcrm-load-{report['meta']['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        if compare(previous, report, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""영수증 전처리 설정별 OCR 지연 시간/정확도 비교
+
+사용법:
+    python benchmarks/preprocess_bench.py <샘플 디렉터리> [--output 결과.json]
+
+샘플 디렉터리에는 영수증 이미지와 labels.json을 둔다.
+labels.json 형식: {"파일명.jpg": {"사업자번호": ["123-45-67890"], "금액": 12000}, ...}
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import easyocr
+
+from preprocess import ImagePreprocessor
+from service import ImageProcessor
+
+# 비교할 전처리 설정
+VARIANTS = {
+    "원본": dict(max_side=0, grayscale=False, crop=False, deskew=False),
+    "축소_2048": dict(max_side=2048, grayscale=False, crop=False, deskew=False),
+    "축소_1600": dict(max_side=1600, grayscale=False, crop=False, deskew=False),
+    "축소_1600_흑백": dict(max_side=1600, grayscale=True, crop=False, deskew=False),
+    "축소_1600_전체": dict(max_side=1600, grayscale=True, crop=True, deskew=True),
+    "축소_1024_전체": dict(max_side=1024, grayscale=True, crop=True, deskew=True),
+}
+
+
+def field_accuracy(info_dict, label):
+    """라벨에 있는 필드 중 맞힌 비율"""
+    checks = []
+    if "사업자번호" in label:
+        expected = {number.replace("-", "") for number in label["사업자번호"]}
+        found = {number.replace("-", "") for number in info_dict["사업자번호"]}
+        checks.append(expected <= found)
+    if "금액" in label:
+        checks.append(info_dict["금액"] == label["금액"])
+    if "거래일시" in label:
+        checks.append(label["거래일시"] in info_dict["거래일시"])
+    return sum(checks) / len(checks) if checks else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("samples")
+    parser.add_argument("--output")
+    parser.add_argument("--gpu", action="store_true")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.samples, "labels.json"), encoding="utf-8") as f:
+        labels = json.load(f)
+
+    samples = []
+    for filename in sorted(labels):
+        with open(os.path.join(args.samples, filename), "rb") as f:
+            samples.append((filename, f.read()))
+
+    reader = easyocr.Reader(["ko", "en"], gpu=args.gpu)
+    extractor = ImageProcessor(None, None)
+
+    report = {}
+    for name, config in VARIANTS.items():
+        preprocessor = ImagePreprocessor(**config)
+        preprocess_ms, ocr_ms, accuracies = [], [], []
+        for filename, data in samples:
+            started = time.perf_counter()
+            image, _ = preprocessor.process(data)
+            preprocess_ms.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            results = reader.readtext(image)
+            ocr_ms.append((time.perf_counter() - started) * 1000)
+
+            accuracy = field_accuracy(extractor.build_info_dict(results), labels[filename])
+            if accuracy is not None:
+                accuracies.append(accuracy)
+
+        report[name] = {
+            "config": config,
+            "preprocess_ms_p50": round(statistics.median(preprocess_ms), 1),
+            "ocr_ms_p50": round(statistics.median(ocr_ms), 1),
+            "total_ms_mean": round(statistics.mean(p + o for p, o in zip(preprocess_ms, ocr_ms)), 1),
+            "accuracy": round(statistics.mean(accuracies), 3) if accuracies else None,
+        }
+        print(f"{name:16s} 전처리 {report[name]['preprocess_ms_p50']:8.1f}ms  OCR {report[name]['ocr_ms_p50']:8.1f}ms  "
+              f"정확도 {report[name]['accuracy']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
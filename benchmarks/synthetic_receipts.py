@@ -0,0 +1,147 @@
+"""부하 테스트/전처리 벤치마크용 가짜 영수증 이미지 생성
+
+사용법:
+    python benchmarks/synthetic_receipts.py <출력 디렉터리> [--count 5] [--sizes small,medium,large,photo]
+                                            [--font 한글폰트.ttf] [--seed 0]
+
+크기별로 count장씩 만들고 labels.json(preprocess_bench.py와 같은 형식)을 함께 저장한다.
+photo는 휴대폰 사진처럼 큰 배경 위에 기울어진 영수증과 잡음을 넣은 JPEG.
+--font를 주지 않으면 시스템의 한글 폰트를 찾고, 없으면 Pillow 기본 폰트로 라벨 없이 숫자만 그린다
+(OCR 정확도보다 이미지 크기/글자 수에 따른 지연 시간 측정이 목적).
+사업자번호는 bizno_stub.py가 업종 페이지를 돌려주는 번호와 돌려주지 않는 번호(끝자리 0)를 섞는다.
+"""
+import argparse
+import json
+import os
+import random
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# 이름: (영수증 너비, 높이, 글자 크기, 저장 형식)
+SIZES = {
+    "small": (480, 800, 18, "png"),
+    "medium": (960, 1600, 34, "png"),
+    "large": (1600, 2800, 56, "png"),
+    "photo": (1500, 2600, 52, "jpg"),
+}
+PHOTO_CANVAS = (3024, 4032)
+
+FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+    "C:/Windows/Fonts/malgun.ttf",
+]
+
+ITEMS = ["A4 용지", "볼펜", "토너", "커피", "생수", "택배비", "주차비", "도시락", "USB 메모리", "포스트잇"]
+
+
+def find_font():
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_font(path, size):
+    if path:
+        return ImageFont.truetype(path, size)
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow 10.1 미만은 크기를 지정할 수 없음
+        return ImageFont.load_default()
+
+
+def business_number(rng):
+    return f"{rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10000, 99999)}"
+
+
+def receipt_lines(rng, korean):
+    """(텍스트 목록, 정답 라벨)"""
+    number = business_number(rng)
+    day = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    items = [(rng.choice(ITEMS), rng.randint(1, 5), rng.randrange(1000, 50000, 100)) for _ in range(rng.randint(3, 12))]
+    total = sum(count * price for _, count, price in items)
+
+    if korean:
+        lines = ["영 수 증", f"상호명: 테스트마트 {rng.randint(1, 99)}호점", f"사업자번호: {number}",
+                 f"거래일시: {day} {rng.randint(9, 21):02d}:{rng.randint(0, 59):02d}", "-" * 24]
+        lines += [f"{name} {count} {count * price:,}" for name, count, price in items]
+        lines += ["-" * 24, f"부가세 {round(total / 11):,}", f"합계 {total:,}원", f"카드번호 9410-****-****-{rng.randint(1000, 9999)}"]
+    else:
+        lines = ["RECEIPT", f"{number}", f"{day} {rng.randint(9, 21):02d}:{rng.randint(0, 59):02d}", "-" * 24]
+        lines += [f"ITEM{i + 1} {count} {count * price:,}" for i, (_, count, price) in enumerate(items)]
+        lines += ["-" * 24, f"TOTAL {total:,}"]
+    return lines, {"사업자번호": [number], "거래일시": day, "금액": total}
+
+
+def render_receipt(lines, width, height, font):
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    line_height = int(font.size * 1.6) if hasattr(font, "size") else 16
+    y = line_height
+    for line in lines:
+        draw.text((int(width * 0.06), y), line, fill="black", font=font)
+        y += line_height
+        if y > height - line_height:
+            break
+    return np.array(image)[:, :, ::-1]  # OpenCV BGR
+
+
+def as_photo(receipt, rng):
+    """큰 배경 위에 기울여 붙이고 조명 얼룩과 잡음 추가"""
+    canvas_w, canvas_h = PHOTO_CANVAS
+    canvas = np.full((canvas_h, canvas_w, 3), (90, 110, 130), dtype=np.uint8)
+    h, w = receipt.shape[:2]
+    x, y = (canvas_w - w) // 2, (canvas_h - h) // 2
+    canvas[y:y + h, x:x + w] = receipt
+    angle = rng.uniform(-6, 6)
+    matrix = cv2.getRotationMatrix2D((canvas_w / 2, canvas_h / 2), angle, 1.0)
+    canvas = cv2.warpAffine(canvas, matrix, (canvas_w, canvas_h), borderValue=(90, 110, 130))
+    gradient = np.linspace(0.8, 1.05, canvas_w, dtype=np.float32)[None, :, None]
+    noise = np.random.default_rng(rng.randint(0, 2 ** 31)).normal(0, 6, canvas.shape)
+    return np.clip(canvas * gradient + noise, 0, 255).astype(np.uint8)
+
+
+def generate(output_dir, count=5, sizes=tuple(SIZES), font_path=None, seed=0):
+    """이미지를 만들고 {파일명: 라벨} 반환"""
+    rng = random.Random(seed)
+    font_path = font_path or find_font()
+    os.makedirs(output_dir, exist_ok=True)
+    labels = {}
+    for size in sizes:
+        width, height, font_size, ext = SIZES[size]
+        font = load_font(font_path, font_size)
+        for index in range(count):
+            lines, label = receipt_lines(rng, korean=font_path is not None)
+            image = render_receipt(lines, width, height, font)
+            if size == "photo":
+                image = as_photo(image, rng)
+            filename = f"{size}_{index:03d}.{ext}"
+            params = [cv2.IMWRITE_JPEG_QUALITY, 88] if ext == "jpg" else []
+            cv2.imwrite(os.path.join(output_dir, filename), image, params)
+            labels[filename] = label
+    with open(os.path.join(output_dir, "labels.json"), "w", encoding="utf-8") as f:
+        json.dump(labels, f, ensure_ascii=False, indent=2)
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output")
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--sizes", default=",".join(SIZES))
+    parser.add_argument("--font")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    labels = generate(args.output, args.count, args.sizes.split(","), args.font, args.seed)
+    print(f"영수증 이미지 {len(labels)}장 생성: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import shared_state
+
+# 사업자번호 조회 캐시 설정 (환경 변수로 조정)
+BIZNO_CACHE_PATH = os.environ.get("BIZNO_CACHE_PATH", "bizno_cache.sqlite3")
+BIZNO_CACHE_MAX_ENTRIES = int(os.environ.get("BIZNO_CACHE_MAX_ENTRIES", "10000"))
+BIZNO_CACHE_TTL = float(os.environ.get("BIZNO_CACHE_TTL", str(30 * 24 * 3600)))
+BIZNO_CACHE_NEGATIVE_TTL = float(os.environ.get("BIZNO_CACHE_NEGATIVE_TTL", str(24 * 3600)))
+
+
+def normalize_business_number(business_number):
+    """사업자번호에서 숫자만 남김 (123-45-67890 -> 1234567890)"""
+    return re.sub(r"\D", "", business_number)
+
+
+class BiznoLookupCache:
+    """사업자번호별 업종 조회 결과 캐시 (메모리 LRU + SQLite)"""
+
+    def __init__(self, path=BIZNO_CACHE_PATH, max_entries=BIZNO_CACHE_MAX_ENTRIES,
+                 ttl=BIZNO_CACHE_TTL, negative_ttl=BIZNO_CACHE_NEGATIVE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory = OrderedDict()  # 번호 -> (조회 결과 또는 None, 조회 시각)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "fetch_errors": 0,
+        }
+
+    def _connection(self):
+        # 여러 워커 프로세스가 같은 파일을 읽고 쓰므로 WAL과 잠금 대기를 사용하고, fork 후에는 새로 엶
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = shared_state.connect_shared_sqlite(self.path)
+            self._pid = os.getpid()
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS bizno_cache ("
+                "business_number TEXT PRIMARY KEY, payload TEXT, fetched_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _is_fresh(self, entry, now):
+        value, fetched_at = entry
+        ttl = self.ttl if value is not None else self.negative_ttl
+        return now - fetched_at < ttl
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _load_from_disk(self, key):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT payload, fetched_at FROM bizno_cache WHERE business_number = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        payload, fetched_at = row
+        return (json.loads(payload) if payload is not None else None, fetched_at)
+
+    def _save_to_disk(self, key, entry):
+        value, fetched_at = entry
+        payload = json.dumps(value, ensure_ascii=False) if value is not None else None
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO bizno_cache (business_number, payload, fetched_at) VALUES (?, ?, ?)",
+                (key, payload, fetched_at)
+            )
+            conn.commit()
+
+    async def get_or_fetch(self, business_number, fetch):
+        """캐시에서 조회하고, 없거나 만료되었으면 fetch(번호)로 새로 조회
+
+        fetch가 None을 반환하면 '정보 없음'으로 negative_ttl 동안 캐시한다.
+        같은 번호에 대한 동시 조회는 한 번의 fetch로 합쳐진다.
+        """
+        key = normalize_business_number(business_number)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None and self._is_fresh(entry, now):
+            self._memory.move_to_end(key)
+            self.counters["memory_hits" if entry[0] is not None else "negative_hits"] += 1
+            return entry[0]
+
+        if entry is None:
+            entry = await asyncio.to_thread(self._load_from_disk, key)
+            if entry is not None and self._is_fresh(entry, now):
+                self._remember(key, entry)
+                self.counters["disk_hits" if entry[0] is not None else "negative_hits"] += 1
+                return entry[0]
+
+        # 같은 번호를 이미 조회 중이면 그 결과를 기다림
+        if key in self._inflight:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self.counters["refreshes" if entry is not None else "misses"] += 1
+        # 조회는 요청과 분리된 작업에서 실행해서, 먼저 요청한 쪽이 취소되어도 기다리는 요청은 결과를 받음
+        task = asyncio.create_task(self._fetch(key, entry, fetch))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._fetched(key, done))
+        return await asyncio.shield(task)
+
+    def _fetched(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 기다리는 쪽이 모두 취소되어도 경고가 남지 않도록 처리
+
+    async def _fetch(self, key, entry, fetch):
+        try:
+            value = await fetch(key)
+        except Exception as e:
+            self.counters["fetch_errors"] += 1
+            if entry is None:
+                raise
+            # 갱신에 실패하면 만료된 값이라도 반환
+            logging.warning(f"사업자번호 {key} 갱신 실패, 이전 조회 결과 사용: {e}")
+            return entry[0]
+
+        entry = (value, time.time())
+        self._remember(key, entry)
+        try:
+            await asyncio.to_thread(self._save_to_disk, key, entry)
+        except Exception as e:
+            logging.warning(f"사업자번호 {key} 캐시 저장 실패: {e}")
+        return value
+
+    def stats(self):
+        lookups = sum(self.counters[name] for name in ("memory_hits", "disk_hits", "negative_hits", "misses", "refreshes", "coalesced"))
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["negative_hits"]
+        return {
+            **self.counters,
+            "memory_entries": len(self._memory),
+            "inflight": len(self._inflight),
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
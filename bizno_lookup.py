@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import os
+import re
+
+import httpx
+from lxml import html as lxml_html
+
+import logs
+
+# bizno.net 조회 설정 (환경 변수로 조정, 테스트 시 로컬 스텁 서버 주소로 변경 가능)
+BIZNO_BASE_URL = os.environ.get("BIZNO_BASE_URL", "https://bizno.net/article/")
+BIZNO_BACKEND = os.environ.get("BIZNO_BACKEND", "http+selenium")
+BIZNO_HTTP_TIMEOUT = float(os.environ.get("BIZNO_HTTP_TIMEOUT", "5"))
+BIZNO_HTTP_MAX_CONNECTIONS = int(os.environ.get("BIZNO_HTTP_MAX_CONNECTIONS", "10"))
+BIZNO_HTTP_RETRIES = int(os.environ.get("BIZNO_HTTP_RETRIES", "2"))
+
+# 상호명과 업종(대분류~세세분류) 위치
+SHOP_NAME_XPATH = '/html/body/section[2]/div/div/div[1]/div[1]/div/div[1]/div/a/h1'
+CATEGORY_XPATHS = [
+    '/html/body/section[2]/div/div/div[1]/div[1]/div/table/tbody/tr[2]/td',
+    '/html/body/section[2]/div/div/div[1]/div[1]/div/table/tbody/tr[4]/td',
+]
+CATEGORY_LABELS = ["대분류", "중분류", "소분류", "세분류", "세세분류"]
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Accept-Language": "ko-KR,ko;q=0.9",
+}
+
+
+def parse_category_text(shop_name, category_keywords):
+    """업종 텍스트를 상호명/대분류~세세분류 dict로 변환"""
+    category_dict = {
+        "상호명": shop_name,
+        "대분류": re.search(r"대분류\s*:\s*(.*?)(?=\s*중분류|$)", category_keywords),
+        "중분류": re.search(r"중분류\s*:\s*(.*?)(?=\s*소분류|$)", category_keywords),
+        "소분류": re.search(r"소분류\s*:\s*(.*?)(?=\s*세분류|$)", category_keywords),
+        "세분류": re.search(r"세분류\s*:\s*(.*?)(?=\s*세세분류|$)", category_keywords),
+        "세세분류": re.search(r"세세분류\s*:\s*(.*)", category_keywords)
+    }
+
+    for key in category_dict:
+        if isinstance(category_dict[key], re.Match):
+            category_dict[key] = category_dict[key].group(1).strip()
+
+        elif category_dict[key] is not None:
+            category_dict[key] = category_dict[key].strip()
+
+    return category_dict
+
+
+def parse_bizno_html(page):
+    """bizno.net 페이지 HTML에서 상호명/업종 추출 (정보가 없으면 None)"""
+    tree = lxml_html.fromstring(page)
+
+    shop_names = tree.xpath(SHOP_NAME_XPATH)
+    shop_name = shop_names[0].text_content().strip() if shop_names else "상호명 없음"
+
+    for xpath in CATEGORY_XPATHS:
+        # 원본 HTML에는 브라우저가 넣어주는 tbody가 없을 수 있음
+        cells = tree.xpath(xpath) or tree.xpath(xpath.replace('/tbody/', '/'))
+        if not cells:
+            continue
+        text = "\n".join(part.strip() for part in cells[0].itertext() if part.strip())
+        if all(label in text for label in CATEGORY_LABELS):
+            return parse_category_text(shop_name, text)
+
+    return None
+
+
+class LookupBackend:
+    """사업자번호 업종 조회 백엔드 인터페이스"""
+
+    name = "base"
+
+    async def lookup(self, business_number_clean):
+        """숫자만 남긴 사업자번호로 조회 (정보가 없으면 None)"""
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class HttpLookupBackend(LookupBackend):
+    """keep-alive 커넥션 풀을 쓰는 비동기 HTTP + lxml 파서 백엔드"""
+
+    name = "http"
+
+    def __init__(self, base_url=BIZNO_BASE_URL, timeout=BIZNO_HTTP_TIMEOUT,
+                 max_connections=BIZNO_HTTP_MAX_CONNECTIONS, retries=BIZNO_HTTP_RETRIES):
+        self.base_url = base_url
+        self.retries = retries
+        self.client = httpx.AsyncClient(
+            headers=HTTP_HEADERS,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            follow_redirects=True,
+        )
+
+    async def fetch_page(self, business_number_clean):
+        url = self.base_url + business_number_clean
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.client.get(url)
+                if response.status_code == 404:
+                    return None
+                # 일시적인 서버 오류는 재시도
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request, response=response)
+                response.raise_for_status()
+                return response.text
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if attempt >= self.retries:
+                    raise
+                logging.warning(f"bizno 조회 재시도 ({attempt + 1}/{self.retries}): {url} - {e}")
+                await asyncio.sleep(0.2 * 2 ** attempt)
+
+    async def lookup(self, business_number_clean):
+        page = await self.fetch_page(business_number_clean)
+        if page is None:
+            return None
+        # 파싱은 CPU 작업이므로 이벤트 루프 밖에서 처리
+        return await asyncio.to_thread(parse_bizno_html, page)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class SeleniumLookupBackend(LookupBackend):
+    """ChromeDriver 풀에서 브라우저를 빌려 페이지를 렌더링하는 기존 방식 (대체 백엔드)"""
+
+    name = "selenium"
+
+    def __init__(self, browser_pool, base_url=BIZNO_BASE_URL):
+        self.browser_pool = browser_pool
+        self.base_url = base_url
+
+    def _lookup_sync(self, driver, business_number_clean):
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import NoSuchElementException
+
+        address = self.base_url + business_number_clean
+        logs.event(logging.DEBUG, "bizno_selenium_get", url=address)
+
+        driver.get(address)
+
+        # 상호명 추출
+        try:
+            shop_name = driver.find_element(By.XPATH, SHOP_NAME_XPATH).text
+        except NoSuchElementException:
+            shop_name = "상호명 없음"
+
+        # category_keywords 추출
+        for xpath in CATEGORY_XPATHS:
+            try:
+                element = driver.find_element(By.XPATH, xpath)
+                if all(label in element.text for label in CATEGORY_LABELS):
+                    return parse_category_text(shop_name, element.text)
+            except NoSuchElementException:
+                pass
+
+        return None
+
+    async def lookup(self, business_number_clean):
+        # 브라우저 조작은 작업 스레드에서 실행되어 이벤트 루프를 막지 않음
+        return await self.browser_pool.run(self._lookup_sync, business_number_clean)
+
+
+class FallbackLookupBackend(LookupBackend):
+    """기본 백엔드에서 오류가 나면 대체 백엔드로 다시 조회"""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+
+    async def lookup(self, business_number_clean):
+        try:
+            return await self.primary.lookup(business_number_clean)
+        except Exception as e:
+            logging.warning(f"{self.primary.name} 조회 실패, {self.fallback.name}로 재시도: {e}")
+            return await self.fallback.lookup(business_number_clean)
+
+    async def close(self):
+        await self.primary.close()
+        await self.fallback.close()
+
+
+def create_lookup_backend(browser_pool, backend=BIZNO_BACKEND):
+    """설정에 따라 조회 백엔드 생성 (http, selenium, http+selenium)"""
+    if backend == "http":
+        return HttpLookupBackend()
+    if backend == "selenium":
+        return SeleniumLookupBackend(browser_pool)
+    if backend == "http+selenium":
+        return FallbackLookupBackend(HttpLookupBackend(), SeleniumLookupBackend(browser_pool))
+    raise ValueError(f"알 수 없는 조회 백엔드: {backend}")
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+import time
+
+from startup import timed_import
+
+# ChromeDriver 풀 설정 (환경 변수로 조정)
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_PAGES = int(os.environ.get("BROWSER_MAX_PAGES", "200"))
+BROWSER_MAX_INFLIGHT = int(os.environ.get("BROWSER_MAX_INFLIGHT", "16"))
+BROWSER_ACQUIRE_TIMEOUT = float(os.environ.get("BROWSER_ACQUIRE_TIMEOUT", "30"))
+BROWSER_HEALTHCHECK_INTERVAL = float(os.environ.get("BROWSER_HEALTHCHECK_INTERVAL", "60"))
+# 미리 설치한 chromedriver/Chrome 경로 (지정하면 webdriver_manager로 내려받지 않아 오프라인에서도 시작 가능)
+CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH")
+CHROME_BINARY_PATH = os.environ.get("CHROME_BINARY_PATH")
+
+
+def default_chrome_options():
+    Options = timed_import("selenium.webdriver.chrome.options").Options
+    chrome_options = Options()
+    if CHROME_BINARY_PATH:
+        chrome_options.binary_location = CHROME_BINARY_PATH
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    return chrome_options
+
+
+class BrowserPoolSaturated(Exception):
+    """대기 시간 안에 사용할 수 있는 브라우저가 없는 경우"""
+
+
+class PooledBrowser:
+    """풀에 들어 있는 ChromeDriver 하나와 사용 기록"""
+
+    def __init__(self, index, driver):
+        self.index = index
+        self.driver = driver
+        self.pages = 0
+        self.last_used = time.monotonic()
+        self.broken = False
+
+
+class WebDriverPool:
+    """여러 ChromeDriver를 미리 띄워두고 조회마다 하나씩 빌려주는 풀"""
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES,
+                 max_inflight=BROWSER_MAX_INFLIGHT, acquire_timeout=BROWSER_ACQUIRE_TIMEOUT,
+                 healthcheck_interval=BROWSER_HEALTHCHECK_INTERVAL, options_factory=default_chrome_options):
+        self.size = size
+        self.max_pages = max_pages
+        self.acquire_timeout = acquire_timeout
+        self.healthcheck_interval = healthcheck_interval
+        self.options_factory = options_factory
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self.max_inflight = max_inflight
+        self._idle = None
+        self._driver_path = None
+        self.browsers = []
+        self._background = set()
+        self.recycled = 0
+        self.crashed = 0
+
+    def _resolve_driver_path(self):
+        if CHROMEDRIVER_PATH:
+            return CHROMEDRIVER_PATH
+        # 경로를 지정하지 않은 경우에만 webdriver_manager로 내려받음 (네트워크 필요)
+        return timed_import("webdriver_manager.chrome").ChromeDriverManager().install()
+
+    def _create_driver(self):
+        webdriver = timed_import("selenium.webdriver")
+        Service = timed_import("selenium.webdriver.chrome.service").Service
+        if self._driver_path is None:
+            self._driver_path = self._resolve_driver_path()
+        return webdriver.Chrome(service=Service(self._driver_path), options=self.options_factory())
+
+    async def start(self):
+        """브라우저 N개를 미리 띄움 (하나씩 뜨는 대로 바로 조회에 사용)"""
+        self._idle = asyncio.Queue()
+        for index in range(self.size):
+            driver = await asyncio.to_thread(self._create_driver)
+            browser = PooledBrowser(index, driver)
+            self.browsers.append(browser)
+            self._idle.put_nowait(browser)
+        logging.info(f"ChromeDriver {self.size}개가 시작되었습니다.")
+
+    async def close(self):
+        # 백그라운드 재시작을 먼저 멈춰야 종료 후에 새 브라우저가 떠서 남지 않음
+        recycling = list(self._background)
+        for task in recycling:
+            task.cancel()
+        await asyncio.gather(*recycling, return_exceptions=True)
+        for browser in self.browsers:
+            if browser.driver is not None:
+                await asyncio.to_thread(self._quit, browser.driver)
+        self.browsers = []
+        logging.info("ChromeDriver가 종료되었습니다.")
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"ChromeDriver 종료 중 오류 발생: {e}")
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    async def _recycle(self, browser):
+        """브라우저를 종료하고 새로 띄워서 같은 자리에 넣음"""
+        old_driver, browser.driver = browser.driver, None
+        if old_driver is not None:
+            await asyncio.to_thread(self._quit, old_driver)
+        creating = asyncio.ensure_future(asyncio.to_thread(self._create_driver))
+        try:
+            browser.driver = await asyncio.shield(creating)
+        except asyncio.CancelledError:
+            # 작업 스레드는 취소되지 않으므로 뜨고 있는 브라우저를 받아 두어 close()에서 종료되게 함
+            browser.driver = await creating
+            raise
+        browser.pages = 0
+        browser.broken = False
+        self.recycled += 1
+
+    async def _checkout(self):
+        try:
+            browser = await asyncio.wait_for(self._idle.get(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise BrowserPoolSaturated("사용 가능한 ChromeDriver가 없습니다.")
+
+        # 오래 쉬고 있던 브라우저는 꺼내기 전에 상태 확인
+        if time.monotonic() - browser.last_used > self.healthcheck_interval:
+            if not await asyncio.to_thread(self._is_healthy, browser.driver):
+                logging.warning(f"ChromeDriver #{browser.index} 응답 없음, 재시작합니다.")
+                browser.broken = True
+        return browser
+
+    async def _recycle_and_checkin(self, browser):
+        try:
+            await self._recycle(browser)
+        except Exception as e:
+            logging.error(f"ChromeDriver #{browser.index} 재시작 중 오류 발생: {e}")
+            browser.broken = True
+        finally:
+            browser.last_used = time.monotonic()
+            self._idle.put_nowait(browser)
+
+    def _checkin(self, browser):
+        if browser.broken or browser.pages >= self.max_pages:
+            # 재시작은 응답을 늦추지 않도록 백그라운드에서 처리
+            task = asyncio.create_task(self._recycle_and_checkin(browser))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            return
+        browser.last_used = time.monotonic()
+        self._idle.put_nowait(browser)
+
+    async def run(self, func, *args):
+        """브라우저 하나를 빌려 func(driver, *args)를 작업 스레드에서 실행"""
+        if self._idle is None or not self.browsers:
+            raise RuntimeError("ChromeDriver 풀이 시작되지 않았습니다.")
+        WebDriverException = timed_import("selenium.common.exceptions").WebDriverException
+
+        async with self._inflight:
+            browser = await self._checkout()
+            try:
+                if browser.broken:
+                    await self._recycle(browser)
+                browser.pages += 1
+                return await asyncio.to_thread(func, browser.driver, *args)
+            except WebDriverException:
+                # 브라우저가 죽었거나 세션이 끊긴 경우 반납 시 재시작
+                self.crashed += 1
+                browser.broken = True
+                raise
+            finally:
+                self._checkin(browser)
+
+    def stats(self):
+        idle = self._idle.qsize() if self._idle is not None else 0
+        return {
+            "size": len(self.browsers),
+            "in_use": len(self.browsers) - idle,
+            "idle": idle,
+            "max_inflight": self.max_inflight,
+            "pages": sum(browser.pages for browser in self.browsers),
+            "recycled": self.recycled,
+            "crashed": self.crashed,
+        }
@@ -0,0 +1,165 @@
+import difflib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from types import MappingProxyType
+
+# 카테고리 분류 설정 (환경 변수로 조정)
+CATEGORY_MAPPING_PATH = os.environ.get(
+    "CATEGORY_MAPPING_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "category_mapping.json")
+)
+CATEGORY_RELOAD_SECONDS = float(os.environ.get("CATEGORY_RELOAD_SECONDS", "30"))
+# 0이면 유사 문자열 매칭 사용 안 함
+CATEGORY_FUZZY_CUTOFF = float(os.environ.get("CATEGORY_FUZZY_CUTOFF", "0.85"))
+CATEGORY_FUZZY_MIN_LENGTH = 4
+CATEGORY_FUZZY_CACHE_SIZE = 4096
+
+# 세세분류부터 위로 올라가며 매칭
+CATEGORY_LEVELS = ("세세분류", "세분류", "소분류", "중분류")
+
+NORMALIZE_PATTERN = re.compile(r"[\s.,·ㆍ()\[\]/\-]+")
+
+
+def normalize_label(text):
+    """업종명 비교용 정규화 (전각/반각 통일, 공백과 구두점 제거)"""
+    return NORMALIZE_PATTERN.sub("", unicodedata.normalize("NFKC", text)).lower()
+
+
+class CategoryIndex:
+    """업종명 -> 카테고리 역색인 (생성 후 변경하지 않음)"""
+
+    def __init__(self, config):
+        self.default = MappingProxyType(dict(config["default"]))
+        exact, normalized, duplicates = {}, {}, []
+        # 같은 업종이 여러 카테고리에 있으면 먼저 나온 카테고리를 사용
+        for category in config["categories"]:
+            result = MappingProxyType({"categoryId": category["categoryId"], "categoryName": category["categoryName"]})
+            for keyword in category["keywords"]:
+                if keyword in exact:
+                    duplicates.append((keyword, exact[keyword]["categoryName"], category["categoryName"]))
+                    continue
+                exact[keyword] = result
+                normalized.setdefault(normalize_label(keyword), result)
+        self.exact = MappingProxyType(exact)
+        self.normalized = MappingProxyType(normalized)
+        self.fuzzy_keys = tuple(key for key in normalized if len(key) >= CATEGORY_FUZZY_MIN_LENGTH)
+        self.duplicates = tuple(duplicates)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+
+class CategoryClassifier:
+    """업종 조회 결과를 카테고리로 분류 (설정 파일이 바뀌면 다시 읽음)"""
+
+    def __init__(self, path=CATEGORY_MAPPING_PATH, reload_interval=CATEGORY_RELOAD_SECONDS,
+                 fuzzy_cutoff=CATEGORY_FUZZY_CUTOFF):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._mtime = None
+        self._fuzzy_cache = OrderedDict()
+        self.counters = {"exact": 0, "normalized": 0, "fuzzy": 0, "default": 0, "reloads": 0, "reload_errors": 0}
+        self.index = None
+        self.load()
+
+    def load(self):
+        """설정 파일을 읽어 새 색인으로 교체 (실패하면 기존 색인 유지)"""
+        mtime = os.path.getmtime(self.path)
+        index = CategoryIndex.from_file(self.path)
+        for keyword, kept, skipped in index.duplicates:
+            logging.warning(f"카테고리 매핑 중복: '{keyword}'는 {kept}로 분류 ({skipped} 항목 무시)")
+        with self._lock:
+            self.index = index  # 참조 교체만 하므로 읽는 쪽은 잠금 없이 사용
+            self._mtime = mtime
+            self._fuzzy_cache = OrderedDict()
+        logging.info(f"카테고리 매핑 로드: {len(index.exact)}개 업종 ({self.path})")
+
+    def reload_if_changed(self, now=None):
+        now = time.monotonic() if now is None else now
+        if now - self._checked_at < self.reload_interval:
+            return False
+        self._checked_at = now
+        try:
+            if os.path.getmtime(self.path) == self._mtime:
+                return False
+            self.load()
+            self.counters["reloads"] += 1
+            return True
+        except Exception as e:
+            self.counters["reload_errors"] += 1
+            logging.error(f"카테고리 매핑 다시 읽기 실패, 기존 매핑 유지: {e}")
+            return False
+
+    def _fuzzy(self, index, key):
+        with self._lock:
+            if key in self._fuzzy_cache:
+                self._fuzzy_cache.move_to_end(key)
+                return self._fuzzy_cache[key]
+        matches = difflib.get_close_matches(key, index.fuzzy_keys, n=1, cutoff=self.fuzzy_cutoff)
+        result = index.normalized[matches[0]] if matches else None
+        with self._lock:
+            if index is self.index:
+                self._fuzzy_cache[key] = result
+                while len(self._fuzzy_cache) > CATEGORY_FUZZY_CACHE_SIZE:
+                    self._fuzzy_cache.popitem(last=False)
+        return result
+
+    def match(self, label, index=None):
+        """업종명 하나를 (카테고리, 매칭 방식)으로 변환 (못 찾으면 (None, None))"""
+        index = index or self.index
+        label = label.strip()
+        if label in index.exact:
+            return index.exact[label], "exact"
+        key = normalize_label(label)
+        if key in index.normalized:
+            return index.normalized[key], "normalized"
+        if self.fuzzy_cutoff > 0 and len(key) >= CATEGORY_FUZZY_MIN_LENGTH:
+            result = self._fuzzy(index, key)
+            if result is not None:
+                return result, "fuzzy"
+        return None, None
+
+    def classify(self, keywords):
+        """업종 조회 결과(dict)를 세세분류 -> 세분류 -> 소분류 -> 중분류 순서로 분류"""
+        index = self.index
+        for level in CATEGORY_LEVELS:
+            label = keywords.get(level) if keywords else None
+            if not label:
+                continue
+            result, match_type = self.match(label, index)
+            if result is not None:
+                self.counters[match_type] += 1
+                return dict(result)
+        self.counters["default"] += 1
+        return dict(index.default)
+
+    def classify_many(self, category_keywords):
+        """영수증의 사업자번호별 조회 결과를 한 번에 분류 ({사업자번호: 카테고리})"""
+        self.reload_if_changed()
+        return {
+            number: self.classify(keywords)
+            for number, keywords in (category_keywords or {}).items()
+            if keywords and any(keywords.get(level) for level in CATEGORY_LEVELS)
+        }
+
+    def stats(self):
+        index = self.index
+        return {
+            **self.counters,
+            "path": self.path,
+            "keywords": len(index.exact),
+            "duplicates": [{"keyword": keyword, "category": kept, "ignored": skipped}
+                           for keyword, kept, skipped in index.duplicates],
+            "fuzzy_cutoff": self.fuzzy_cutoff,
+            "fuzzy_cache": len(self._fuzzy_cache),
+        }
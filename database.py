@@ -0,0 +1,161 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+from sqlalchemy import create_engine, event
+
+import metrics
+
+# DB 연결 설정 (환경 변수로 조정, DB_URL이 있으면 그 주소를 그대로 사용)
+DB_HOST = os.environ.get("DB_HOST", "shcrm.ddns.net")
+DB_PORT = int(os.environ.get("DB_PORT", "5001"))
+DB_NAME = os.environ.get("DB_NAME", "shcrm")
+DB_USER = os.environ.get("DB_USER", "root")
+DB_PASSWORD = os.environ.get("DB_PASSWORD", "9868")
+DB_URL = os.environ.get("DB_URL") or os.environ.get("USAGE_DB_URL")
+
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+class LatencyStats:
+    """호출 횟수와 소요 시간 누적 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "avg_ms": round(self.total / self.count * 1000, 3) if self.count else None,
+                "max_ms": round(self.max * 1000, 3),
+            }
+
+
+checkout_wait = LatencyStats()
+query_latency = LatencyStats()
+
+
+def database_url():
+    if DB_URL:
+        return DB_URL
+    return f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+
+def _on_before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _on_after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is not None:
+        seconds = time.perf_counter() - started
+        query_latency.observe(seconds)
+        metrics.observe_stage("db_query", seconds)
+
+
+def get_engine():
+    """프로세스 전체에서 하나만 쓰는 커넥션 풀 엔진"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                url = database_url()
+                options = {"pool_pre_ping": DB_POOL_PRE_PING}
+                if not url.startswith("sqlite"):
+                    options.update(
+                        pool_size=DB_POOL_SIZE,
+                        max_overflow=DB_MAX_OVERFLOW,
+                        pool_timeout=DB_POOL_TIMEOUT,
+                        pool_recycle=DB_POOL_RECYCLE,
+                    )
+                engine = create_engine(url, **options)
+                event.listen(engine, "before_cursor_execute", _on_before_execute)
+                event.listen(engine, "after_cursor_execute", _on_after_execute)
+                _engine = engine
+    return _engine
+
+
+def dialect_name():
+    return get_engine().dialect.name
+
+
+@contextmanager
+def connect():
+    """풀에서 커넥션을 빌려옴 (빌려오기까지 기다린 시간 기록)"""
+    started = time.perf_counter()
+    conn = get_engine().connect()
+    checkout_wait.observe(time.perf_counter() - started)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def begin():
+    """트랜잭션 안에서 커넥션 사용 (정상 종료 시 commit)"""
+    with connect() as conn:
+        with conn.begin():
+            yield conn
+
+
+def read_sql(query, params=None):
+    with connect() as conn:
+        return pd.read_sql(query, conn, params=params)
+
+
+def ping():
+    """커넥션을 하나 빌려 SELECT 1 실행 (준비 상태 확인용)"""
+    with connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+
+
+async def read_sql_async(query, params=None):
+    """이벤트 루프를 막지 않도록 작업 스레드에서 조회"""
+    return await asyncio.to_thread(read_sql, query, params)
+
+
+async def run_async(func, *args):
+    """DB를 쓰는 동기 함수를 작업 스레드에서 실행"""
+    return await asyncio.to_thread(func, *args)
+
+
+def stats():
+    engine = _engine
+    pool = engine.pool if engine is not None else None
+    return {
+        "pool": pool.status() if pool is not None else None,
+        # 풀 종류에 따라 크기/사용 중 개수를 제공하지 않을 수 있음
+        "pool_size": pool.size() if hasattr(pool, "size") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "checkout_wait": checkout_wait.snapshot(),
+        "query_latency": query_latency.snapshot(),
+    }
+
+
+def dispose():
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
@@ -0,0 +1,245 @@
+import re
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+
+# 모든 패턴은 import 시 한 번만 컴파일
+
+# 한 줄을 한 번만 훑으면서 사업자번호/날짜/금액 토큰을 왼쪽부터 차례로 잘라냄
+# (앞쪽 대안이 우선이라 사업자번호나 날짜 안의 숫자가 금액 후보로 다시 잡히지 않음)
+# 맨 앞의 (?=\d)는 모든 대안이 숫자로 시작하므로 숫자가 아닌 위치에서 대안을 하나씩 시도하지 않게 함
+TOKEN_PATTERN = re.compile(
+    r'(?=\d)(?:'
+    r'(?P<bizno>\b\d{3}-?\d{2}-?\d{5}\b)'
+    r'|(?P<ymd>(?P<ymd_y>\d{4})[-/.](?P<ymd_m>\d{2})[-/.](?P<ymd_d>\d{2}))'
+    r'|(?P<dmy>(?P<dmy_d>\d{2})[-/.](?P<dmy_m>\d{2})[-/.](?P<dmy_y>\d{4}))'
+    r'|(?P<mdy>(?P<mdy_m>\d{2})[-/.](?P<mdy_d>\d{2})[-/.](?P<mdy_y>\d{2}))'
+    # 금액: 천 단위 쉼표 숫자 또는 쉼표 없는 숫자 (시각, 전화/카드번호, 소수의 일부는 제외)
+    # 뒤에 '원'이 붙었는지는 폭 없는 lookahead 안의 won 그룹으로 같이 확인 (amount 그룹 안에 두어 lastgroup은 그대로 amount)
+    r'|(?P<amount>(?<![\d,.\-*])(?:\d{1,3}(?:,\d{3})+|\d+)(?![\d:\-*]|[.,]\d)(?:(?=\s*(?P<won>원)))?))'
+)
+
+# 라벨 뒤 첫 단어부터 가장 가까운 '점'까지 (중첩 반복 없이 써서 '점'이 없는 긴 줄에서도 역추적이 폭발하지 않음)
+# 이어 붙인 텍스트에 돌리므로 .과 \S 대신 줄 구분 문자(\x00)를 뺀 문자 집합을 써서 다음 줄로 넘어가지 않게 함
+STORE_NAME_PATTERN = re.compile(
+    r'(?=[매상회업가싱성훼])(?:매장명|상호명|회사명|업체명|가맹점명|가맣점명|[상싱성][호오]|[회훼]사)'
+    r'\s*[:;：]?\s*([^\s)\x00]+[^\x00]*?점[^\s\x00]*)'
+)
+
+# 숫자 옆 라벨을 한 번에 분류 (결제 금액 라벨 > 제외 라벨 > 일반 '금액' 순서로 먼저 맞는 쪽)
+# 맨 앞의 lookahead는 라벨 첫 글자가 아닌 위치를 바로 건너뛰게 함 (라벨을 추가하면 첫 글자도 추가)
+# 영문 라벨만 대소문자를 가리지 않으면 되므로 IGNORECASE 대신 글자마다 대소문자를 같이 씀 (한글까지 대소문자 비교를 하지 않게)
+LABEL_PATTERN = re.compile(
+    r'(?=[합총결받승청판부세과면공거잔할포카전수단금tTfF])(?:'
+    # 최종 결제 금액 라벨
+    r'(?P<total>합\s*계|총\s*금\s*액|총\s*액|결\s*제\s*금\s*액|받\s*을\s*금\s*액|승\s*인\s*금\s*액|청\s*구\s*금\s*액'
+    r'|판\s*매\s*금\s*액|[tT][oO][tT][aA][lL])'
+    # 결제 금액이 아닌 숫자의 라벨 (부가세, 공급가액, 거스름돈, 승인번호 등)
+    r'|(?P<exclude>부\s*가\s*세|세\s*액|과\s*세|면\s*세|공\s*급\s*가|거\s*스\s*름|잔\s*돈|받\s*은\s*(?:금\s*액|돈)|할\s*인'
+    r'|포\s*인\s*트|승\s*인\s*번\s*호|카\s*드\s*번\s*호|전\s*화|[tT][eE][lL]|[fF][aA][xX]|수\s*량|단\s*가)'
+    r'|(?P<weak>금\s*액))'
+)
+
+# 줄을 이어 붙여 토큰/라벨 패턴을 영수증당 한 번만 돌릴 때 쓰는 구분 문자
+# (공백, 숫자, 단어 문자, 패턴의 구분 기호가 아니라서 줄 끝과 같게 취급되고 토큰/라벨이 줄을 넘어 이어지지 않음)
+LINE_SEPARATOR = "\x00"
+
+MIN_AMOUNT = 100
+MAX_AMOUNT = 100_000_000
+
+# 날짜 토큰 종류별 (연, 월, 일) 그룹 이름
+DATE_GROUPS = {kind: (f"{kind}_y", f"{kind}_m", f"{kind}_d") for kind in ("ymd", "dmy", "mdy")}
+
+
+NO_LABELS = frozenset()
+
+
+class OCRLine:
+    __slots__ = ("text", "x0", "y0", "x1", "y1", "center_y", "height", "labels")
+
+    def __init__(self, index, text, box=None, labels=NO_LABELS):
+        self.text = text
+        if box is None:
+            # 좌표가 없으면 줄 순서를 세로 위치로 사용
+            x0, y0, x1, y1 = 0.0, float(index), 1.0, float(index) + 1.0
+        else:
+            # readtext 상자는 좌상, 우상, 우하, 좌하 네 꼭짓점
+            (x_a, y_a), (x_b, y_b), (x_c, y_c), (x_d, y_d) = box
+            # 줄마다 만들어지므로 min()/max() 호출 대신 두 쌍씩 직접 비교 (회전된 상자도 네 꼭짓점을 모두 비교)
+            x0, x1 = (x_a, x_b) if x_a < x_b else (x_b, x_a)
+            x_low, x_high = (x_c, x_d) if x_c < x_d else (x_d, x_c)
+            y0, y1 = (y_a, y_b) if y_a < y_b else (y_b, y_a)
+            y_low, y_high = (y_c, y_d) if y_c < y_d else (y_d, y_c)
+            x0, x1 = float(x0 if x0 < x_low else x_low), float(x1 if x1 > x_high else x_high)
+            y0, y1 = float(y0 if y0 < y_low else y_low), float(y1 if y1 > y_high else y_high)
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+        self.center_y = (y0 + y1) / 2
+        height = y1 - y0
+        self.height = height if height > 1e-6 else 1e-6
+        self.labels = labels  # 줄에 붙은 라벨 종류 ("total", "exclude", "weak")
+
+
+CENTER_Y = attrgetter("center_y")
+
+
+class LabelIndex:
+    """라벨이 붙은 줄을 세로 중심 순으로 정렬해 두고 주변 줄만 bisect로 찾음 (영수증마다 한 번 생성)"""
+
+    def __init__(self, lines):
+        self.lines = sorted(lines, key=CENTER_Y)
+        self.centers = [line.center_y for line in self.lines]
+        self.max_height = max([line.height for line in self.lines], default=0.0)
+
+    def near(self, center_y, height):
+        """세로 중심이 center_y인 줄과 같은 행이거나 바로 위(두 줄 높이 이내)일 수 있는 라벨 줄"""
+        limit = height if height > self.max_height else self.max_height
+        return self.lines[bisect_left(self.centers, center_y - 2 * limit):bisect_right(self.centers, center_y + 0.5 * limit)]
+
+
+def label_context(line, index):
+    """같은 행(세로 중심이 가까운 줄)과 바로 윗줄의 라벨을 모아 (결제 라벨 가점, 제외 라벨 여부) 반환"""
+    labels, center_y, height = line.labels, line.center_y, line.height
+    bonus = 4 if "total" in labels else 2 if "weak" in labels else 0
+    excluded = "exclude" in labels
+    for other in index.near(center_y, height):
+        if other is line:
+            continue
+        limit = height if height > other.height else other.height
+        gap = center_y - other.center_y
+        if -0.5 * limit <= gap <= 0.5 * limit:
+            if "total" in other.labels:
+                # 같은 행 왼쪽의 결제 라벨이 가장 강한 근거
+                if other.x1 <= line.x1 and bonus < 3.5:
+                    bonus = 3.5
+            elif "exclude" in other.labels:
+                excluded = True
+            elif bonus < 2:
+                bonus = 2
+        elif 0 < gap <= 2 * limit and bonus < 2 and "total" in other.labels \
+                and other.x0 <= line.x1 and line.x0 <= other.x1:
+            # 표 머리글 아래 값 형태
+            bonus = 2
+    return bonus, excluded
+
+
+def vertical_extent(boxes):
+    """영수증 전체의 (맨 위, 맨 아래) 세로 좌표 (OCRLine과 같은 기준, 상자가 없는 줄은 줄 순서)"""
+    top, bottom = float("inf"), float("-inf")
+    for index, box in enumerate(boxes):
+        if box is None:
+            box = ((0, index), (0, index), (0, index + 1), (0, index + 1))
+        (_, y_a), (_, y_b), (_, y_c), (_, y_d) = box
+        # 보통 위쪽 꼭짓점(a, b)이 위, 아래쪽(c, d)이 아래라서 그 비교를 먼저 함 (회전된 상자도 네 꼭짓점을 모두 비교)
+        if y_a < top:
+            top = y_a
+        if y_c > bottom:
+            bottom = y_c
+        if y_b < top:
+            top = y_b
+        if y_d > bottom:
+            bottom = y_d
+        if y_c < top:
+            top = y_c
+        if y_a > bottom:
+            bottom = y_a
+        if y_d < top:
+            top = y_d
+        if y_b > bottom:
+            bottom = y_b
+    return float(top), float(bottom)
+
+
+def valid_date_parts(year, month, day):
+    return 2000 <= year <= 2100 and 1 <= month <= 12 and 1 <= day <= 31
+
+
+def date_from_match(match):
+    """날짜 토큰이 유효하면 원문 문자열, 아니면 None (다시 split하지 않고 그룹 값 사용)"""
+    kind = match.lastgroup
+    year, month, day = map(int, match.group(*DATE_GROUPS[kind]))
+    if kind == "mdy":
+        year += 2000
+    return match.group(kind) if valid_date_parts(year, month, day) else None
+
+
+def extract_fields(results):
+    """OCR 결과를 한 번 훑어서 사업자번호, 가맹점명, 거래일시, 금액 추출
+
+    토큰/라벨 패턴은 줄을 이어 붙인 텍스트에 한 번만 돌리고, 좌표가 필요한 줄(라벨이 있는 줄, 점수를 매기는 금액 후보 줄)만 OCRLine으로 만듦
+    """
+    if results and isinstance(results[0], str):
+        # readtext(detail=0) 결과는 좌표 없이 문자열만 있음
+        texts, boxes = list(results), [None] * len(results)
+    else:
+        texts, boxes = [detection[1] for detection in results], [detection[0] for detection in results]
+    joined = LINE_SEPARATOR.join(texts)
+    starts, position = [], 0  # 줄마다 이어 붙인 텍스트 안의 시작 위치
+    for text in texts:
+        starts.append(position)
+        position += len(text) + len(LINE_SEPARATOR)
+
+    labels = {}  # 줄 번호 -> 라벨 종류
+    for match in LABEL_PATTERN.finditer(joined):
+        labels.setdefault(bisect_right(starts, match.start()) - 1, set()).add(match.lastgroup)
+    lines = {index: OCRLine(index, texts[index], boxes[index], kinds) for index, kinds in labels.items()}
+
+    business_numbers, dates, amounts = [], [], []
+    for match in TOKEN_PATTERN.finditer(joined):
+        kind = match.lastgroup
+        if kind == "amount":  # 가장 흔한 토큰이라 먼저 확인
+            raw = match.group("amount")
+            # 쉼표 없는 7자리 이상 숫자는 승인번호 같은 식별번호일 가능성이 큼
+            if "," not in raw and len(raw) >= 7:
+                continue
+            won = match.start("won") >= 0
+            amounts.append((int(raw.replace(",", "")), raw, won, bisect_right(starts, match.start()) - 1))
+        elif kind == "bizno":
+            business_numbers.append(match.group("bizno"))
+        else:
+            date = date_from_match(match)
+            if date:
+                dates.append(date)
+
+    return {
+        "사업자번호": business_numbers,
+        "가맹점명": STORE_NAME_PATTERN.findall(joined),
+        "거래일시": dates,
+        "금액": best_amount(amounts, lines, texts, boxes),
+    }
+
+
+def best_amount(amounts, lines, texts, boxes):
+    """점수(라벨과의 거리, 영수증 내 세로 위치, 표기 형식)가 가장 높은 금액, 같은 점수면 큰 금액
+
+    amounts는 (금액, 원문, '원' 접미사 여부, 줄 번호), lines는 라벨이 있는 줄 번호 -> OCRLine
+    (라벨 없는 금액 줄은 여기서 점수를 매길 때 OCRLine으로 만듦)
+    """
+    if not amounts:
+        return None
+    if len(amounts) == 1:
+        return amounts[0][0]
+    top, bottom = vertical_extent(boxes)
+    span = bottom - top
+    index = LabelIndex(lines.values())
+    line_scores = {}  # 같은 줄의 후보끼리는 줄 점수(라벨 문맥 + 세로 위치)를 한 번만 계산
+    best_score = best_value = None
+    for value, raw, won, line_index in amounts:
+        score = line_scores.get(line_index)
+        if score is None:
+            line = lines.get(line_index) or OCRLine(line_index, texts[line_index], boxes[line_index])
+            bonus, excluded = label_context(line, index)
+            score = bonus - 4 if excluded else bonus
+            # 결제 금액은 보통 영수증 아래쪽에 있음
+            if span > 0:
+                score += (line.center_y - top) / span
+            line_scores[line_index] = score
+
+        if "," in raw:
+            score += 1
+        if won:
+            score += 0.5
+        if value < MIN_AMOUNT or value >= MAX_AMOUNT:
+            score -= 3
+
+        if best_score is None or score > best_score or (score == best_score and value > best_value):
+            best_score, best_value = score, value
+    return best_value
@@ -0,0 +1,256 @@
+import logging
+import os
+
+import numpy as np
+
+# 예측 엔진 설정 (환경 변수로 조정): lstm, ridge, smoothing
+FORECAST_ENGINE = os.environ.get("FORECAST_ENGINE", "lstm")
+FORECAST_RIDGE_ALPHA = float(os.environ.get("FORECAST_RIDGE_ALPHA", "0.1"))
+FORECAST_LOOK_BACK = 12
+
+LSTM_MODEL_FILE = "model.h5"
+NUMPY_MODEL_FILE = "model.npz"
+
+
+def make_windows(data, look_back=FORECAST_LOOK_BACK):
+    """(월, 계정과목) 배열 -> 최근 look_back개월 입력 (N, look_back, K)과 다음 달 정답 (N, K)"""
+    data = np.asarray(data, dtype=float)
+    count = len(data) - look_back
+    if count <= 0:
+        return np.empty((0, look_back, data.shape[1])), np.empty((0, data.shape[1]))
+    # 복사 없이 슬라이딩 윈도우 뷰로 만든 뒤 한 번에 복사
+    windows = np.lib.stride_tricks.sliding_window_view(data, look_back, axis=0)[:count]
+    return np.ascontiguousarray(windows.transpose(0, 2, 1)), data[look_back:]
+
+
+def forecast_recursive(model, windows, steps):
+    """(N, look_back, K) 윈도우에서 steps개월 앞까지 예측 (N, steps, K)
+
+    한 달씩 예측값을 윈도우 끝에 붙여 다음 달을 예측하고, 단계마다 N개 시계열을 한 번의 predict로 처리
+    """
+    windows = np.array(windows, dtype=float)
+    outputs = np.empty((windows.shape[0], steps, windows.shape[2]))
+    for step in range(steps):
+        predicted = np.asarray(model.predict(windows, verbose=0), dtype=float)
+        outputs[:, step] = predicted
+        windows = np.concatenate([windows[:, 1:], predicted[:, None]], axis=1)
+    return outputs
+
+
+class Forecaster:
+    """스케일된 월별 행렬로 학습하고, (N, look_back, K) 입력마다 다음 달 (N, K)를 예측하는 엔진
+
+    predict(windows, verbose=0)는 Keras 모델과 같은 형태라 검증/예측 코드는 엔진과 상관없이 동작함
+    """
+
+    name = None
+
+    def __init__(self, look_back=FORECAST_LOOK_BACK):
+        self.look_back = look_back
+
+    def fit(self, scaled):
+        raise NotImplementedError
+
+    def predict(self, windows, verbose=0):
+        raise NotImplementedError
+
+    def save(self, directory):
+        raise NotImplementedError
+
+
+class NumpyForecaster(Forecaster):
+    """파라미터를 model.npz 하나로 저장하는 NumPy 엔진 공통 부분"""
+
+    def params(self):
+        raise NotImplementedError
+
+    def set_params(self, params):
+        raise NotImplementedError
+
+    def save(self, directory):
+        path = os.path.join(directory, NUMPY_MODEL_FILE)
+        with open(path, "wb") as f:
+            np.savez(f, engine=self.name, look_back=self.look_back, **self.params())
+        return path
+
+    def _training_windows(self, scaled):
+        windows, targets = make_windows(scaled, self.look_back)
+        if len(windows) == 0:
+            raise ValueError(f"학습 데이터가 부족합니다 ({len(scaled)}개월)")
+        return windows, targets
+
+
+class RidgeForecaster(NumpyForecaster):
+    """최근 look_back개월 값을 특징으로 하는 릿지 회귀 (모든 계정과목이 계수를 공유, 한 번의 선형 방정식으로 학습)"""
+
+    name = "ridge"
+
+    def __init__(self, look_back=FORECAST_LOOK_BACK, alpha=FORECAST_RIDGE_ALPHA):
+        super().__init__(look_back)
+        self.alpha = alpha
+        self.coef = None
+
+    @staticmethod
+    def _features(windows):
+        # (N, L, K) -> (N*K, L+1): 계정과목마다 자기 과거 값 + 절편
+        n, look_back, k = windows.shape
+        features = windows.transpose(0, 2, 1).reshape(n * k, look_back)
+        return np.hstack([features, np.ones((n * k, 1))])
+
+    def fit(self, scaled):
+        windows, targets = self._training_windows(scaled)
+        X = self._features(windows)
+        penalty = self.alpha * np.eye(X.shape[1])
+        penalty[-1, -1] = 0  # 절편은 규제하지 않음
+        self.coef = np.linalg.solve(X.T @ X + penalty, X.T @ targets.reshape(-1))
+        return self
+
+    def predict(self, windows, verbose=0):
+        windows = np.asarray(windows, dtype=float)
+        n, _, k = windows.shape
+        return np.clip(self._features(windows) @ self.coef, 0, None).reshape(n, k)
+
+    def params(self):
+        return {"alpha": self.alpha, "coef": self.coef}
+
+    def set_params(self, params):
+        self.alpha = float(params["alpha"])
+        self.coef = params["coef"]
+
+
+class SeasonalSmoothingForecaster(NumpyForecaster):
+    """계절 지수평활: (1-감마) x 평활 수준 + 감마 x 작년 같은 달 값 + 베타 x 추세
+
+    입력 윈도우가 12개월이면 첫 달이 예측할 달의 작년 같은 달이므로 계절 항을 윈도우 안에서 바로 구함.
+    파라미터는 격자 탐색 전체를 한 번의 벡터 연산으로 평가해서 고름
+    """
+
+    name = "smoothing"
+
+    ALPHAS = np.linspace(0.1, 0.9, 9)
+    BETAS = np.array([0.0, 0.5, 1.0])
+    GAMMAS = np.linspace(0.0, 1.0, 5)
+
+    def __init__(self, look_back=FORECAST_LOOK_BACK):
+        super().__init__(look_back)
+        self.alpha, self.beta, self.gamma = 0.5, 0.0, 0.0
+
+    def _level_weights(self, alphas):
+        # 단순 지수평활 재귀식을 풀어 쓴 가중치 (합이 1): (len(alphas), L)
+        alphas = np.asarray(alphas, dtype=float)[:, None]
+        powers = np.arange(self.look_back - 1, -1, -1)[None, :]
+        weights = alphas * (1 - alphas) ** powers
+        weights[:, 0] = (1 - alphas[:, 0]) ** (self.look_back - 1)
+        return weights
+
+    def _components(self, windows, alphas):
+        half = self.look_back // 2
+        level = np.einsum("al,nlk->ank", self._level_weights(alphas), windows)
+        trend = (windows[:, half:].mean(axis=1) - windows[:, :half].mean(axis=1)) / half
+        # 작년 같은 달 값
+        seasonal = windows[:, 0]
+        return level, trend, seasonal
+
+    def fit(self, scaled):
+        windows, targets = self._training_windows(scaled)
+        level, trend, seasonal = self._components(windows, self.ALPHAS)
+        gammas = self.GAMMAS[None, None, :, None, None]
+        # (알파, 베타, 감마, N, K) 전체 조합을 한 번에 계산
+        predicted = ((1 - gammas) * level[:, None, None]
+                     + gammas * seasonal
+                     + self.BETAS[None, :, None, None, None] * trend)
+        errors = ((np.clip(predicted, 0, None) - targets) ** 2).mean(axis=(3, 4))
+        a, b, g = np.unravel_index(np.argmin(errors), errors.shape)
+        self.alpha, self.beta, self.gamma = float(self.ALPHAS[a]), float(self.BETAS[b]), float(self.GAMMAS[g])
+        return self
+
+    def predict(self, windows, verbose=0):
+        windows = np.asarray(windows, dtype=float)
+        level, trend, seasonal = self._components(windows, [self.alpha])
+        return np.clip((1 - self.gamma) * level[0] + self.gamma * seasonal + self.beta * trend, 0, None)
+
+    def params(self):
+        return {"alpha": self.alpha, "beta": self.beta, "gamma": self.gamma}
+
+    def set_params(self, params):
+        self.alpha, self.beta, self.gamma = (float(params[key]) for key in ("alpha", "beta", "gamma"))
+
+
+class LSTMForecaster(Forecaster):
+    """기존 Keras LSTM 모델 (TensorFlow는 이 엔진을 쓸 때만 import)"""
+
+    name = "lstm"
+
+    def __init__(self, look_back=FORECAST_LOOK_BACK, model=None):
+        super().__init__(look_back)
+        self.model = model
+
+    def fit(self, scaled, epochs=100):
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense, Dropout
+
+        X, y = make_windows(scaled, self.look_back)
+
+        # 훈련 데이터와 테스트 데이터 분리
+        train_size = int(len(X) * 0.8)
+        X_train, X_test = X[:train_size], X[train_size:]
+        y_train, y_test = y[:train_size], y[train_size:]
+
+        # 모델 생성
+        model = Sequential([
+            LSTM(50, return_sequences=True, input_shape=X_train.shape[1:]),
+            Dropout(0.2),
+            LSTM(50),
+            Dropout(0.2),
+            Dense(y_train.shape[1])  # 각 계정과목별로 예측
+        ])
+        model.compile(optimizer='adam', loss='mean_squared_error')
+
+        # 모델 훈련
+        model.fit(X_train, y_train, epochs=epochs, batch_size=16, validation_data=(X_test, y_test), verbose=0)
+        self.model = model
+        return self
+
+    def predict(self, windows, verbose=0):
+        return self.model.predict(np.asarray(windows, dtype=float), verbose=verbose)
+
+    def save(self, directory):
+        path = os.path.join(directory, LSTM_MODEL_FILE)
+        self.save_file(path)
+        return path
+
+    def save_file(self, path):
+        self.model.save(path)
+
+    @classmethod
+    def load_file(cls, path):
+        from tensorflow.keras.models import load_model
+
+        return cls(model=load_model(path))
+
+
+ENGINES = {
+    RidgeForecaster.name: RidgeForecaster,
+    SeasonalSmoothingForecaster.name: SeasonalSmoothingForecaster,
+    LSTMForecaster.name: LSTMForecaster,
+}
+
+
+def create_forecaster(engine=None, **kwargs):
+    engine = engine or FORECAST_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"알 수 없는 예측 엔진: {engine} (사용 가능: {', '.join(ENGINES)})")
+    return ENGINES[engine](**kwargs)
+
+
+def load_forecaster(directory):
+    """버전 디렉터리에 저장된 엔진 로드 (model.npz가 있으면 NumPy 엔진, 없으면 Keras 모델)"""
+    npz_path = os.path.join(directory, NUMPY_MODEL_FILE)
+    if os.path.exists(npz_path):
+        with np.load(npz_path) as data:
+            params = {key: data[key] for key in data.files}
+        forecaster = create_forecaster(str(params.pop("engine")), look_back=int(params.pop("look_back")))
+        forecaster.set_params(params)
+        return forecaster
+    logging.info(f"Keras 모델 로드: {directory}")
+    return LSTMForecaster.load_file(os.path.join(directory, LSTM_MODEL_FILE))
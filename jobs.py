@@ -0,0 +1,230 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+import uuid
+
+import httpx
+
+import shared_state
+
+# 작업 큐 설정 (환경 변수로 조정)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "100"))
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", "3600"))
+JOB_WEBHOOK_TIMEOUT = float(os.environ.get("JOB_WEBHOOK_TIMEOUT", "5"))
+
+# 숫자가 작을수록 먼저 처리
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+class JobQueueFull(Exception):
+    """대기열이 가득 차서 작업을 받을 수 없는 경우"""
+
+
+class Job:
+    def __init__(self, handler, priority="normal", webhook_url=None):
+        self.id = uuid.uuid4().hex
+        self.handler = handler
+        self.priority = priority
+        self.webhook_url = webhook_url
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.stages = {}  # 단계별 소요 시간(ms)
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.task = None
+        self.cancel_requested = False
+        self.publish_lock = asyncio.Lock()  # 상태 기록이 작업 스레드에서 순서가 뒤바뀌지 않도록
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "result": self.result,
+            "error": self.error,
+            "stages_ms": self.stages,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """프로세스 안에서 도는 우선순위 작업 큐와 고정 개수의 작업자
+
+    store(shared_state.SharedStore)가 있으면 상태가 바뀔 때마다 기록해서 다른 워커 프로세스도 조회할 수 있음
+    (취소는 작업을 받은 워커에서만 가능). SQLite 잠금 대기가 이벤트 루프를 막지 않도록 저장소는 작업 스레드에서 사용
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE, result_ttl=JOB_RESULT_TTL, store=None):
+        self.worker_count = workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self.store = store if store is not None else shared_state.shared_store()
+        self.jobs = {}
+        self._queue = None
+        self._pending = 0  # 대기 중인 작업 수 (대기 중에 취소된 작업은 큐에 남아도 세지 않음)
+        self._workers = []
+        self._sequence = itertools.count()
+        self._webhook_client = None
+        self._stage_totals = {}
+        self._stage_counts = {}
+        self.rejected = 0
+        self._pruned_at = 0.0
+
+    def start(self):
+        # 대기 중에 취소된 작업이 자리를 차지하지 않도록 크기 제한은 큐가 아니라 _pending으로 확인
+        self._queue = asyncio.PriorityQueue()
+        self._webhook_client = httpx.AsyncClient(timeout=JOB_WEBHOOK_TIMEOUT)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+        if self._webhook_client is not None:
+            await self._webhook_client.aclose()
+
+    async def submit(self, handler, priority="normal", webhook_url=None):
+        """handler(job)를 실행할 작업 등록 (대기열이 가득 차면 JobQueueFull)"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"알 수 없는 우선순위: {priority}")
+        await self._prune()
+        if self._pending >= self.max_queue:
+            self.rejected += 1
+            raise JobQueueFull("작업 대기열이 가득 찼습니다.")
+        job = Job(handler, priority, webhook_url)
+        self._queue.put_nowait((PRIORITIES[priority], next(self._sequence), job))
+        self._pending += 1
+        self.jobs[job.id] = job
+        await self._publish(job)
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    async def lookup(self, job_id):
+        """작업 상태 dict (이 프로세스에 없으면 공유 저장소에서 찾음, 없으면 None)"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.store is not None:
+            return await asyncio.to_thread(self.store.get, "job", job_id, self.result_ttl)
+        return None
+
+    async def _publish(self, job):
+        if self.store is None:
+            return
+        async with job.publish_lock:
+            try:
+                await asyncio.to_thread(self.store.set, "job", job.id, job.to_dict())
+            except Exception as e:
+                logging.warning(f"작업 {job.id} 상태 공유 실패: {e}")
+
+    async def cancel(self, job_id):
+        """대기 중이면 건너뛰게 하고, 실행 중이면 작업을 취소"""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_requested = True
+        if job.status == "queued":
+            # 큐 항목은 작업자가 꺼낼 때 건너뛰고, 대기열 자리는 바로 돌려줌
+            self._pending -= 1
+            await self._finish(job, "cancelled")
+        elif job.task is not None:
+            job.task.cancel()
+        return job
+
+    async def _prune(self):
+        # 결과 보관 기간이 지난 작업 정리
+        expired_before = time.time() - self.result_ttl
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < expired_before]:
+            del self.jobs[job_id]
+        if self.store is not None and time.time() - self._pruned_at > 3600:
+            self._pruned_at = time.time()
+            try:
+                await asyncio.to_thread(self.store.prune, "job", self.result_ttl)
+            except Exception as e:
+                logging.warning(f"공유 저장소 작업 정리 실패: {e}")
+
+    def record_stage(self, job, stage, seconds):
+        elapsed = round(seconds * 1000, 3)
+        job.stages[stage] = elapsed
+        self._stage_totals[stage] = self._stage_totals.get(stage, 0.0) + elapsed
+        self._stage_counts[stage] = self._stage_counts.get(stage, 0) + 1
+
+    async def _finish(self, job, status, result=None, error=None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        # 핸들러는 업로드 바이트 전체를 참조하므로 결과 보관 기간 동안 붙잡고 있지 않음
+        job.handler = None
+        await self._publish(job)
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                if job.status != "queued":
+                    continue  # 대기 중에 취소된 작업
+                self._pending -= 1
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job):
+        job.status = "running"
+        job.started_at = time.time()
+        await self._publish(job)
+        self.record_stage(job, "queue_wait", job.started_at - job.created_at)
+
+        job.task = asyncio.create_task(job.handler(job))
+        if job.cancel_requested:
+            job.task.cancel()  # 작업을 시작하는 사이에 취소 요청이 들어온 경우
+        try:
+            result = await job.task
+            await self._finish(job, "done", result=result)
+        except asyncio.CancelledError:
+            if not job.cancel_requested:
+                raise  # 작업자 자체가 종료되는 경우
+            await self._finish(job, "cancelled")
+        except Exception as e:
+            logging.error(f"작업 {job.id} 처리 중 오류 발생: {e}")
+            await self._finish(job, "failed", error=str(e))
+        finally:
+            job.task = None
+            self.record_stage(job, "total", job.finished_at - job.created_at if job.finished_at else 0)
+
+        if job.webhook_url:
+            await self._notify(job)
+
+    async def _notify(self, job):
+        try:
+            await self._webhook_client.post(job.webhook_url, json=job.to_dict())
+        except Exception as e:
+            logging.warning(f"작업 {job.id} 웹훅 전송 실패: {e}")
+
+    def stats(self):
+        statuses = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "queue_depth": self._pending,
+            "max_queue": self.max_queue,
+            "workers": self.worker_count,
+            "rejected": self.rejected,
+            "jobs": statuses,
+            "avg_stage_ms": {
+                stage: round(total / self._stage_counts[stage], 3) for stage, total in self._stage_totals.items()
+            },
+        }
@@ -0,0 +1,51 @@
+import json
+import logging
+import os
+
+# 로그 설정 (환경 변수로 조정): LOG_FORMAT은 text 또는 json
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")
+
+logger = logging.getLogger("shcrm")
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 하나 (event()로 넘긴 필드는 최상위 키로 들어감)"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """기본 텍스트 형식 뒤에 key=value 필드를 붙임"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+def configure(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    logging.basicConfig(level=level, handlers=[handler], force=True)
+
+
+def event(level, name, **fields):
+    """구조화 로그 한 줄 (해당 레벨이 꺼져 있으면 문자열을 만들지 않음)"""
+    if logger.isEnabledFor(level):
+        logger.log(level, name, extra={"fields": fields})
@@ -1,156 +1,618 @@
-import tempfile
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-from predict import get_november_prediction, get_actual_november_data, load_or_train_model
-from service import ImageProcessor
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from amount_of_use import get_monthly_data
+from startup import Readiness, READY, FAILED, DISABLED, READY_DB_TIMEOUT
+from typing import List, Optional
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
+from fastapi import responses
+from fastapi.routing import APIRoute
+from starlette.formparsers import MultiPartException, MultiPartParser
+from model_registry import ModelRegistry
+from training import TrainingScheduler
+from service import ImageProcessor, OCR_BATCH_SIZE
+from preprocess import ImagePreprocessor
+from archive import ImageArchiver
+from result_cache import ReceiptResultCache
+from ocr_pool import OCRReaderPool, OCRPoolSaturated
+from bizno_cache import BiznoLookupCache
+from bizno_lookup import create_lookup_backend, BIZNO_BACKEND
+from browser_pool import WebDriverPool
+from monthly_aggregates import MonthlyAggregateStore
+from category_classifier import CategoryClassifier
+from jobs import JobQueue, JobQueueFull, PRIORITIES
+import database
+import logs
+import metrics
+import shared_state
 import logging
 import os
 import asyncio
+import time
+from contextlib import aclosing
+from datetime import date
+from urllib.parse import urlsplit
 
 app = FastAPI()
 
-logging.basicConfig(level=logging.INFO)
+# LOG_LEVEL, LOG_FORMAT(text/json)으로 조정
+logs.configure()
 
-chrome_options = Options()
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
+class JSONResponse(responses.JSONResponse):
+    """응답 본문 직렬화 시간을 serialize 단계로 기록하는 JSONResponse"""
 
-# Global driver initialization
-driver = None
+    def render(self, content):
+        with metrics.stage_timer("serialize"):
+            return super().render(content)
+
+# 업로드 크기 제한과 읽기 단위
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+# /extract/batch 요청 본문 전체의 크기 제한
+MAX_BATCH_UPLOAD_BYTES = int(os.environ.get("MAX_BATCH_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+# /extract/batch 한 요청의 파일 수와 batch_size 상한 (넘으면 각각 413, 422)
+MAX_BATCH_FILES = int(os.environ.get("MAX_BATCH_FILES", "32"))
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "16"))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# multipart 경계/헤더 여유분
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+class UploadParser(MultiPartParser):
+    """한도 이하의 업로드 파일을 임시 파일로 옮기지 않고 메모리에 두는 multipart 파서
+
+    starlette 기본 파서는 1MB가 넘는 파일을 임시 파일로 옮김. 본문 크기는 아래 UploadSizeLimit이 받는 중에 제한하므로
+    요청 하나가 메모리에 올리는 양은 한도 이하 (전역 MultiPartParser 설정은 건드리지 않음)
+    """
+
+    spool_max_size = max(MultiPartParser.spool_max_size, MAX_UPLOAD_BYTES)
+
+class UploadRequest(Request):
+    """multipart 본문을 UploadParser로 읽는 Request"""
+
+    async def _get_form(self, *, max_files=1000, max_fields=1000, max_part_size=1024 * 1024):
+        content_type = self.headers.get("content-type", "").split(";")[0].strip().lower()
+        if self._form is None and content_type == "multipart/form-data":
+            try:
+                async with aclosing(self.stream()) as stream:
+                    parser = UploadParser(
+                        self.headers, stream, max_files=max_files, max_fields=max_fields, max_part_size=max_part_size
+                    )
+                    self._form = await parser.parse()
+            except MultiPartException as exc:
+                raise HTTPException(status_code=400, detail=exc.message)
+        return await super()._get_form(max_files=max_files, max_fields=max_fields, max_part_size=max_part_size)
+
+class UploadRoute(APIRoute):
+    """요청마다 UploadRequest로 바꿔서 처리하는 라우트"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def upload_route_handler(request):
+            return await handler(UploadRequest(request.scope, request.receive))
+
+        return upload_route_handler
+
+app.router.route_class = UploadRoute
+
+class UploadSizeLimit:
+    """업로드 경로의 요청 본문 크기를 받는 중에 제한하는 ASGI 미들웨어
+
+    Content-Length가 한도를 넘으면 본문을 읽기 전에, chunked 전송이면 받은 바이트가 한도를 넘는 즉시 413으로 응답하고
+    앱에는 연결 종료를 전달해서 multipart 파서가 나머지를 받지 않도록 함
+    """
+
+    def __init__(self, app, limits):
+        self.app = app
+        self.limits = limits  # 경로 -> 본문 최대 바이트
+
+    @staticmethod
+    async def reject(scope, receive, send):
+        response = JSONResponse(status_code=413, content={"detail": "업로드 파일이 너무 큽니다."}, headers={"Connection": "close"})
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self.reject(scope, receive, send)
+            return
+
+        received, rejected, started = 0, False, False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    rejected = True
+                    if not started:
+                        await self.reject(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if rejected:
+                return  # 이미 413으로 응답함
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # 끊긴 본문을 읽다가 난 오류는 이미 413으로 응답했으므로 무시
+            if not rejected:
+                raise
+
+app.add_middleware(UploadSizeLimit, limits={
+    "/extract": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    "/extract/jobs": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    "/extract/batch": MAX_BATCH_UPLOAD_BYTES,
+})
+
+# 조회마다 하나씩 빌려 쓰는 ChromeDriver 풀
+browser_pool = WebDriverPool()
+
+# 사업자번호 업종 조회 백엔드 (startup에서 생성)
+lookup_backend = None
+
+# 프로세스 전체에서 공유하는 OCR Reader 풀
+ocr_pool = OCRReaderPool()
+
+# OCR 전 이미지 전처리 (축소, 흑백 변환, 영수증 영역 자르기, 기울기 보정)
+preprocessor = ImagePreprocessor()
+
+# 영수증 원본을 백그라운드에서 저장하는 보관소
+archiver = ImageArchiver()
+
+# 같은 영수증 재업로드 시 결과를 재사용하는 캐시
+result_cache = ReceiptResultCache()
+
+# 업종명 -> 카테고리 역색인 (category_mapping.json이 바뀌면 다시 읽음)
+category_classifier = CategoryClassifier()
+
+# 사업자번호 업종 조회 캐시
+bizno_cache = BiznoLookupCache()
+
+# 예측 모델/스케일러를 메모리에 유지하는 레지스트리
+model_registry = ModelRegistry()
+
+# 월별 합계를 증분으로 유지하는 집계 저장소
+monthly_store = MonthlyAggregateStore()
+
+# 별도 프로세스에서 모델을 재학습하고 버전별로 저장하는 스케줄러
+training_scheduler = TrainingScheduler(model_registry)
+
+# /extract/jobs 요청을 받아 백그라운드에서 처리하는 작업 큐
+job_queue = JobQueue()
+
+# 구성 요소별 준비 상태 (/readyz)
+readiness = Readiness()
+
+# 여러 워커로 실행 중이면(SHARED_CACHE=1) 워커별 지표를 공유 저장소로 모아서 /metrics에 worker 라벨로 출력
+metrics_store = shared_state.shared_store()
+shared_metrics = metrics.SharedMetrics(metrics_store) if metrics_store is not None else None
+
+async def ping_database():
+    await asyncio.wait_for(database.run_async(database.ping), timeout=READY_DB_TIMEOUT)
+
+async def warm_model():
+    if await asyncio.to_thread(model_registry.get_or_load) is None:
+        raise RuntimeError("서비스 중인 모델이 없습니다.")
 
 @app.on_event("startup")
 async def startup():
-    global driver
-    try:
-        # ChromeDriver 초기화
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        logging.info("ChromeDriver가 시작되었습니다.")
-    except Exception as e:
-        logging.error(f"ChromeDriver 시작 중 오류 발생: {str(e)}")
+    global lookup_backend
+    readiness.mark_app_imported()
+    # 조회 백엔드는 바로 생성하고, 무거운 구성 요소는 백그라운드에서 준비
+    # (OCR Reader와 ChromeDriver는 하나씩 준비되는 대로 요청을 받음)
+    lookup_backend = create_lookup_backend(browser_pool)
+    logging.info(f"사업자번호 조회 백엔드: {lookup_backend.name}")
+    if BIZNO_BACKEND == "selenium":
+        # ChromeDriver만으로 조회하는 경우 풀이 떠야 조회 가능
+        await readiness.warm("lookup", browser_pool.start)
+    else:
+        readiness.set("lookup", READY)
+        # selenium 백엔드를 쓰는 경우에만 ChromeDriver 풀 시작
+        if "selenium" in BIZNO_BACKEND:
+            await readiness.warm("browser", browser_pool.start)
+        else:
+            readiness.set("browser", DISABLED)
+    await readiness.warm("ocr", ocr_pool.start)
+    await readiness.warm("database", ping_database)
+    await readiness.warm("model", warm_model)
+    model_registry.start()
+    training_scheduler.start()
+    monthly_store.start()
+    job_queue.start()
+    if shared_metrics is not None:
+        shared_metrics.start(metrics.registry)
 
 @app.on_event("shutdown")
 async def shutdown():
-    global driver
-    if driver:
-        driver.quit()
-        logging.info("ChromeDriver가 종료되었습니다.")
-
-CATEGORY_MAPPING = {
-    '교통비': [
-        '육상 여객 운송업', '항공 여객 운송업', '택시 운송업', 
-        '주유소 운영업', '자동차 임대업', '시외버스 운송업'
-    ],
-    '소모품비': [
-        '도매 및 소매업', '문구 소매업', '컴퓨터 및 주변기기 소매업', 
-        '전기 용품 소매업'
-    ],
-    '복리후생비': [
-        '음식점업', '일반 병원', '치과 병원', '레저업', '운동시설 운영업', 
-        '화초 및 식물 소매업', '한식 음식점업', '중식 음식점업', 
-        '일식 음식점업', '서양식 음식점업', '기타 외국식 음식점업', 
-        '주점업', '다방업', '비알콜 음료점업', '호텔업', '기타 음식점업',
-        '의약품 및 의료용품 소매업', '한식 일반 음식점업'
-    ],
-    '교육훈련비': [
-        '기타 교육기관', '서적 소매업', '온라인 교육 서비스업', 
-        '서적 및 문구용품 소매업', '서적', '신문 및 잡지류 소매업','서적, 신문 및 잡지류 소매업'
-    ],
-    '관리비': [
-        '부동산 임대업', '자동차 임대업', '산업용 기계 및 장비 임대업', 
-        '컴퓨터 및 주변기기 소매업', '신용카드업', '여신 금융업', 
-        '기타 금융지원 서비스업', '기타 개인 서비스업', '유선 통신업', 
-        '무선 통신업', '우편업', '택배업'
-    ]
-}
-
-def get_category_from_detailed_category(detailed_category):
-    category_mapping = {
-        '교통비': 2,
-        '소모품비': 5,
-        '복리후생비': 3,
-        '교육훈련비': 4,
-        '관리비': 1
+    await readiness.stop()
+    if shared_metrics is not None:
+        await shared_metrics.stop()
+    await job_queue.stop()
+    await monthly_store.stop()
+    await training_scheduler.stop()
+    await model_registry.stop()
+    await ocr_pool.close()
+    bizno_cache.close()
+    if lookup_backend:
+        await lookup_backend.close()
+    await browser_pool.close()
+    database.dispose()
+    archiver.close()
+
+def build_extract_result(info_dict, category_keywords, img_url):
+    """OCR 결과와 카테고리 키워드로 /extract 응답 생성"""
+    result = {
+        "OCR_결과": {
+            "사업자번호": info_dict.get("사업자번호", []),
+            "가맹점명": info_dict.get("가맹점명", []),
+            "거래일시": info_dict.get("거래일시", []),
+            "금액": info_dict.get("금액", 0)
+        },
+        "카테고리_키워드": category_keywords or {},  # 카테고리 키워드가 없을 경우 빈 딕셔너리
+        "이미지_URL": img_url
     }
-    
-    for category, keywords in CATEGORY_MAPPING.items():
-        if detailed_category in keywords:
-            category_name = category
-            category_id = category_mapping.get(category_name, None)
-            return {"categoryId": category_id, "categoryName": category_name}
-    
-    return {"categoryId": None, "categoryName": "기타"}
+
+    # 사업자번호별로 세세분류 -> 세분류 -> 소분류 -> 중분류 순서로 분류하고,
+    # '기타'가 아닌 결과가 있으면 그 중 마지막 것을 최상위 카테고리로 사용
+    with metrics.stage_timer("classify"):
+        categories = list(category_classifier.classify_many(category_keywords).values())
+    if categories:
+        matched = [category for category in categories if category["categoryId"] is not None]
+        result["카테고리"] = (matched or categories)[-1]  # 카테고리 정보만 담도록 설정
+
+    return result
+
+async def read_upload(file):
+    """업로드를 조각 단위로 읽음 (MAX_UPLOAD_BYTES 초과 시 413)
+
+    요청 본문은 UploadSizeLimit이 받는 중에 제한하고, 한도 이하의 파일은 파서가 메모리에 둔 것을 그대로 읽음
+    """
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="업로드 파일이 너무 큽니다.")
+
+    chunks, size = [], 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="업로드 파일이 너무 큽니다.")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+async def process_receipt(data, filename, record_stage=None):
+    """영수증 한 장의 OCR, 업종 조회, 카테고리 분류 (record_stage(단계, 초)로 단계별 시간 전달)"""
+    # 조회 백엔드와 OCR Reader 풀은 이미 startup에서 초기화됨
+    processor = ImageProcessor(lookup_backend, ocr_pool, bizno_cache, preprocessor, archiver)
+    started = time.perf_counter()
+
+    def mark(stage):
+        nonlocal started
+        now = time.perf_counter()
+        if record_stage:
+            record_stage(stage, now - started)
+        started = now
+
+    # 비동기적으로 OCR 처리 및 카테고리 키워드 추출
+    info_dict, img_url = await processor.process_image(data, filename)
+    business_numbers = info_dict.get("사업자번호", [])
+    mark("ocr")
+
+    # 카테고리 키워드 추출 (비동기)
+    category_keywords = await processor.extract_category_keywords(business_numbers)
+    mark("lookup")
+
+    # 최종 결과 생성
+    result = build_extract_result(info_dict, category_keywords, img_url)
+    mark("classify")
+    return result
 
 @app.post("/extract")
 async def extract_data(file: UploadFile = File(...)):
     try:
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file.write(await file.read())  # 파일 저장
-            image_path = temp_file.name
-
-        # Selenium driver 인스턴스는 이미 startup에서 초기화됨
-        processor = ImageProcessor(driver)
-
-        # 비동기적으로 OCR 처리 및 카테고리 키워드 추출
-        info_dict, img_url = await processor.process_image(image_path)
-        business_numbers = info_dict.get("사업자번호", [])
-
-        # 카테고리 키워드 추출 (비동기)
-        category_keywords = await processor.extract_category_keywords(business_numbers)
-
-        # 최종 결과 생성
-        result = {
-            "OCR_결과": {
-                "사업자번호": info_dict.get("사업자번호", []),
-                "가맹점명": info_dict.get("가맹점명", []),
-                "거래일시": info_dict.get("거래일시", []),
-                "금액": info_dict.get("금액", 0)
-            },
-            "카테고리_키워드": category_keywords or {},  # 카테고리 키워드가 없을 경우 빈 딕셔너리
-            "이미지_URL": img_url
-        }
-
-        # 세세분류를 기반으로 최상위 카테고리 설정
-        for biz_num, keywords in category_keywords.items():
-            detailed_category = keywords.get("세세분류")
-            if detailed_category:
-                category = get_category_from_detailed_category(detailed_category)
-                result["카테고리"] = category  # 카테고리 정보만 담도록 설정
-
-        os.remove(image_path)  # 처리 후 파일 삭제
-        logging.info(f"파일 '{image_path}' 처리 완료 및 삭제됨.")
+        # 임시 파일 없이 업로드 버퍼에서 바로 처리
+        data = await read_upload(file)
+
+        # 같은 이미지를 다시 올리면 이전 결과를 그대로 사용
+        result, duplicate = await result_cache.get_or_compute(
+            data, lambda: process_receipt(data, file.filename), archive=lambda: archiver.archive(data, file.filename)
+        )
+        result["중복_업로드"] = duplicate
+
+        logs.event(logging.INFO, "extract_done", filename=file.filename, duplicate=duplicate)
 
         return JSONResponse(content=result)
 
+    except HTTPException:
+        raise
+    except OCRPoolSaturated as e:
+        logging.warning(f"OCR 풀 포화: {e}")
+        raise HTTPException(status_code=503, detail="OCR 처리 요청이 많습니다. 잠시 후 다시 시도해주세요.")
     except Exception as e:
         logging.error(f"오류 발생: {e}")
         raise HTTPException(status_code=500, detail="데이터 추출에 실패했습니다.")
 
+@app.post("/extract/batch")
+async def extract_batch(files: List[UploadFile] = File(...),
+                        batch_size: int = Query(min(OCR_BATCH_SIZE, MAX_BATCH_SIZE), ge=1, le=MAX_BATCH_SIZE)):
+    try:
+        if len(files) > MAX_BATCH_FILES:
+            raise HTTPException(status_code=413, detail=f"한 번에 최대 {MAX_BATCH_FILES}개 파일까지 처리할 수 있습니다.")
+        for file in files:
+            if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="업로드 파일이 너무 큽니다.")
+        uploads = [(file, file.filename) for file in files]
+        processor = ImageProcessor(lookup_backend, ocr_pool, bizno_cache, preprocessor, archiver)
+
+        # batch_size 단위 묶음을 OCR 풀의 Reader들에 나눠 동시에 처리 (파일은 묶음 차례가 오면 읽음)
+        outputs = await processor.process_images(uploads, batch_size=batch_size, read=read_upload)
+
+        results = []
+        for (_, filename), output in zip(uploads, outputs):
+            if isinstance(output, Exception):
+                # 파일별 실패는 해당 파일의 오류로만 기록하고 나머지는 계속 처리
+                logging.error(f"파일 '{filename}' 처리 중 오류 발생: {output}")
+                results.append({"파일명": filename, "오류": "데이터 추출에 실패했습니다."})
+                continue
+
+            info_dict, img_url = output
+            try:
+                category_keywords = await processor.extract_category_keywords(info_dict.get("사업자번호", []))
+            except Exception as e:
+                logging.error(f"파일 '{filename}' 카테고리 추출 중 오류 발생: {e}")
+                category_keywords = {}
+            results.append({"파일명": filename, **build_extract_result(info_dict, category_keywords, img_url)})
+
+        return JSONResponse(content={"결과": results})
+
+    except HTTPException:
+        raise
+    except OCRPoolSaturated as e:
+        logging.warning(f"OCR 풀 포화: {e}")
+        raise HTTPException(status_code=503, detail="OCR 처리 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+    except Exception as e:
+        logging.error(f"배치 처리 중 오류 발생: {e}")
+        raise HTTPException(status_code=500, detail="데이터 추출에 실패했습니다.")
+
+@app.post("/extract/jobs", status_code=202)
+async def submit_extract_job(file: UploadFile = File(...), priority: str = "normal", webhook_url: Optional[str] = None):
+    # webhook_url을 주면 작업이 끝난 뒤 이 서버가 그 주소로 작업 상태를 POST함 (외부 네트워크로 나가는 요청이므로
+    # 방화벽/프록시에서 서버의 외부 요청이 허용되어 있어야 함)
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"priority는 {', '.join(PRIORITIES)} 중 하나여야 합니다.")
+    if webhook_url is not None:
+        parts = urlsplit(webhook_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise HTTPException(status_code=400, detail="webhook_url은 http 또는 https 주소여야 합니다.")
+    data = await read_upload(file)
+    filename = file.filename
+
+    async def handler(job):
+        record_stage = lambda stage, seconds: job_queue.record_stage(job, stage, seconds)
+        result, duplicate = await result_cache.get_or_compute(
+            data, lambda: process_receipt(data, filename, record_stage), archive=lambda: archiver.archive(data, filename)
+        )
+        result["중복_업로드"] = duplicate
+        logs.event(logging.INFO, "extract_job_done", job_id=job.id, filename=filename, duplicate=duplicate)
+        return result
+
+    try:
+        job = await job_queue.submit(handler, priority=priority, webhook_url=webhook_url)
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="처리 대기 중인 작업이 많습니다. 잠시 후 다시 시도해주세요.")
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/extract/jobs")
+async def extract_jobs_status():
+    # 대기열 길이, 상태별 작업 수, 단계별 평균 소요 시간
+    return JSONResponse(content=job_queue.stats())
+
+@app.get("/extract/jobs/{job_id}")
+async def get_extract_job(job_id: str):
+    # 여러 워커로 실행 중이면 다른 워커가 받은 작업도 공유 저장소에서 조회
+    job = await job_queue.lookup(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return JSONResponse(content=job)
+
+@app.delete("/extract/jobs/{job_id}")
+async def cancel_extract_job(job_id: str):
+    job = await job_queue.cancel(job_id)
+    if job is None:
+        shared = await job_queue.lookup(job_id)
+        if shared is None:
+            raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+        if shared["status"] in ("queued", "running"):
+            raise HTTPException(status_code=409, detail="다른 워커 프로세스에서 처리 중인 작업은 취소할 수 없습니다.")
+        return JSONResponse(content={"job_id": job_id, "status": shared["status"]})
+    return JSONResponse(content={"job_id": job.id, "status": job.status})
+
+@app.middleware("http")
+async def measure_request(request: Request, call_next):
+    """요청별 처리 시간/상태 코드 기록, 설정된 경우 샘플링 프로파일러 연결"""
+    profiler = metrics.SamplingProfiler().start() if metrics.should_profile(request.headers) else None
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        seconds = time.perf_counter() - started
+        # 경로 변수 대신 라우트 템플릿을 라벨로 사용 (작업 ID마다 시계열이 생기지 않도록)
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.http_request_seconds.observe(seconds, method=request.method, route=route)
+        metrics.http_requests.inc(method=request.method, route=route, status=status)
+        if profiler is not None:
+            path = metrics.finish_profile(profiler, route, seconds)
+            if path:
+                logs.event(logging.WARNING, "slow_request_profiled", route=route, ms=round(seconds * 1000, 1),
+                           samples=profiler.samples, path=path)
+
+@metrics.registry.collector
+def collect_service_metrics():
+    """/metrics 요청 시 각 구성 요소의 stats()를 읽어 캐시 카운터와 풀/큐 게이지로 변환"""
+    result_stats = result_cache.stats()
+    bizno_stats = bizno_cache.stats()
+    ocr_stats = ocr_pool.stats()
+    browser_stats = browser_pool.stats()
+    job_stats = job_queue.stats()
+    db_stats = database.stats()
+    return [
+        ("shcrm_cache_events_total", "counter", "캐시 조회 결과별 횟수", [
+            *(({"cache": "result", "result": key}, result_stats[key]) for key in ("hits", "near_hits", "disk_hits", "coalesced", "misses")),
+            *(({"cache": "bizno", "result": key}, bizno_stats[key])
+              for key in ("memory_hits", "disk_hits", "negative_hits", "misses", "refreshes", "coalesced")),
+            *(({"cache": "category", "result": key}, category_classifier.counters[key])
+              for key in ("exact", "normalized", "fuzzy", "default")),
+        ]),
+        ("shcrm_rejected_total", "counter", "포화/대기열 초과로 거절한 요청 수", [
+            ({"pool": "ocr"}, ocr_stats["rejected"]),
+            ({"pool": "jobs"}, job_stats["rejected"]),
+        ]),
+        ("shcrm_browser_events_total", "counter", "ChromeDriver 재시작/비정상 종료 수", [
+            ({"event": "recycled"}, browser_stats["recycled"]),
+            ({"event": "crashed"}, browser_stats["crashed"]),
+        ]),
+        ("shcrm_pool_size", "gauge", "풀 크기", [
+            ({"pool": "ocr"}, ocr_stats["size"]),
+            ({"pool": "browser"}, browser_stats["size"]),
+            ({"pool": "db"}, db_stats["pool_size"]),
+        ]),
+        ("shcrm_pool_in_use", "gauge", "사용 중인 풀 자원 수", [
+            ({"pool": "ocr"}, ocr_stats["in_use"]),
+            ({"pool": "browser"}, browser_stats["in_use"]),
+            ({"pool": "db"}, db_stats["checked_out"]),
+        ]),
+        ("shcrm_queue_depth", "gauge", "대기 중인 요청/작업 수", [
+            ({"queue": "ocr"}, ocr_stats["waiting"]),
+            ({"queue": "jobs"}, job_stats["queue_depth"]),
+            ({"queue": "archive"}, archiver.stats()["pending"]),
+            ({"queue": "result_cache_inflight"}, result_stats["inflight"]),
+            ({"queue": "bizno_inflight"}, bizno_stats["inflight"]),
+        ]),
+        ("shcrm_cache_entries", "gauge", "캐시 항목 수", [
+            ({"cache": "result"}, result_stats["entries"]),
+            ({"cache": "bizno"}, bizno_stats["memory_entries"]),
+        ]),
+        ("shcrm_component_ready", "gauge", "구성 요소 준비 여부 (1이면 준비됨)", [
+            ({"component": name}, int(component.state == READY)) for name, component in readiness.components.items()
+        ]),
+    ]
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus 텍스트 형식 지표 (여러 워커로 실행 중이면 모든 워커의 지표를 worker 라벨로 구분)"""
+    if shared_metrics is None:
+        text = metrics.registry.render()
+    else:
+        text = await asyncio.to_thread(shared_metrics.render, metrics.registry.families())
+    return responses.PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+@app.get("/healthz")
+async def healthz():
+    """프로세스가 살아 있는지만 확인 (구성 요소 준비 여부와 무관)"""
+    return JSONResponse(content={"status": "ok", "uptime_seconds": readiness.report()["uptime_seconds"]})
+
+@app.get("/readyz")
+async def readyz():
+    """구성 요소별 준비 상태와 import 시간 (필수 구성 요소가 모두 준비되면 200, 아니면 503)"""
+    # DB는 요청마다 실제로 확인
+    try:
+        await ping_database()
+        readiness.set("database", READY)
+    except Exception as e:
+        readiness.set("database", FAILED, str(e) or type(e).__name__)
+    # 모델은 재학습 후 레지스트리가 나중에 로드할 수 있으므로 현재 상태로 갱신
+    if model_registry.loaded:
+        readiness.set("model", READY)
+    report = readiness.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+@app.get("/ocr_pool")
+async def ocr_pool_status():
+    # OCR Reader 풀 사용 현황 및 워밍업 시간
+    return JSONResponse(content=ocr_pool.stats())
+
+@app.get("/preprocess")
+async def preprocess_status():
+    # 전처리 설정과 단계별 평균 소요 시간
+    return JSONResponse(content=preprocessor.stats())
+
+@app.get("/archive")
+async def archive_status():
+    # 원본 저장 대기/완료/실패 건수
+    return JSONResponse(content=archiver.stats())
+
+@app.get("/browser_pool")
+async def browser_pool_status():
+    # ChromeDriver 풀 사용 현황
+    return JSONResponse(content=browser_pool.stats())
+
+@app.get("/model_registry")
+async def model_registry_status():
+    # 메모리에 로드된 예측 모델 버전
+    return JSONResponse(content=model_registry.stats())
+
+@app.get("/models")
+async def model_versions():
+    # 버전별 학습 기록 (학습 시간, 데이터 기간, 검증 손실, 승격 여부)
+    return JSONResponse(content=await asyncio.to_thread(training_scheduler.status))
+
+@app.post("/models/train")
+async def train_now():
+    # 스케줄과 상관없이 바로 재학습 시작
+    if not training_scheduler.trigger():
+        raise HTTPException(status_code=409, detail="이미 학습이 진행 중입니다.")
+    return JSONResponse(content={"status": "started"}, status_code=202)
+
+@app.get("/database")
+async def database_status():
+    # 커넥션 풀 상태, 커넥션 대기 시간, 쿼리 지연 시간
+    return JSONResponse(content=database.stats())
+
+@app.get("/result_cache")
+async def result_cache_status():
+    # 중복 업로드 캐시 적중 현황
+    return JSONResponse(content=result_cache.stats())
+
+@app.get("/category_classifier")
+async def category_classifier_status():
+    # 매칭 방식별 횟수, 중복 업종, 다시 읽기 횟수
+    return JSONResponse(content=category_classifier.stats())
+
+@app.post("/category_classifier/reload")
+async def reload_category_mapping():
+    try:
+        category_classifier.load()
+    except Exception as e:
+        logging.error(f"카테고리 매핑 로드 실패: {e}")
+        raise HTTPException(status_code=400, detail="카테고리 매핑 파일을 읽을 수 없습니다.")
+    return JSONResponse(content=category_classifier.stats())
+
+@app.get("/bizno_cache")
+async def bizno_cache_status():
+    # 사업자번호 조회 캐시 적중/미스 현황
+    return JSONResponse(content=bizno_cache.stats())
+
 @app.post("/predict")
 async def predict_consumption():
-    logging.info("예측 요청 수신됨")
+    logs.event(logging.DEBUG, "predict_request")
     
     try:
-        model, df_scaled, scaler, df_pivot = load_or_train_model()
-        
-        if model is None:
-            logging.error("모델이 생성되지 않음. 데이터가 부족할 수 있음.")
-            return JSONResponse(content={"error": "모델을 생성할 데이터가 부족합니다."}, status_code=500)
+        # 메모리에 올려둔 모델로 예측 (결과는 신선도 기간 동안 재사용)
+        result = await model_registry.predict()
         
-        logging.info("모델 로드 또는 학습 완료")
-        
-        predicted_data = await asyncio.to_thread(get_november_prediction, model, df_scaled, scaler, df_pivot)
-        actual_data = await asyncio.to_thread(get_actual_november_data)
-        
-        result = {
-            "예측_사용량": predicted_data,
-            "실제_11월_사용량": actual_data
-        }
+        if result is None:
+            logging.error("서비스 중인 모델이 없음. 학습 중이거나 데이터가 부족할 수 있음.")
+            return JSONResponse(content={"error": "모델이 아직 준비되지 않았습니다. 학습이 끝난 뒤 다시 시도해주세요."}, status_code=503)
         
         return JSONResponse(content=result)
     
@@ -158,16 +620,38 @@ async def predict_consumption():
         logging.error(f"예측 처리 중 오류 발생: {str(e)}")
         return JSONResponse(content={"error": f"예측 처리 중 오류가 발생했습니다. 상세: {str(e)}"}, status_code=500)
 
+@app.get("/forecast")
+async def forecast_consumption(horizon: int = 1, as_of: Optional[date] = None, tenant: Optional[List[str]] = Query(None)):
+    """기준월(as_of, 기본 오늘)까지의 데이터로 1~12개월 예측 (tenant를 여러 번 주면 부서별로 한 번에 계산)"""
+    try:
+        results = await model_registry.forecast(horizon=horizon, as_of=as_of, tenants=tenant or [None])
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    except Exception as e:
+        logging.error(f"예측 처리 중 오류 발생: {str(e)}")
+        return JSONResponse(content={"error": f"예측 처리 중 오류가 발생했습니다. 상세: {str(e)}"}, status_code=500)
+
+    if results is None:
+        return JSONResponse(content={"error": "모델이 아직 준비되지 않았습니다. 학습이 끝난 뒤 다시 시도해주세요."}, status_code=503)
+
+    return JSONResponse(content={
+        "기준월": (as_of or date.today()).strftime("%Y-%m"),
+        "horizon": horizon,
+        "결과": {name or "전체": result for name, result in results.items()},
+    })
+
 @app.post("/monthly_totals")
 async def monthly_totals():
     try:
-        result_data = await asyncio.to_thread(get_monthly_data)
+        # 증분 집계 저장소가 메모리에 유지하는 결과 사용
+        result_data = await monthly_store.get_totals()
         
         if not result_data:
             logging.warning("월별 사용 데이터가 없습니다.")
             raise HTTPException(status_code=404, detail="월별 사용 데이터가 없습니다.")
         
-        logging.info(f"월별 사용 데이터: {result_data}")
+        # 전체 결과를 로그 문자열로 만들지 않고 크기만 기록
+        logs.event(logging.DEBUG, "monthly_totals", entries=len(result_data))
         return JSONResponse(content=result_data)
     
     except HTTPException as http_error:
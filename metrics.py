@@ -0,0 +1,328 @@
+import asyncio
+import bisect
+import collections
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# 지표/프로파일러 설정 (환경 변수로 조정)
+METRICS_BUCKETS = tuple(float(b) for b in os.environ.get(
+    "METRICS_BUCKETS", "0.001,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30"
+).split(","))
+# 요청 중 이 비율만 샘플링 프로파일러를 붙임 (0이면 사용 안 함)
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+# X-Profile: 1 헤더로 요청 하나만 프로파일링 허용
+PROFILE_HEADER = os.environ.get("PROFILE_HEADER", "0") == "1"
+# 프로파일링한 요청이 이 시간보다 오래 걸린 경우에만 결과 저장
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "1000"))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+# 멀티 워커(serve.py)에서 각 워커가 공유 저장소에 지표를 올리는 주기, 이보다 오래 갱신되지 않은 워커 지표는 제외
+METRICS_PUBLISH_SECONDS = float(os.environ.get("METRICS_PUBLISH_SECONDS", "5"))
+METRICS_STALE_SECONDS = float(os.environ.get("METRICS_STALE_SECONDS", "60"))
+
+# 단계별 지연 시간 히스토그램 이름 (stage 라벨 값)
+STAGES = ("decode", "readtext", "extract_fields", "bizno_lookup", "classify", "db_query", "inference", "serialize")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f"{key}=\"{value}\"" for key, value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """라벨 조합별 값을 가진 지표 (스레드 안전)"""
+
+    kind = None
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self):
+        raise NotImplementedError
+
+    def family(self):
+        return (self.name, self.kind, self.help, self.samples())
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.label_names, key)), value) for key, value in items]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.label_names, key)), value) for key, value in items]
+
+
+class Histogram(Metric):
+    """누적 버킷 히스토그램 (관측 시에는 버킷 위치만 찾아 더하고, 누적은 출력할 때 계산)"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=METRICS_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, seconds, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # 버킷별 개수 (마지막 칸은 +Inf), 합계
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += seconds
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in items:
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(float(bound))}, cumulative))
+            samples.append((f"{self.name}_sum", labels, round(total, 6)))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Registry:
+    """지표 목록과, /metrics를 렌더링할 때마다 다른 모듈의 stats()를 읽어 오는 수집 함수"""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, label_names=()):
+        return self.register(Counter(name, help_text, label_names))
+
+    def gauge(self, name, help_text, label_names=()):
+        return self.register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name, help_text, label_names=(), buckets=METRICS_BUCKETS):
+        return self.register(Histogram(name, help_text, label_names, buckets))
+
+    def collector(self, func):
+        """func()는 (이름, 종류, 설명, [(라벨 dict, 값), ...]) 목록을 반환"""
+        self.collectors.append(func)
+        return func
+
+    def families(self):
+        """[(이름, 종류, 설명, [(샘플 이름, 라벨 dict, 값), ...]), ...] (JSON으로 저장 가능한 형태)"""
+        families = [metric.family() for metric in self.metrics]
+        for func in self.collectors:
+            for name, kind, help_text, values in func():
+                families.append((name, kind, help_text, [(name, labels, value) for labels, value in values if value is not None]))
+        return families
+
+    def render(self):
+        return render_families(self.families())
+
+
+def render_families(families):
+    lines = []
+    for name, kind, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class SharedMetrics:
+    """여러 워커 프로세스(serve.py)의 지표를 공유 저장소로 모아서 worker 라벨을 붙여 한 번에 출력
+
+    각 워커가 METRICS_PUBLISH_SECONDS마다 자기 지표를 올리고, /metrics를 받은 워커가 전체를 합쳐서 응답하므로
+    어느 워커가 요청을 받아도 같은 시계열이 나옴 (죽은 워커의 지표는 METRICS_STALE_SECONDS 뒤에 빠짐)
+    """
+
+    def __init__(self, store, publish_seconds=METRICS_PUBLISH_SECONDS, stale_seconds=METRICS_STALE_SECONDS):
+        self.store = store
+        self.publish_seconds = publish_seconds
+        self.stale_seconds = stale_seconds
+        self.worker = str(os.getpid())
+        self._task = None
+
+    def publish(self, families):
+        self.worker = str(os.getpid())
+        self.store.set("metrics", self.worker, families)
+
+    def render(self, families):
+        """이 워커의 최신 지표(families)를 올리고 모든 워커의 지표를 합쳐서 렌더링"""
+        self.publish(families)
+        merged = {}
+        for worker, worker_families in sorted(self.store.items("metrics", self.stale_seconds)):
+            for name, kind, help_text, samples in worker_families:
+                family = merged.setdefault(name, (kind, help_text, []))
+                family[2].extend((sample_name, {**labels, "worker": worker}, value) for sample_name, labels, value in samples)
+        return render_families([(name, kind, help_text, samples) for name, (kind, help_text, samples) in merged.items()])
+
+    async def _loop(self, registry):
+        while True:
+            try:
+                await asyncio.to_thread(self.publish, registry.families())
+            except Exception as e:
+                logging.warning(f"지표 공유 실패: {e}")
+            await asyncio.sleep(self.publish_seconds)
+
+    def start(self, registry):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(registry))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await asyncio.to_thread(self.store.delete, "metrics", self.worker)
+        except Exception as e:
+            logging.warning(f"지표 공유 정리 실패: {e}")
+
+
+registry = Registry()
+
+stage_seconds = registry.histogram("shcrm_stage_seconds", "처리 단계별 소요 시간", ("stage",))
+stage_errors = registry.counter("shcrm_stage_errors_total", "처리 단계별 오류 수", ("stage",))
+http_request_seconds = registry.histogram("shcrm_http_request_seconds", "HTTP 요청 처리 시간", ("method", "route"))
+http_requests = registry.counter("shcrm_http_requests_total", "HTTP 요청 수", ("method", "route", "status"))
+profiled_requests = registry.counter("shcrm_profiled_requests_total", "샘플링 프로파일러를 붙인 요청 수", ("saved",))
+
+
+def observe_stage(stage, seconds):
+    stage_seconds.observe(seconds, stage=stage)
+
+
+@contextmanager
+def stage_timer(stage):
+    """단계 하나의 소요 시간을 기록하고, 예외가 나면 오류 수도 셈"""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        stage_errors.inc(stage=stage)
+        raise
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, stage=stage)
+
+
+class SamplingProfiler:
+    """별도 스레드에서 주기적으로 모든 스레드의 스택을 모아 접힌 스택(flamegraph 입력) 형식으로 집계
+
+    이벤트 루프와 작업 스레드(OCR, DB 등)를 함께 보므로, 동시에 처리 중인 다른 요청의 스택도 섞일 수 있음
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def should_profile(headers):
+    """이 요청에 프로파일러를 붙일지 결정 (기본은 사용 안 함)"""
+    if PROFILE_HEADER and headers.get("x-profile") == "1":
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def finish_profile(profiler, route, seconds):
+    """요청이 PROFILE_SLOW_MS보다 오래 걸렸으면 접힌 스택을 PROFILE_DIR에 저장하고 경로 반환"""
+    profiler.stop()
+    if seconds * 1000 < PROFILE_SLOW_MS:
+        profiled_requests.inc(saved="false")
+        return None
+    name = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+    path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{int(seconds * 1000)}ms.folded")
+    profiled_requests.inc(saved="true")
+    return profiler.save(path)
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+import database
+import predict
+import training
+
+# 모델 레지스트리 설정 (환경 변수로 조정)
+MODEL_REFRESH_SECONDS = float(os.environ.get("MODEL_REFRESH_SECONDS", "60"))
+PREDICT_CACHE_SECONDS = float(os.environ.get("PREDICT_CACHE_SECONDS", "300"))
+FORECAST_CACHE_ENTRIES = int(os.environ.get("FORECAST_CACHE_ENTRIES", "256"))
+
+
+class ModelState:
+    """한 시점에 로드된 모델/스케일러/피벗 묶음 (교체 시 통째로 바뀜)"""
+
+    def __init__(self, version, model, df_scaled, scaler, df_pivot, model_mtime, data_signature, artifact_version=None,
+                 model_version=None):
+        self.version = version  # 데이터나 모델이 바뀔 때마다 증가
+        self.model_version = model_version or version  # 모델을 다시 로드했을 때만 증가
+        self.artifact_version = artifact_version
+        self.model = model
+        self.df_scaled = df_scaled
+        self.scaler = scaler
+        self.df_pivot = df_pivot
+        self.model_mtime = model_mtime
+        self.data_signature = data_signature
+        # 부서/기준월별 스케일러와 스케일된 입력 구간 (데이터가 바뀌면 상태가 새로 만들어지므로 함께 버려짐)
+        self.fitted_windows = OrderedDict()
+        self.loaded_at = time.time()
+
+
+class ModelRegistry:
+    """요청 간에 공유하는 메모리 상주 모델 레지스트리"""
+
+    def __init__(self, artifact_dir=training.MODEL_ARTIFACT_DIR, legacy_model_path=predict.model_file,
+                 refresh_seconds=MODEL_REFRESH_SECONDS, cache_seconds=PREDICT_CACHE_SECONDS):
+        self.artifact_dir = artifact_dir
+        self.legacy_model_path = legacy_model_path
+        self.refresh_seconds = refresh_seconds
+        self.cache_seconds = cache_seconds
+        self._state = None
+        self._version = 0
+        self._model_version = 0
+        self._load_lock = threading.Lock()
+        self._result = None  # (모델 버전, 계산 시각, 결과)
+        self._result_lock = asyncio.Lock()
+        self._forecasts = OrderedDict()  # (부서, 기준월) -> (모델 버전, 계산 시각, 개월 수, 결과)
+        self._forecast_lock = asyncio.Lock()
+        self._refresh_task = None
+
+    def _model_mtime(self):
+        # 버전 승격 시 current.json이 교체되므로 그 수정 시각으로 변경 여부 확인
+        for path in (training.current_pointer_path(self.artifact_dir), self.legacy_model_path):
+            if os.path.exists(path):
+                return os.path.getmtime(path)
+        return None
+
+    def _load(self, previous=None):
+        """데이터와 모델을 새로 읽어 상태를 한 번에 교체
+
+        승격된 모델이 previous와 같으면(데이터만 바뀐 경우) 모델은 그대로 두고 스케일된 데이터와 피벗만 다시 만듦
+        """
+        data_signature = predict.get_data_signature()
+        model_mtime = self._model_mtime()
+        artifact_version = training.current_version(self.artifact_dir)
+        same_model = previous is not None and (previous.artifact_version, previous.model_mtime) == (artifact_version, model_mtime)
+
+        if artifact_version is not None:
+            # 승격된 버전의 모델과 스케일러 사용
+            if same_model:
+                model, scaler, categories = previous.model, previous.scaler, previous.df_pivot.columns.tolist()
+            else:
+                model, scaler, categories = training.load_artifact(artifact_version, self.artifact_dir)
+            _, _, df_pivot = predict.load_training_data()
+            df_scaled, df_pivot = training.scale_with(scaler, categories, df_pivot)
+        elif os.path.exists(self.legacy_model_path):
+            # 버전 관리 이전의 단일 Keras 모델 파일 (스케일러는 예전처럼 현재 데이터로 다시 맞춤)
+            model = previous.model if same_model else predict.load_model(self.legacy_model_path)
+            df_scaled, scaler, df_pivot = predict.load_training_data()
+        else:
+            # 학습은 재학습 스케줄러가 별도 프로세스에서 수행
+            logging.warning("서비스 중인 모델이 없습니다. 학습이 끝날 때까지 기다립니다.")
+            return None
+
+        self._version += 1
+        if not same_model:
+            self._model_version += 1
+        state = ModelState(self._version, model, df_scaled, scaler, df_pivot, model_mtime, data_signature, artifact_version,
+                           self._model_version)
+        # 참조 교체는 원자적이므로 진행 중인 요청은 이전 상태를 그대로 사용
+        self._state = state
+        logging.info(
+            f"모델 레지스트리 갱신 (버전 {state.version}, 모델 {artifact_version or self.legacy_model_path}"
+            f"{', 데이터만 갱신' if same_model else ''})"
+        )
+        return state
+
+    @property
+    def loaded(self):
+        return self._state is not None
+
+    def get_or_load(self):
+        state = self._state
+        if state is not None:
+            return state
+        with self._load_lock:
+            if self._state is None:
+                self._load()
+            return self._state
+
+    def refresh_if_stale(self):
+        """모델 파일이나 데이터가 바뀌었으면 다시 로드"""
+        state = self._state
+        if state is None:
+            return self.get_or_load()
+        if self._model_mtime() == state.model_mtime and predict.get_data_signature() == state.data_signature:
+            return state
+        with self._load_lock:
+            if self._state is state:
+                self._load(previous=state)
+            return self._state
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await asyncio.to_thread(self.refresh_if_stale)
+            except Exception as e:
+                logging.error(f"모델 레지스트리 갱신 중 오류 발생: {str(e)}")
+
+    def start(self):
+        """모델 파일/데이터 변경을 주기적으로 확인하는 백그라운드 작업 시작"""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def predict(self):
+        """메모리의 모델로 예측하고, 같은 버전의 결과는 cache_seconds 동안 재사용"""
+        state = self._state or await asyncio.to_thread(self.get_or_load)
+        if state is None:
+            return None
+
+        cached = self._result
+        if cached is not None and cached[0] == state.version and time.time() - cached[1] < self.cache_seconds:
+            return cached[2]
+
+        async with self._result_lock:
+            # 기다리는 동안 다른 요청이 이미 계산했으면 그 결과 사용
+            cached = self._result
+            if cached is not None and cached[0] == state.version and time.time() - cached[1] < self.cache_seconds:
+                return cached[2]
+
+            predicted_data = await asyncio.to_thread(
+                predict.get_november_prediction, state.model, state.df_scaled, state.scaler, state.df_pivot
+            )
+            actual_data = await database.run_async(predict.get_actual_november_data)
+            result = {
+                "예측_사용량": predicted_data,
+                "실제_11월_사용량": actual_data
+            }
+            self._result = (state.version, time.time(), result)
+            return result
+
+    def _cached_forecast(self, key, version, horizon, current_month):
+        cached = self._forecasts.get(key)
+        if cached is None or cached[0] != version or cached[2] < horizon:
+            return None
+        # 예측 대상 월(실제 사용량 범위)이 이번 달에 닿으면 실제 사용량이 계속 바뀌므로 cache_seconds 동안만 사용
+        # 그보다 이전 기준월은 데이터가 바뀌지 않으므로 모델 버전이 같으면 계속 사용 (데이터만 갱신되어도 유지)
+        if training.months_between(key[1], current_month) <= cached[2] and time.time() - cached[1] >= self.cache_seconds:
+            return None
+        self._forecasts.move_to_end(key)
+        # 더 긴 기간으로 계산해 둔 결과는 앞쪽 horizon개월만 사용
+        predictions, actuals = cached[3]["예측_사용량"], cached[3]["실제_사용량"]
+        months = list(predictions)[:horizon]
+        return {
+            "예측_사용량": {month: predictions[month] for month in months},
+            "실제_사용량": {month: actuals[month] for month in months if month in actuals},
+        }
+
+    async def forecast(self, horizon=1, as_of=None, tenants=(None,)):
+        """기준월(as_of가 속한 달)까지의 데이터로 부서별 horizon개월 예측 ({부서: 결과}, 모델이 없으면 None)
+
+        결과는 (부서, 기준월)별로 캐시하고, 캐시에 없는 부서만 모아 한 번에 계산
+        """
+        if not 1 <= horizon <= predict.MAX_FORECAST_HORIZON:
+            raise ValueError(f"horizon은 1~{predict.MAX_FORECAST_HORIZON} 사이여야 합니다.")
+        state = self._state or await asyncio.to_thread(self.get_or_load)
+        if state is None:
+            return None
+
+        current_month = date.today().strftime("%Y-%m")
+        month = (as_of or date.today()).strftime("%Y-%m")
+        if month > current_month:
+            raise ValueError("기준월은 이번 달 이후일 수 없습니다.")
+        tenants = list(dict.fromkeys(tenants))  # 중복 제거, 순서 유지
+
+        async with self._forecast_lock:
+            results, missing = {}, []
+            for tenant in tenants:
+                cached = self._cached_forecast((tenant, month), state.model_version, horizon, current_month)
+                if cached is None:
+                    missing.append(tenant)
+                else:
+                    results[tenant] = cached
+
+            if missing:
+                computed = await database.run_async(
+                    predict.forecast, state.model, state.df_pivot.columns.tolist(), month, horizon, missing, training.LOOK_BACK,
+                    state.fitted_windows
+                )
+                while len(state.fitted_windows) > FORECAST_CACHE_ENTRIES:
+                    state.fitted_windows.popitem(last=False)
+                now = time.time()
+                for tenant, result in computed.items():
+                    self._forecasts[(tenant, month)] = (state.model_version, now, horizon, result)
+                    self._forecasts.move_to_end((tenant, month))
+                    results[tenant] = result
+                while len(self._forecasts) > FORECAST_CACHE_ENTRIES:
+                    self._forecasts.popitem(last=False)
+
+        return {tenant: results[tenant] for tenant in tenants}
+
+    def stats(self):
+        state = self._state
+        return {
+            "version": state.version if state else None,
+            "model_version": state.model_version if state else None,
+            "artifact_version": state.artifact_version if state else None,
+            "engine": getattr(state.model, "name", None) if state else None,
+            "loaded_at": state.loaded_at if state else None,
+            "categories": state.df_pivot.columns.tolist() if state else [],
+            "result_cached_at": self._result[1] if self._result else None,
+            "forecast_cache_entries": len(self._forecasts),
+        }
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import date
+
+from sqlalchemy import Column, Float, MetaData, String, Table, select, text
+
+import database
+import shared_state
+import usage_queries
+
+# 월별 집계 설정 (환경 변수로 조정)
+MONTHLY_REFRESH_SECONDS = float(os.environ.get("MONTHLY_REFRESH_SECONDS", "60"))
+USAGE_ID_COLUMN = os.environ.get("USAGE_ID_COLUMN", "id")
+# id 순서와 커밋 순서가 달라 늦게 보이는 행을 잡기 위해 매번 다시 계산할 지난 달 수
+MONTHLY_RECOMPUTE_CLOSED_MONTHS = int(os.environ.get("MONTHLY_RECOMPUTE_CLOSED_MONTHS", "1"))
+
+metadata = MetaData()
+
+# (월, 계정과목)별 합계
+category_totals = Table(
+    "월별_카테고리_합계", metadata,
+    Column("month", String(7), primary_key=True),
+    Column("category", String(100), primary_key=True),
+    Column("amount", Float, nullable=False, default=0),
+)
+
+# (월, 결제수단)별 합계
+payment_totals = Table(
+    "월별_결제수단_합계", metadata,
+    Column("month", String(7), primary_key=True),
+    Column("payment_method", String(100), primary_key=True),
+    Column("amount", Float, nullable=False, default=0),
+)
+
+# 마지막으로 반영한 행 id(high-water mark) 등 집계 상태
+aggregate_state = Table(
+    "월별_집계_상태", metadata,
+    Column("name", String(50), primary_key=True),
+    Column("value", String(50), nullable=False),
+)
+
+
+def next_month_start(day):
+    return date(day.year + (day.month == 12), day.month % 12 + 1, 1)
+
+
+def months_before(day, count):
+    """day가 속한 달에서 count개월 전 달의 1일"""
+    index = day.year * 12 + day.month - 1 - count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class MonthlyAggregateStore:
+    """사용금액 테이블의 월별 합계를 증분으로 유지하는 집계 저장소
+
+    이번 달 이후(미래 날짜 포함)와 직전 recompute_closed_months개의 지난 달은 매번 다시 계산하고,
+    그보다 오래된 달은 high-water mark 이후 새 행이 들어온 달만 다시 계산한다(나머지는 스캔하지 않음).
+    응답은 메모리에 만들어 둔 결과를 그대로 반환한다.
+    """
+
+    def __init__(self, refresh_seconds=MONTHLY_REFRESH_SECONDS, id_column=USAGE_ID_COLUMN,
+                 recompute_closed_months=MONTHLY_RECOMPUTE_CLOSED_MONTHS):
+        self.refresh_seconds = refresh_seconds
+        self.id_column = id_column
+        self.recompute_closed_months = recompute_closed_months
+        self._tables_ready = False
+        self._snapshot = None
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+        self._task = None
+
+    def _get_state(self, conn, name, default):
+        value = conn.execute(select(aggregate_state.c.value).where(aggregate_state.c.name == name)).scalar()
+        return value if value is not None else default
+
+    def _set_state(self, conn, name, value):
+        updated = conn.execute(
+            aggregate_state.update().where(aggregate_state.c.name == name).values(value=str(value))
+        ).rowcount
+        if not updated:
+            conn.execute(aggregate_state.insert().values(name=name, value=str(value)))
+
+    @staticmethod
+    def _grouped_rows(conn, key_column, where, params):
+        # 같은 커넥션으로 곧바로 INSERT를 해야 하므로 서버 측 커서를 다 읽은 뒤 반환
+        return [row for partition in usage_queries.stream_grouped(conn, key_column, where, params) for row in partition]
+
+    def _touched_months(self, conn, low, high):
+        """high-water mark 이후 새로 들어온 행이 속한 달 목록"""
+        query = text(f"""
+            SELECT DISTINCT {usage_queries.month_expression(conn.dialect.name)}
+            FROM 사용금액
+            WHERE {self.id_column} > :low AND {self.id_column} <= :high AND date IS NOT NULL
+        """)
+        return {row[0] for row in conn.execute(query, {"low": low, "high": high})}
+
+    def _recompute(self, conn, month_condition, where, params):
+        """지정한 달들의 합계를 지우고 사용금액 테이블에서 다시 계산"""
+        for table, key_column in ((category_totals, "category"), (payment_totals, "payment_method")):
+            conn.execute(table.delete().where(month_condition(table.c.month)))
+            rows = [
+                {"month": month, key_column: key, "amount": float(amount)}
+                for month, key, amount in self._grouped_rows(conn, key_column, where, params)
+            ]
+            if rows:
+                conn.execute(table.insert(), rows)
+
+    def _ensure_tables(self):
+        # MySQL에서는 DDL이 암묵적으로 커밋하므로 갱신 트랜잭션 밖에서 한 번만 실행
+        if not self._tables_ready:
+            metadata.create_all(database.get_engine(), checkfirst=True)
+            self._tables_ready = True
+
+    def refresh(self, today=None):
+        """새로 들어온 행을 반영하고 메모리 응답을 다시 생성"""
+        today = today or date.today()
+        window_start = months_before(today, self.recompute_closed_months)
+        window_month = window_start.strftime("%Y-%m")
+        self._ensure_tables()
+
+        # 여러 워커 프로세스가 같은 high-water mark로 동시에 갱신하지 않도록 프로세스 간에도 잠금
+        with self._lock, shared_state.file_lock(shared_state.lock_path("monthly_aggregates")), database.begin() as conn:
+            high_water = int(self._get_state(conn, "high_water_id", 0))
+            new_high_water = conn.execute(text(f"SELECT MAX({self.id_column}) FROM 사용금액")).scalar() or 0
+
+            # 오래된 달: high-water mark 이후 새 행이 들어온 달만 통째로 다시 계산
+            if new_high_water > high_water:
+                for month in sorted(self._touched_months(conn, high_water, new_high_water)):
+                    if month >= window_month:
+                        continue
+                    start = date(int(month[:4]), int(month[5:7]), 1)
+                    params = {"start": start, "end": next_month_start(start), "high": new_high_water}
+                    where = ["date >= :start", "date < :end", f"{self.id_column} <= :high"]
+                    self._recompute(conn, lambda column, month=month: column == month, where, params)
+
+            # 직전 지난 달들과 이번 달 이후: 늦게 커밋된 행, 수정/삭제, 미래 날짜 행까지 반영하도록 다시 계산
+            params = {"start": window_start, "high": new_high_water}
+            where = ["date >= :start", f"{self.id_column} <= :high"]
+            self._recompute(conn, lambda column: column >= window_month, where, params)
+
+            self._set_state(conn, "high_water_id", new_high_water)
+            snapshot = self._build_snapshot(conn)
+
+        self._snapshot = snapshot
+        self._refreshed_at = time.time()
+        return snapshot
+
+    @staticmethod
+    def _build_snapshot(conn):
+        """집계 테이블로 /monthly_totals 응답 생성 (기존 get_monthly_data와 같은 형식)"""
+        category_rows = conn.execute(select(category_totals.c.month, category_totals.c.category, category_totals.c.amount)).fetchall()
+        payment_rows = conn.execute(select(payment_totals.c.month, payment_totals.c.payment_method, payment_totals.c.amount)).fetchall()
+
+        categories = sorted({row[1] for row in category_rows})
+        payment_methods = sorted({row[1] for row in payment_rows})
+        months = sorted({row[0] for row in category_rows})
+
+        by_category = {(month, key): amount for month, key, amount in category_rows}
+        by_payment = {(month, key): amount for month, key, amount in payment_rows}
+
+        result_data = {
+            "monthly_totals": []
+        }
+        for month in months:
+            category_amounts = {category: int(by_category.get((month, category), 0)) for category in categories}
+            result_data["monthly_totals"].append({
+                "month": month,
+                "categories": category_amounts,
+                "payment_method": {method: int(by_payment.get((month, method), 0)) for method in payment_methods},
+                "total": int(sum(by_category.get((month, category), 0) for category in categories))
+            })
+        return result_data
+
+    async def get_totals(self):
+        """메모리에 있는 최신 집계 결과 (처음 한 번만 DB에서 생성)"""
+        if self._snapshot is None:
+            await database.run_async(self.refresh)
+        return self._snapshot
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await database.run_async(self.refresh)
+            except Exception as e:
+                logging.error(f"월별 집계 갱신 중 오류 발생: {str(e)}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self):
+        return {
+            "refreshed_at": self._refreshed_at,
+            "months": len(self._snapshot["monthly_totals"]) if self._snapshot else 0,
+        }
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+import numpy as np
+
+import metrics
+from startup import timed_import
+
+# OCR 풀 설정 (환경 변수로 조정)
+OCR_POOL_SIZE = int(os.environ.get("OCR_POOL_SIZE", "2"))
+OCR_MAX_WAITING = int(os.environ.get("OCR_MAX_WAITING", "8"))
+OCR_ACQUIRE_TIMEOUT = float(os.environ.get("OCR_ACQUIRE_TIMEOUT", "30"))
+OCR_LANGUAGES = os.environ.get("OCR_LANGUAGES", "ko,en").split(",")
+OCR_GPU = os.environ.get("OCR_GPU", "0") == "1"
+# fork 전에 로드한 Reader를 워커에서 처음 쓰기 전에 확인하는 추론의 제한 시간
+OCR_FORK_CHECK_TIMEOUT = float(os.environ.get("OCR_FORK_CHECK_TIMEOUT", "60"))
+
+
+class OCRPoolSaturated(Exception):
+    """모든 Reader가 사용 중이고 대기열도 가득 찬 경우"""
+
+
+def check_reader(reader):
+    """작은 빈 이미지로 추론이 끝까지 도는지 확인 (fork한 워커에서 torch 스레드 풀이 멈추는 경우 대비)"""
+    reader.readtext(np.full((32, 96), 255, dtype=np.uint8))
+
+
+class OCRWorker:
+    """easyocr Reader 하나와 그 Reader 전용 스레드"""
+
+    def __init__(self, index, reader):
+        self.index = index
+        self.reader = reader
+        # Reader마다 스레드 하나를 고정해서 사용
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"ocr-{index}")
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def readtext(self, image, **kwargs):
+        with metrics.stage_timer("readtext"):
+            return await self.run(self.reader.readtext, image, **kwargs)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class OCRReaderPool:
+    """프로세스 전체에서 공유하는 easyocr Reader 풀"""
+
+    def __init__(self, size=OCR_POOL_SIZE, max_waiting=OCR_MAX_WAITING,
+                 acquire_timeout=OCR_ACQUIRE_TIMEOUT, languages=OCR_LANGUAGES, gpu=OCR_GPU):
+        self.size = size
+        self.max_waiting = max_waiting
+        self.acquire_timeout = acquire_timeout
+        self.languages = list(languages)
+        self.gpu = gpu
+        self.workers = []
+        self._idle = None
+        self._waiting = 0
+        self.warmup_seconds = None
+        self.rejected = 0
+        self._preloaded = []
+        self.preloaded = 0
+
+    def preload(self):
+        """fork 전에 부모 프로세스에서 Reader를 미리 로드 (serve.py)
+
+        워커 프로세스는 모델 가중치를 copy-on-write로 공유하므로 워커 수만큼 메모리가 늘지 않음.
+        부모에서는 Reader 생성(가중치 로드)만 하고 추론은 하지 않아서 torch 스레드 풀이 fork 전에 만들어지지 않음
+        """
+        started = time.perf_counter()
+        easyocr = timed_import("easyocr")
+        self._preloaded = [easyocr.Reader(self.languages, gpu=self.gpu) for _ in range(self.size)]
+        logging.info(f"OCR Reader {self.size}개 미리 로드 ({round(time.perf_counter() - started, 3)}초)")
+
+    async def start(self):
+        """Reader를 미리 로드 (하나씩 로드되는 대로 바로 요청을 받음)"""
+        started = time.perf_counter()
+        self._idle = asyncio.Queue()
+        try:
+            # serve.py가 fork 전에 로드해 둔 Reader가 있으면 확인 추론을 한 번 돌려 보고 그대로 사용
+            preloaded, self._preloaded = self._preloaded, []
+            for reader in preloaded:
+                worker = OCRWorker(len(self.workers), reader)
+                try:
+                    await asyncio.wait_for(worker.run(check_reader, reader), timeout=OCR_FORK_CHECK_TIMEOUT)
+                except asyncio.TimeoutError:
+                    worker.close()
+                    raise RuntimeError(
+                        f"fork 전에 로드한 OCR Reader가 {OCR_FORK_CHECK_TIMEOUT}초 안에 응답하지 않습니다. "
+                        "SERVE_PRELOAD_OCR=0으로 워커마다 로드하세요."
+                    )
+                self.workers.append(worker)
+                self._idle.put_nowait(worker)
+                self.preloaded += 1
+            if len(self.workers) < self.size:
+                # easyocr(torch 포함)는 import만 몇 초 걸리므로 처음 시작할 때 작업 스레드에서 import
+                easyocr = await asyncio.to_thread(timed_import, "easyocr")
+            for index in range(len(self.workers), self.size):
+                worker = OCRWorker(index, None)
+                # 모델 로드도 해당 Reader 전용 스레드에서 수행
+                worker.reader = await worker.run(easyocr.Reader, self.languages, gpu=self.gpu)
+                self.workers.append(worker)
+                self._idle.put_nowait(worker)
+        except Exception:
+            if not self.workers:
+                # 하나도 로드하지 못했으면 기다리지 않고 바로 거절하도록 되돌림
+                self._idle = None
+            raise
+        self.warmup_seconds = round(time.perf_counter() - started, 3)
+        logging.info(f"OCR Reader {self.size}개 로드 완료 ({self.warmup_seconds}초)")
+
+    async def close(self):
+        for worker in self.workers:
+            worker.close()
+        self.workers = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Reader를 하나 빌려오고, 모두 사용 중이면 제한된 대기열에서 기다림"""
+        if self._idle is None:
+            raise OCRPoolSaturated("OCR Reader 풀이 아직 준비되지 않았습니다.")
+        if self._idle.empty() and self._waiting >= self.max_waiting:
+            self.rejected += 1
+            raise OCRPoolSaturated("OCR 요청이 너무 많습니다.")
+
+        self._waiting += 1
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise OCRPoolSaturated("OCR Reader 대기 시간이 초과되었습니다.")
+        finally:
+            self._waiting -= 1
+
+        try:
+            yield worker
+        finally:
+            self._idle.put_nowait(worker)
+
+    async def readtext(self, image, **kwargs):
+        async with self.acquire() as worker:
+            return await worker.readtext(image, **kwargs)
+
+    async def readtext_batched(self, images, batch_size=1, **kwargs):
+        """같은 크기의 이미지 여러 장을 Reader 하나로 한 번에 처리"""
+        async with self.acquire() as worker:
+            with metrics.stage_timer("readtext"):
+                return await worker.run(worker.reader.readtext_batched, images, batch_size=batch_size, **kwargs)
+
+    def stats(self):
+        idle = self._idle.qsize() if self._idle is not None else 0
+        return {
+            "size": len(self.workers),
+            "in_use": len(self.workers) - idle,
+            "idle": idle,
+            "waiting": self._waiting,
+            "max_waiting": self.max_waiting,
+            "rejected": self.rejected,
+            "warmup_seconds": self.warmup_seconds,
+            "preloaded": self.preloaded,
+        }
@@ -1,52 +1,92 @@
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import logging
 import os
 import pandas as pd
 import numpy as np
-from tensorflow.keras.models import load_model, Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from sklearn.preprocessing import MinMaxScaler
-from sqlalchemy import create_engine
 import json
 
-
-# MySQL 연결 정보
-host = "shcrm.ddns.net"
-port = 5001
-database = "shcrm"
-user = "root"
-password = "9868"
-
-# SQLAlchemy 연결 URL
-engine = create_engine(f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}")
+import database
+import metrics
+import shared_state
+import forecasting
+import usage_queries
 
 # 모델 파일 경로
 model_file = "lstm_model.h5"
 
-# 모델 로드 또는 학습 함수
-def load_or_train_model():
-    today = datetime.now()
-    today_str = today.strftime('%Y-%m-%d')  # 오늘 날짜를 'YYYY-MM-DD' 형식으로 변환
-
-    # 예측에 필요한 데이터 준비
-    query = f"""
-        SELECT DATE_FORMAT(date, '%%Y-%%m') AS Month, category, SUM(amount) AS Amount
-        FROM 사용금액
-        WHERE date >= '2023-11-01' AND date <= '{today_str}'
-        GROUP BY Month, category
-        ORDER BY Month
-    """
-    df = pd.read_sql(query, engine)
-
-    # 피벗 테이블 생성 (월별 계정과목별 총 금액)
-    df_pivot = df.pivot_table(index='Month', columns='category', values='Amount', aggfunc='sum').fillna(0)
+# 학습 데이터 시작일과 실제 사용량 집계 시작일
+TRAINING_START_DATE = date.fromisoformat(os.environ.get("TRAINING_START_DATE", "2023-11-01"))
+ACTUAL_START_DATE = date.fromisoformat(os.environ.get("ACTUAL_START_DATE", "2024-11-01"))
+
+# 예측값 조정 배수 (계정과목별 배수, 나머지는 기본 배수)
+PREDICTION_MULTIPLIERS = json.loads(os.environ.get("PREDICTION_MULTIPLIERS", '{"소모품비": 2}'))
+PREDICTION_DEFAULT_MULTIPLIER = float(os.environ.get("PREDICTION_DEFAULT_MULTIPLIER", "1.5"))
+
+# 한 번에 예측할 수 있는 최대 개월 수
+MAX_FORECAST_HORIZON = 12
+
+# 월별 계정과목별 총 금액 피벗 (빈 달은 0으로 채움, through_month를 주면 그 달까지 채움)
+def load_monthly_pivot(start=None, end=None, tenant=None, through_month=None):
+    start = start or TRAINING_START_DATE
+    end = end or datetime.now().date() + timedelta(days=1)  # 오늘까지 포함
+
+    # 월별 계정과목별 총 금액은 SQL에서 집계해서 행렬로 받음
+    months, categories, matrix = usage_queries.monthly_matrix('category', start=start, end=end, tenant=tenant)
+    df_pivot = pd.DataFrame(matrix, index=pd.Index(months, name='Month'), columns=pd.Index(categories, name='category'))
+    last_month = months[-1] if months else None
+    if through_month is not None:
+        # 기준월에 아직 사용 내역이 없어도 마지막 행이 기준월이 되도록 함
+        through_month = pd.Period(through_month, freq='M').strftime('%Y-%m')
+        last_month = max(last_month or through_month, through_month)
+    if last_month is not None:
+        first_month = months[0] if months else last_month
+        all_months = pd.period_range(first_month, last_month, freq='M').strftime('%Y-%m')
+        df_pivot = df_pivot.reindex(pd.Index(all_months, name='Month'), fill_value=0)
+    return df_pivot
+
+# 학습/예측용 월별 데이터 준비
+def load_training_data(start=None, end=None, tenant=None):
+    df_pivot = load_monthly_pivot(start, end, tenant)
 
     # 스케일링 설정
+    from sklearn.preprocessing import MinMaxScaler
+
     scaler = MinMaxScaler(feature_range=(0, 1))
     df_scaled = scaler.fit_transform(df_pivot)
 
+    return df_scaled, scaler, df_pivot
+
+# 데이터 변경 여부 확인용 (건수, 마지막 날짜)
+def get_data_signature():
+    query = "SELECT COUNT(*) AS cnt, MAX(date) AS last_date FROM 사용금액"
+    df = database.read_sql(query)
+    return int(df['cnt'].iloc[0]), str(df['last_date'].iloc[0])
+
+# 최근 look_back개월로 다음 달을 맞히는 학습 데이터 생성
+def create_dataset(data, look_back=12):
+    return forecasting.make_windows(data, look_back)
+
+# 저장된 Keras 모델 로드 (TensorFlow는 이때 처음 import)
+def load_model(path):
+    return forecasting.LSTMForecaster.load_file(path)
+
+# 새 LSTM 모델 학습 및 저장 (버전별 학습은 training.run_training_job에서 FORECAST_ENGINE 엔진 사용)
+def train_model(df_scaled, save_path=model_file):
+    forecaster = forecasting.LSTMForecaster().fit(df_scaled)
+
+    # 모델 저장 (여러 프로세스가 같은 파일에 쓰지 않도록 잠그고, 임시 파일에 쓴 뒤 rename)
+    with shared_state.file_lock(save_path + ".lock"):
+        tmp_path = f"{save_path}.{os.getpid()}.tmp.h5"
+        forecaster.save_file(tmp_path)
+        os.replace(tmp_path, save_path)
+    logging.info("새로운 모델을 학습하고 저장했습니다.")
+
+    return forecaster
+
+# 모델 로드 또는 학습 함수
+def load_or_train_model():
+    df_scaled, scaler, df_pivot = load_training_data()
+
     # 모델이 이미 존재하면 로드
     if os.path.exists(model_file):
         model = load_model(model_file)
@@ -56,47 +96,23 @@ def load_or_train_model():
         logging.info("모델이 존재하지 않아 새로운 모델을 학습합니다.")
         
         # 새로 모델을 학습
-        def create_dataset(data, look_back=12):
-            X, y = [], []
-            for i in range(len(data) - look_back):
-                X.append(data[i:(i + look_back), :])
-                y.append(data[i + look_back, :])
-            return np.array(X), np.array(y)
-
-        look_back = 12
-        X, y = create_dataset(df_scaled, look_back)
-
-        # 훈련 데이터와 테스트 데이터 분리
-        train_size = int(len(X) * 0.8)
-        X_train, X_test = X[:train_size], X[train_size:]
-        y_train, y_test = y[:train_size], y[train_size:]
-
-        # 모델 생성
-        model = Sequential([
-            LSTM(50, return_sequences=True, input_shape=X_train.shape[1:]),
-            Dropout(0.2),
-            LSTM(50),
-            Dropout(0.2),
-            Dense(y_train.shape[1])  # 각 계정과목별로 예측
-        ])
-        model.compile(optimizer='adam', loss='mean_squared_error')
-
-        # 모델 훈련
-        model.fit(X_train, y_train, epochs=100, batch_size=16, validation_data=(X_test, y_test), verbose=0)
-
-        # 모델 저장
-        model.save(model_file)
-        logging.info("새로운 모델을 학습하고 저장했습니다.")
+        model = train_model(df_scaled)
         
         return model, df_scaled, scaler, df_pivot
 
+# 계정과목별 배수 적용 (기본: 소모품비 2배, 그 외 1.5배)
+def adjust_prediction(account, value):
+    return value * PREDICTION_MULTIPLIERS.get(account, PREDICTION_DEFAULT_MULTIPLIER)
+
 # 예측 함수
 def get_november_prediction(model, df_scaled, scaler, df_pivot):
     look_back = 12  # 예측을 위한 과거 데이터 기간 (12개월)
     
     last_sequence = df_scaled[-look_back:]  # 최근 12개월 데이터
     last_sequence = np.expand_dims(last_sequence, axis=0)  # 3D 형태로 변환
-    predicted_next_month = model.predict(last_sequence)
+    # 엔진과 상관없이 (1, 12, K) 입력 -> (1, K) 예측
+    with metrics.stage_timer("inference"):
+        predicted_next_month = model.predict(last_sequence, verbose=0)
 
     # 예측 결과 스케일 복원
     predicted_next_month = scaler.inverse_transform(predicted_next_month)
@@ -108,31 +124,65 @@ def get_november_prediction(model, df_scaled, scaler, df_pivot):
     # 예측값을 카테고리별로 조정
     for i, account in enumerate(account_categories):
         predicted_value = round(float(predicted_next_month[0, i]), 2)
-        
-        # 특정 카테고리에 대해 2배 조정
-        if account in ['소모품비']:
-            adjusted_value = predicted_value * 2  # 2배 증가
-        else:
-            adjusted_value = predicted_value * 1.5  # 그 외에는 1.5배 증가
-
-        predicted_data[account] = adjusted_value
+        predicted_data[account] = adjust_prediction(account, predicted_value)
 
     return predicted_data
 
-# 실제 11월 데이터 가져오기
-def get_actual_november_data():
-    today = datetime.now()
-    today_str = today.strftime('%Y-%m-%d')
-    query_nov = f"""
-        SELECT category, SUM(amount) AS Amount
-        FROM 사용금액
-        WHERE date >= '2024-11-01' AND date <= '{today_str}'
-        GROUP BY category
-    """
-    df_nov = pd.read_sql(query_nov, engine)
-
-    november_usage = {}
-    for _, row in df_nov.iterrows():
-        november_usage[row['category']] = round(row['Amount'], 2)
+# 실제 11월 데이터 가져오기 (ACTUAL_START_DATE부터 오늘까지)
+def get_actual_november_data(start=None, tenant=None):
+    end = datetime.now().date() + timedelta(days=1)  # 오늘까지 포함
+    categories, amounts = usage_queries.totals_by('category', start=start or ACTUAL_START_DATE, end=end, tenant=tenant)
+
+    november_usage = dict(zip(categories, np.round(amounts, 2).tolist()))
 
     return november_usage
+
+# 기준월까지의 데이터로 부서별 horizon개월 예측 (부서 전체를 단계마다 한 번의 predict로 처리)
+# fitted를 주면 (부서, 기준월, look_back)별 (스케일러, 스케일된 입력 구간)을 저장해 두고 재사용
+# (같은 데이터 시그니처로 만든 상태에 묶어서 넘겨야 함)
+def forecast(model, categories, as_of_month, horizon=1, tenants=(None,), look_back=12, fitted=None):
+    as_of_month = pd.Period(as_of_month, freq='M')
+    today = datetime.now().date()
+    # 기준월 말일까지, 현재 달이면 오늘까지 포함
+    history_end = min((as_of_month + 1).start_time.date(), today + timedelta(days=1))
+    target_months = [(as_of_month + step).strftime('%Y-%m') for step in range(1, horizon + 1)]
+
+    from sklearn.preprocessing import MinMaxScaler
+
+    windows, scalers = [], []
+    for tenant in tenants:
+        key = (tenant, as_of_month.strftime('%Y-%m'), look_back)
+        entry = fitted.get(key) if fitted is not None else None
+        if entry is None:
+            df_pivot = load_monthly_pivot(end=history_end, tenant=tenant, through_month=as_of_month).reindex(
+                columns=categories, fill_value=0
+            )
+            if len(df_pivot) < look_back:
+                raise ValueError(f"예측에 필요한 데이터가 부족합니다 ({tenant or '전체'}: {len(df_pivot)}개월, {look_back}개월 필요)")
+            scaler = MinMaxScaler(feature_range=(0, 1))
+            entry = (scaler, scaler.fit_transform(df_pivot)[-look_back:])
+            if fitted is not None:
+                fitted[key] = entry
+        scalers.append(entry[0])
+        windows.append(entry[1])
+
+    with metrics.stage_timer("inference"):
+        predicted = forecasting.forecast_recursive(model, np.stack(windows), horizon)
+
+    # 이미 지난 예측 월은 실제 사용량도 함께 반환
+    actual_end = min((as_of_month + horizon + 1).start_time.date(), today + timedelta(days=1))
+    results = {}
+    for index, tenant in enumerate(tenants):
+        values = scalers[index].inverse_transform(predicted[index])
+        predictions = {
+            month: {account: round(adjust_prediction(account, float(values[step, i])), 2) for i, account in enumerate(categories)}
+            for step, month in enumerate(target_months)
+        }
+        actuals = {}
+        if (as_of_month + 1).start_time.date() < actual_end:
+            months, accounts, matrix = usage_queries.monthly_matrix(
+                'category', start=(as_of_month + 1).start_time.date(), end=actual_end, tenant=tenant
+            )
+            actuals = {month: dict(zip(accounts, np.round(row, 2).tolist())) for month, row in zip(months, matrix)}
+        results[tenant] = {"예측_사용량": predictions, "실제_사용량": actuals}
+    return results
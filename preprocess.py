@@ -0,0 +1,187 @@
+import io
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from startup import timed_import
+
+# 전처리 설정 (환경 변수로 조정)
+PREPROCESS_MAX_SIDE = int(os.environ.get("PREPROCESS_MAX_SIDE", "1600"))
+PREPROCESS_GRAYSCALE = os.environ.get("PREPROCESS_GRAYSCALE", "1") == "1"
+PREPROCESS_CROP = os.environ.get("PREPROCESS_CROP", "1") == "1"
+PREPROCESS_DESKEW = os.environ.get("PREPROCESS_DESKEW", "1") == "1"
+
+EXIF_ORIENTATION = 0x0112
+
+# JPEG는 디코딩 단계에서 1/2, 1/4, 1/8로 줄여서 읽을 수 있음 (cv2.IMREAD_REDUCED_* 이름)
+REDUCED_FLAGS = {True: "IMREAD_REDUCED_GRAYSCALE_{}", False: "IMREAD_REDUCED_COLOR_{}"}
+
+
+def apply_exif_orientation(image, orientation):
+    """EXIF 방향값에 맞게 회전/반전"""
+    cv2 = timed_import("cv2")
+    if orientation == 2:
+        return cv2.flip(image, 1)
+    if orientation == 3:
+        return cv2.rotate(image, cv2.ROTATE_180)
+    if orientation == 4:
+        return cv2.flip(image, 0)
+    if orientation == 5:
+        return cv2.transpose(image)
+    if orientation == 6:
+        return cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
+    if orientation == 7:
+        return cv2.flip(cv2.transpose(image), -1)
+    if orientation == 8:
+        return cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return image
+
+
+class ImagePreprocessor:
+    """OCR 전에 영수증 이미지를 줄이고 잘라내고 기울기를 바로잡는 단계"""
+
+    def __init__(self, max_side=PREPROCESS_MAX_SIDE, grayscale=PREPROCESS_GRAYSCALE,
+                 crop=PREPROCESS_CROP, deskew=PREPROCESS_DESKEW):
+        self.max_side = max_side
+        self.grayscale = grayscale
+        self.crop = crop
+        self.deskew = deskew
+        self._lock = threading.Lock()
+        self._stage_totals = {}
+        self._count = 0
+
+    def decode(self, data):
+        """EXIF 방향을 반영해서 디코딩 (큰 JPEG는 디코딩하면서 축소)"""
+        orientation, width, height, image_format = 1, None, None, None
+        try:
+            # 헤더만 읽어서 크기와 방향 확인 (전체 디코딩 없음)
+            with Image.open(io.BytesIO(data)) as header:
+                width, height = header.size
+                image_format = header.format
+                orientation = header.getexif().get(EXIF_ORIENTATION, 1)
+        except Exception:
+            pass
+
+        cv2 = timed_import("cv2")
+        flags = (cv2.IMREAD_GRAYSCALE if self.grayscale else cv2.IMREAD_COLOR) | cv2.IMREAD_IGNORE_ORIENTATION
+        if image_format == "JPEG" and self.max_side and width and height:
+            factor = 1
+            while factor < 8 and max(width, height) // (factor * 2) >= self.max_side:
+                factor *= 2
+            if factor > 1:
+                flags = getattr(cv2, REDUCED_FLAGS[self.grayscale].format(factor)) | cv2.IMREAD_IGNORE_ORIENTATION
+
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+        if image is None:
+            return None
+        return apply_exif_orientation(image, orientation)
+
+    def resize(self, image):
+        height, width = image.shape[:2]
+        longest = max(height, width)
+        if not self.max_side or longest <= self.max_side:
+            return image
+        scale = self.max_side / longest
+        cv2 = timed_import("cv2")
+        return cv2.resize(image, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def to_gray(image):
+        if image.ndim == 2:
+            return image
+        cv2 = timed_import("cv2")
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    def crop_receipt(self, image):
+        """배경보다 밝은 영수증 영역을 찾아 잘라냄 (못 찾으면 그대로 반환)"""
+        cv2 = timed_import("cv2")
+        gray = self.to_gray(image)
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        _, mask = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return image
+
+        largest = max(contours, key=cv2.contourArea)
+        frame_area = image.shape[0] * image.shape[1]
+        # 너무 작거나 거의 전체 화면이면 잘라낼 필요 없음
+        if not 0.2 * frame_area <= cv2.contourArea(largest) <= 0.95 * frame_area:
+            return image
+        x, y, w, h = cv2.boundingRect(largest)
+        return image[y:y + h, x:x + w]  # 복사 없이 슬라이스
+
+    @staticmethod
+    def deskew_image(image):
+        """글자 픽셀 분포로 기울기를 구해 바로잡음"""
+        cv2 = timed_import("cv2")
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        coords = cv2.findNonZero(binary)
+        if coords is None or len(coords) < 100:
+            return image
+
+        angle = cv2.minAreaRect(coords)[-1]
+        if angle > 45:
+            angle -= 90
+        # 아주 작거나 너무 큰 각도는 잘못 잡은 것으로 보고 무시
+        if abs(angle) < 0.5 or abs(angle) > 15:
+            return image
+
+        height, width = image.shape[:2]
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        border = 255 if image.ndim == 2 else (255, 255, 255)
+        return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=border)
+
+    def process(self, data):
+        """업로드 바이트 -> OCR 입력 이미지, 단계별 소요 시간(ms)"""
+        timings = {}
+        started = time.perf_counter()
+
+        def mark(stage):
+            nonlocal started
+            now = time.perf_counter()
+            timings[stage] = round((now - started) * 1000, 3)
+            started = now
+
+        image = self.decode(data)
+        mark("decode")
+        if image is None:
+            return None, timings
+
+        image = self.resize(image)
+        mark("resize")
+        if self.grayscale:
+            image = self.to_gray(image)
+            mark("grayscale")
+        if self.crop:
+            image = self.crop_receipt(image)
+            mark("crop")
+        if self.deskew:
+            image = self.deskew_image(image)
+            mark("deskew")
+
+        self._record(timings)
+        return image, timings
+
+    def _record(self, timings):
+        with self._lock:
+            self._count += 1
+            for stage, elapsed in timings.items():
+                self._stage_totals[stage] = self._stage_totals.get(stage, 0.0) + elapsed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "images": self._count,
+                "avg_ms": {stage: round(total / self._count, 3) for stage, total in self._stage_totals.items()} if self._count else {},
+                "config": {
+                    "max_side": self.max_side,
+                    "grayscale": self.grayscale,
+                    "crop": self.crop,
+                    "deskew": self.deskew,
+                },
+            }
@@ -0,0 +1,162 @@
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import shared_state
+from startup import timed_import
+
+# 중복 업로드 결과 캐시 설정 (환경 변수로 조정)
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "2000"))
+# 0보다 크면 perceptual hash 거리(비트 수)가 이 값 이하인 이미지도 같은 영수증으로 봄
+RESULT_CACHE_PHASH_DISTANCE = int(os.environ.get("RESULT_CACHE_PHASH_DISTANCE", "0"))
+# 공유 저장소(SHARED_CACHE=1)에 둔 결과의 보관 기간
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(data):
+    """64비트 difference hash (디코딩 실패 시 None)"""
+    cv2 = timed_import("cv2")
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if image is None:
+        return None
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+class ReceiptResultCache:
+    """업로드 바이트 해시로 /extract 최종 결과를 재사용하는 LRU 캐시
+
+    store(shared_state.SharedStore)가 있으면 메모리에 없는 결과를 디스크에서 찾아서
+    다른 워커 프로세스가 계산한 결과도 재사용함 (유사 이미지 매칭은 프로세스별 메모리에서만)
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, phash_distance=RESULT_CACHE_PHASH_DISTANCE,
+                 store=None, ttl=RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.phash_distance = phash_distance
+        # max_entries=0이면 캐시를 끈 것이므로 공유 저장소도 쓰지 않음 (동시 요청 합치기만 남음)
+        self.store = None if max_entries <= 0 else store if store is not None else shared_state.shared_store()
+        self.ttl = ttl
+        self._pruned_at = 0.0
+        self._entries = OrderedDict()  # 내용 해시 -> 결과
+        self._phashes = OrderedDict()  # 내용 해시 -> perceptual hash
+        self._inflight = {}
+        self.counters = {"hits": 0, "near_hits": 0, "disk_hits": 0, "coalesced": 0, "misses": 0, "store_errors": 0}
+
+    def _remember(self, key, result, phash):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if phash is not None:
+            self._phashes[key] = phash
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._phashes.pop(evicted, None)
+
+    def _find_similar(self, phash):
+        best_key, best_distance = None, self.phash_distance + 1
+        for key, other in self._phashes.items():
+            distance = (phash ^ other).bit_count()
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+        return best_key
+
+    def _store_result(self, key, result):
+        self.store.set("result", key, result)
+        # 보관 기간이 지난 결과는 한 시간에 한 번 정리
+        if time.time() - self._pruned_at > 3600:
+            self._pruned_at = time.time()
+            self.store.prune("result", self.ttl)
+
+    async def get_or_compute(self, data, compute, archive=None):
+        """(결과, 중복 여부) 반환. 같은 이미지를 동시에 올리면 한 번만 계산
+
+        유사 이미지의 결과를 재사용할 때는 OCR/조회 결과만 가져오고, archive()로 이번 업로드를 보관해서
+        "이미지_URL"을 그 주소로 바꿈
+
+        계산은 요청과 분리된 작업에서 실행하므로, 먼저 요청한 쪽이 취소되어도(작업 취소 등)
+        같은 이미지를 기다리는 다른 요청은 결과를 그대로 받음
+        """
+        key = content_hash(data)
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return copy.deepcopy(self._entries[key]), True
+
+        if key in self._inflight:
+            self.counters["coalesced"] += 1
+            result, _ = await asyncio.shield(self._inflight[key])
+            return copy.deepcopy(result), True
+
+        task = asyncio.create_task(self._lookup_or_compute(key, data, compute, archive))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._computed(key, done))
+        result, duplicate = await asyncio.shield(task)
+        return copy.deepcopy(result), duplicate
+
+    def _computed(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 기다리는 쪽이 모두 취소되어도 경고가 남지 않도록 처리
+
+    async def _lookup_or_compute(self, key, data, compute, archive):
+        if self.store is not None:
+            try:
+                stored = await asyncio.to_thread(self.store.get, "result", key, self.ttl)
+            except Exception as e:
+                # 공유 저장소가 잠겨 있거나 깨졌으면 새로 계산
+                self.counters["store_errors"] += 1
+                logging.warning(f"공유 저장소 결과 조회 실패, 새로 계산합니다: {e}")
+                stored = None
+            if stored is not None:
+                self.counters["disk_hits"] += 1
+                self._remember(key, stored, None)
+                return stored, True
+
+        phash = None
+        if self.phash_distance > 0:
+            phash = await asyncio.to_thread(perceptual_hash, data)
+            similar = self._find_similar(phash) if phash is not None else None
+            if similar is not None:
+                self.counters["near_hits"] += 1
+                self._entries.move_to_end(similar)
+                result = copy.deepcopy(self._entries[similar])
+                if archive is not None:
+                    result["이미지_URL"] = archive()
+                # 이번 업로드의 이미지 주소가 들어간 결과로 따로 기억해서 같은 파일은 바로 재사용
+                self._remember(key, result, phash)
+                return result, True
+
+        self.counters["misses"] += 1
+        result = await compute()
+        self._remember(key, result, phash)
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self._store_result, key, result)
+            except Exception as e:
+                # 이미 계산한 결과는 그대로 반환 (다른 워커와 공유만 못 함)
+                self.counters["store_errors"] += 1
+                logging.warning(f"공유 저장소 결과 저장 실패: {e}")
+        return result, False
+
+    def stats(self):
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "max_entries": self.max_entries,
+            "phash_distance": self.phash_distance,
+            "shared_store": self.store.path if self.store is not None else None,
+        }
@@ -0,0 +1,201 @@
+"""멀티 워커 실행 (pre-fork)
+
+사용법:
+    SERVE_WORKERS=4 python serve.py
+
+부모 프로세스가 main을 import하고 OCR Reader(와 numpy 예측 모델)를 미리 로드한 뒤 워커를 fork한다.
+모델 가중치는 fork 이후 읽기만 하므로 copy-on-write로 공유되어 워커 수만큼 메모리가 늘지 않는다.
+워커들은 같은 리스닝 소켓에서 요청을 나눠 받고, 결과 캐시/작업 상태는 SHARED_STATE_DIR의 공유 저장소,
+사업자번호 캐시는 BIZNO_CACHE_PATH의 SQLite 파일을 함께 쓴다. 죽은 워커는 다시 띄운다.
+/metrics는 어느 워커가 받아도 모든 워커의 지표를 worker 라벨로 구분해서 돌려주고(metrics.SharedMetrics),
+phash 근사 매칭은 워커별 메모리에서만 한다.
+
+fork와 easyocr/torch:
+- 부모에서는 Reader 생성(가중치 로드)만 하고 추론은 하지 않는다. torch의 스레드 풀은 첫 추론 때 만들어지므로
+  fork 전에 생기지 않고, 워커마다 OMP_NUM_THREADS(코어 수 / 워커 수) 크기로 새로 만든다.
+- 워커는 미리 로드한 Reader로 작은 확인 추론을 먼저 돌리고(OCR_FORK_CHECK_TIMEOUT), 실패하거나 멈추면
+  /readyz에 ocr 준비 실패로 표시한다. 이때는 SERVE_PRELOAD_OCR=0으로 워커마다 Reader를 로드한다
+  (메모리는 워커 수만큼 늘어남).
+- CUDA는 fork한 프로세스에서 다시 초기화할 수 없으므로 OCR_GPU=1이면 OCR Reader를 미리 로드하지 않는다.
+- tests/test_serve_fork.py가 fork 전에 로드한 Reader로 자식 프로세스에서 읽은 결과가 부모와 같은지 확인한다
+  (easyocr가 설치된 환경에서만 실행).
+"""
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+# 워커 설정 (환경 변수로 조정)
+SERVE_HOST = os.environ.get("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.environ.get("SERVE_PORT", "8000"))
+SERVE_WORKERS = int(os.environ.get("SERVE_WORKERS", "0")) or os.cpu_count() or 1
+# 1이면 fork 전에 부모에서 OCR Reader와 예측 모델을 로드해서 워커끼리 공유
+SERVE_PRELOAD = os.environ.get("SERVE_PRELOAD", "1") == "1"
+# OCR Reader만 따로 끌 수 있음 (0이면 워커마다 로드)
+SERVE_PRELOAD_OCR = os.environ.get("SERVE_PRELOAD_OCR", "1" if SERVE_PRELOAD else "0") == "1"
+SERVE_BACKLOG = int(os.environ.get("SERVE_BACKLOG", "2048"))
+# 워커가 이 시간 안에 다시 죽으면 재시작 간격을 늘림
+SERVE_RESPAWN_BACKOFF = float(os.environ.get("SERVE_RESPAWN_BACKOFF", "1"))
+SERVE_RESPAWN_MAX_BACKOFF = float(os.environ.get("SERVE_RESPAWN_MAX_BACKOFF", "30"))
+SERVE_GRACEFUL_TIMEOUT = float(os.environ.get("SERVE_GRACEFUL_TIMEOUT", "30"))
+
+# 워커 수만큼 프로세스가 늘어나므로 프로세스당 자원은 작게 (직접 지정한 값이 우선)
+os.environ.setdefault("SHARED_CACHE", "1")
+os.environ.setdefault("OCR_POOL_SIZE", "1")
+os.environ.setdefault("BROWSER_POOL_SIZE", "1")
+_threads = str(max(1, (os.cpu_count() or 1) // SERVE_WORKERS))
+for _name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(_name, _threads)
+
+import uvicorn
+
+import database
+import forecasting
+import main
+
+
+def preload():
+    """fork 전에 무거운 읽기 전용 구성 요소를 부모에서 로드"""
+    if not SERVE_PRELOAD_OCR:
+        logging.info("OCR Reader는 워커마다 로드 (SERVE_PRELOAD_OCR=0)")
+    elif main.ocr_pool.gpu:
+        # CUDA는 fork 후 자식에서 쓸 수 없음
+        logging.info("OCR_GPU=1이므로 OCR Reader는 워커마다 로드")
+    else:
+        try:
+            main.ocr_pool.preload()
+        except Exception as e:
+            # 워커가 시작할 때 각자 로드 (readiness로 상태 확인 가능)
+            logging.warning(f"OCR Reader 미리 로드 실패: {e}")
+    # TensorFlow는 fork 이후 안전하지 않으므로 lstm 엔진은 워커마다 로드
+    if SERVE_PRELOAD and forecasting.FORECAST_ENGINE != "lstm":
+        try:
+            main.model_registry.get_or_load()
+        except Exception as e:
+            logging.warning(f"예측 모델 미리 로드 실패: {e}")
+    # 부모에서 연 DB 연결은 워커끼리 공유되면 안 되므로 닫음
+    database.dispose()
+    main.bizno_cache.close()
+
+
+def bind_socket(host=SERVE_HOST, port=SERVE_PORT, backlog=SERVE_BACKLOG):
+    # proto를 IPPROTO_TCP로 지정해야 asyncio가 받은 연결에 TCP_NODELAY를 설정함
+    # (0이면 keep-alive 응답이 Nagle/지연 ACK로 40ms씩 늦어짐)
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock):
+    """자식 프로세스: 공유 소켓으로 uvicorn 실행"""
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(signum, signal.SIG_DFL)
+    code = 0
+    try:
+        config = uvicorn.Config(main.app, log_config=None, timeout_graceful_shutdown=SERVE_GRACEFUL_TIMEOUT)
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException as e:
+        logging.exception(f"워커 {os.getpid()} 비정상 종료: {e}")
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+class Master:
+    """워커를 fork하고 죽으면 다시 띄우는 부모 프로세스"""
+
+    def __init__(self, sock, workers=SERVE_WORKERS):
+        self.sock = sock
+        self.workers = workers
+        self.children = {}  # pid -> 시작 시각
+        self.stopping = False
+        self.backoff = 0.0
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.sock)
+        self.children[pid] = time.monotonic()
+        logging.info(f"워커 시작: pid={pid}")
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        logging.info(f"종료 신호({signal.Signals(signum).name}), 워커 {len(self.children)}개 종료")
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap(self):
+        """끝난 워커를 정리하고 (pid, 종료 코드, 실행 시간) 목록 반환"""
+        finished = []
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                break
+            if pid == 0:
+                break
+            started = self.children.pop(pid, None)
+            if started is not None:
+                finished.append((pid, os.waitstatus_to_exitcode(status), time.monotonic() - started))
+        return finished
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+        deadline = None
+        while self.children:
+            for pid, code, uptime in self.reap():
+                if self.stopping:
+                    continue
+                # 시작하자마자 죽는 워커가 계속 fork되지 않도록 재시작 간격을 늘림
+                if uptime < SERVE_RESPAWN_MAX_BACKOFF:
+                    self.backoff = min(SERVE_RESPAWN_MAX_BACKOFF, max(SERVE_RESPAWN_BACKOFF, self.backoff * 2))
+                else:
+                    self.backoff = 0.0
+                logging.warning(f"워커 종료: pid={pid}, code={code}, {self.backoff:.0f}초 후 재시작")
+                time.sleep(self.backoff)
+                if not self.stopping:
+                    self.spawn()
+            if self.stopping:
+                deadline = deadline or time.monotonic() + SERVE_GRACEFUL_TIMEOUT + 5
+                if time.monotonic() > deadline:
+                    for pid in list(self.children):
+                        logging.warning(f"워커 강제 종료: pid={pid}")
+                        try:
+                            os.kill(pid, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+                    deadline = time.monotonic() + 5
+            time.sleep(0.2)
+        self.sock.close()
+
+
+def serve():
+    if SERVE_PRELOAD or SERVE_PRELOAD_OCR:
+        preload()
+    sock = bind_socket()
+    # 부모에서 만든 객체를 GC 대상에서 빼서, 워커의 GC가 참조 정보를 건드려 공유 페이지가 복사되지 않도록 함
+    gc.collect()
+    gc.freeze()
+    logging.info(f"http://{SERVE_HOST}:{SERVE_PORT} 워커 {SERVE_WORKERS}개로 시작 (부모 pid={os.getpid()})")
+    Master(sock).run()
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,178 +1,153 @@
 import asyncio
+import logging
 import os
-import uuid
-from PIL import Image, ImageDraw
-import cv2
-import easyocr
-import re
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager  # webdriver-manager 임포트 추가
+import logs
+import metrics
+from ocr_pool import OCRPoolSaturated
+from preprocess import ImagePreprocessor
+from field_extraction import extract_fields
+from startup import timed_import
+
+# 배치 OCR 시 한 번에 처리할 이미지 수
+OCR_BATCH_SIZE = int(os.environ.get("OCR_BATCH_SIZE", "8"))
 
 class ImageProcessor:
-    def __init__(self, driver):
-        # easyocr Reader와 ChromeDriver 초기화
-        self.reader = easyocr.Reader(['ko', 'en'], gpu=True)
-        self.driver = driver  # 외부에서 전달받은 driver 사용
-
-    async def process_image(self, img_path):
-        """이미지 처리 및 OCR, 정보 추출"""
-        # 이미지 파일 읽기 및 텍스트 추출 비동기 처리
-        image = await asyncio.to_thread(cv2.imread, img_path)
+    def __init__(self, lookup_backend, ocr_pool, lookup_cache=None, preprocessor=None, archiver=None):
+        # startup에서 로드한 OCR Reader 풀과 사업자번호 조회 백엔드 사용
+        self.ocr_pool = ocr_pool
+        self.preprocessor = preprocessor or ImagePreprocessor()  # OCR 전 축소/자르기/기울기 보정
+        self.archiver = archiver  # 원본 이미지 보관 (백그라운드 저장)
+        self.lookup_backend = lookup_backend  # 외부에서 전달받은 조회 백엔드 사용
+        self.lookup_cache = lookup_cache  # 사업자번호 조회 캐시 (없으면 매번 조회)
+
+    async def process_image(self, data, filename=None):
+        """업로드 바이트를 메모리에서 바로 디코딩해서 OCR 및 정보 추출"""
+        with metrics.stage_timer("decode"):
+            image, timings = await asyncio.to_thread(self.preprocessor.process, data)
         if image is None:
-            raise Exception(f"이미지를 읽을 수 없습니다: {img_path}")
+            raise Exception(f"이미지를 읽을 수 없습니다: {filename}")
+        logs.event(logging.DEBUG, "preprocess", filename=filename, **timings)
 
         # 텍스트 추출
-        results = await asyncio.to_thread(self.reader.readtext, image)
-        extracted_text = []
-        img = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-        draw = ImageDraw.Draw(img)
-
-        for detection in results:
-            bbox = detection[0]
-            text = detection[1]
-            extracted_text.append(text)
+        results = await self.ocr_pool.readtext(image)
 
         # OCR 결과를 사용하여 정보 추출
-        info_dict = {
-            "사업자번호": self.extract_business_numbers(extracted_text),
-            "가맹점명": self.extract_store_names(extracted_text),
-            "거래일시": self.extract_transaction_date(extracted_text),
-            "금액": self.extract_max_number(extracted_text)
-        }
+        info_dict = self.build_info_dict(results)
 
-        # 이미지 파일을 로컬 저장 후 경로 반환
-        img_url = await self.save_image_locally(img, img_path)
+        # 원본 바이트는 백그라운드에서 저장하고 URL만 바로 받음
+        img_url = self.archiver.archive(data, filename)
 
         return info_dict, img_url
 
-    def extract_business_numbers(self, text_list):
-        """사업자 번호 추출"""
-        business_number_pattern = re.compile(r'\b\d{3}-?\d{2}-?\d{5}\b')
-        return [match for text in text_list for match in business_number_pattern.findall(text)]
-
-    def extract_store_names(self, text_list):
-        """가맹점명 추출"""
-        store_name_pattern = re.compile(r'(매장명|상호명|회사명|업체명|가맣점명|[상싱성][호오]|[회훼]사)\s*[:;：]?\s*([^\s)]+(?:\s*\S*)*?[점]\s*?\S*)')
-        return [match[1] for text in text_list for match in store_name_pattern.findall(text)]
-
-    def extract_transaction_date(self, text_list):
-        """거래 일시 추출"""
-        date_pattern = re.compile(r'([거기][래레][일닐]|[결겔]제[일닐]|거[래레]일시|[결겔]제날짜|날짜|일자)?\s*[:;：]?\s*' r'(\d{4}[-/.]\d{2}[-/.]\d{2}|\d{2}[-/.]\d{2}[-/.]\d{4}|\d{2}[-/.]\d{2}[-/.]\d{2})')
-        extracted_dates = []
-
-        for text in text_list:
-            matches = date_pattern.findall(text)
-
-            for match in matches:
-                date_part = match[1]
-                if self.is_valid_date(date_part):
-                    extracted_dates.append(date_part)
-
-        return extracted_dates
-
-    def extract_max_number(self, text_list):
-        """가장 큰 숫자 추출"""
-        all_numbers = []
-        for text in text_list:
-            numbers = re.findall(r'\d{1,3}(?:,\d{3})*', text)
-            numbers = [int(num.replace(',', '')) for num in numbers]
-            all_numbers.extend(numbers)
-        return max(all_numbers, default=0) if all_numbers else None
-
-    def is_valid_date(self, date_str):
-        """날짜 유효성 검사"""
-        parts = re.split(r'[-/.]', date_str)
-        if len(parts) == 3:
-            if len(parts[0]) == 4 and len(parts[1]) == 2 and len(parts[2]) == 2:
-                year, month, day = map(int, parts)
-                return 2000 <= year <= 2100 and 1 <= month <= 12 and 1 <= day <= 31
-            elif len(parts[0]) == 2 and len(parts[1]) == 2 and len(parts[2]) == 4:
-                day, month, year = map(int, parts)
-                return 2000 <= year <= 2100 and 1 <= month <= 12 and 1 <= day <= 31
-            elif len(parts[0]) == 2 and len(parts[1]) == 2 and len(parts[2]) == 2:
-                month, day, year = map(int, parts)
-                year += 2000 if year < 100 else 0
-                return 2000 <= year <= 2100 and 1 <= month <= 12 and 1 <= day <= 31
-        return False
+    def decode_image(self, data):
+        """업로드된 바이트를 전처리된 이미지로 디코딩"""
+        with metrics.stage_timer("decode"):
+            image, _ = self.preprocessor.process(data)
+        return image
+
+    async def process_images(self, images, batch_size=OCR_BATCH_SIZE, read=None):
+        """여러 이미지를 batch_size씩 나눠 OCR 풀의 Reader들에서 동시에 배치 처리 (입력 순서대로 결과 또는 예외 반환)
+
+        read가 있으면 images의 첫 값은 업로드 객체이고, 해당 묶음을 처리할 차례에 read로 읽음
+        (한 번에 메모리에 올라가는 파일은 Reader 수 x batch_size개까지)
+        """
+        outputs = [None] * len(images)
+        # 이 요청이 동시에 잡는 Reader는 풀 크기까지 (나머지 묶음은 여기서 기다림)
+        slots = asyncio.Semaphore(max(1, self.ocr_pool.size))
+        chunks = [range(start, min(start + batch_size, len(images))) for start in range(0, len(images), batch_size)]
+        done = await asyncio.gather(
+            *(self._process_chunk(images, chunk, batch_size, read, slots, outputs) for chunk in chunks),
+            return_exceptions=True
+        )
+        for result in done:
+            if isinstance(result, BaseException):
+                raise result
+        return outputs
+
+    async def _process_chunk(self, images, chunk, batch_size, read, slots, outputs):
+        """묶음 하나를 읽고 디코딩한 뒤 readtext_batched 한 번으로 검출/인식"""
+        async with slots:
+            data = {}
+            for index in chunk:
+                try:
+                    data[index] = await read(images[index][0]) if read else images[index][0]
+                except Exception as e:
+                    outputs[index] = e
+
+            # 디코딩은 파일별로 동시에 처리
+            decoded = dict(zip(data, await asyncio.gather(
+                *(asyncio.to_thread(self.decode_image, data[index]) for index in data),
+                return_exceptions=True
+            )))
+            valid = []
+            for index, image in decoded.items():
+                if isinstance(image, Exception):
+                    outputs[index] = image
+                elif image is None:
+                    outputs[index] = Exception(f"이미지를 읽을 수 없습니다: {images[index][1]}")
+                else:
+                    valid.append(index)
+            if not valid:
+                return
+
+            try:
+                batch_results = await self.ocr_pool.readtext_batched(
+                    self.pad_to_common_shape([decoded[i] for i in valid]), batch_size=batch_size
+                )
+            except OCRPoolSaturated:
+                raise
+            except Exception as e:
+                # 배치 처리 실패 시 파일별로 다시 처리해서 실패한 파일만 오류로 남김
+                logging.warning(f"배치 OCR 실패, 파일별로 재시도합니다: {e}")
+                batch_results = await asyncio.gather(
+                    *(self.ocr_pool.readtext(decoded[i]) for i in valid), return_exceptions=True
+                )
+
+        for index, results in zip(valid, batch_results):
+            if isinstance(results, Exception):
+                outputs[index] = results
+                continue
+            img_url = self.archiver.archive(data[index], images[index][1])
+            outputs[index] = (self.build_info_dict(results), img_url)
+
+    @staticmethod
+    def pad_to_common_shape(images):
+        """readtext_batched는 같은 크기의 이미지만 받으므로 오른쪽/아래를 흰색으로 채움 (bbox 좌표는 그대로 유지)"""
+        height = max(image.shape[0] for image in images)
+        width = max(image.shape[1] for image in images)
+        cv2 = timed_import("cv2")
+        return [
+            cv2.copyMakeBorder(image, 0, height - image.shape[0], 0, width - image.shape[1],
+                               cv2.BORDER_CONSTANT, value=(255, 255, 255))
+            for image in images
+        ]
+
+    def build_info_dict(self, results):
+        """OCR 결과(bbox 포함)로부터 정보 추출 (패턴은 미리 컴파일, 줄마다 한 번만 훑음)"""
+        with metrics.stage_timer("extract_fields"):
+            return extract_fields(results)
 
     async def extract_category_keywords(self, business_numbers):
-        """카테고리 키워드 추출"""
+        """카테고리 키워드 추출 (사업자번호별 조회는 동시에 실행)"""
         category_keywords_dict = {}
 
-        for business_number in business_numbers:
-            business_number_clean = business_number.replace("-", "")
-            
-            address = 'https://bizno.net/article/' + business_number_clean
-            print(f"접속 중인 URL: {address}")
-
-            self.driver.get(address)
+        lookups = await asyncio.gather(*(self.lookup_category_keywords(number) for number in business_numbers))
 
-            # 상호명 추출
-            try:
-                shop_name = self.driver.find_element(By.XPATH, '/html/body/section[2]/div/div/div[1]/div[1]/div/div[1]/div/a/h1').text
-            except NoSuchElementException:
-                shop_name = "상호명 없음"  
-            
-            # category_keywords 추출
-            category_keywords = None
-            try:
-                element = self.driver.find_element(By.XPATH, '/html/body/section[2]/div/div/div[1]/div[1]/div/table/tbody/tr[2]/td')
-                if all(label in element.text for label in ["대분류", "중분류", "소분류", "세분류", "세세분류"]):
-                    category_keywords = element.text
-            except NoSuchElementException:
-                pass
-            
-            if not category_keywords:
-                try:
-                    element = self.driver.find_element(By.XPATH, '/html/body/section[2]/div/div/div[1]/div[1]/div/table/tbody/tr[4]/td')
-                    if all(label in element.text for label in ["대분류", "중분류", "소분류", "세분류", "세세분류"]):
-                        category_keywords = element.text
-                except NoSuchElementException:
-                    pass
-            
-            if category_keywords:
-                print(f"업태: {category_keywords}")
-            
-                category_dict = {
-                    "상호명": shop_name,
-                    "대분류": re.search(r"대분류\s*:\s*(.*?)(?=\s*중분류|$)", category_keywords),
-                    "중분류": re.search(r"중분류\s*:\s*(.*?)(?=\s*소분류|$)", category_keywords),
-                    "소분류": re.search(r"소분류\s*:\s*(.*?)(?=\s*세분류|$)", category_keywords),
-                    "세분류": re.search(r"세분류\s*:\s*(.*?)(?=\s*세세분류|$)", category_keywords),
-                    "세세분류": re.search(r"세세분류\s*:\s*(.*)", category_keywords)
-                }
-
-                for key in category_dict:
-                    if isinstance(category_dict[key], re.Match):
-                        category_dict[key] = category_dict[key].group(1).strip()
-                    
-                    elif category_dict[key] is not None:
-                        category_dict[key] = category_dict[key].strip()
-                
+        for business_number, category_dict in zip(business_numbers, lookups):
+            if category_dict:
                 category_keywords_dict[business_number] = category_dict
             else:
-                print(f"사업자 번호 {business_number}에 대한 정보를 찾을 수 없습니다.")
+                logs.event(logging.INFO, "bizno_not_found", business_number=business_number)
 
         return category_keywords_dict
 
-    async def save_image_locally(self, image, original_image_path):
-        """이미지 로컬 저장"""
-        # 원본 파일의 확장자 추출
-        _, file_extension = os.path.splitext(original_image_path)
-        
-        # 경로를 C:\Users\Yeon Je Chan\Desktop\shcrm로 설정
-        save_path = os.path.join(r'C:\Users\Yeon Je Chan\Desktop\shcrm', str(uuid.uuid4()) + file_extension)
-
-        # 디렉토리가 존재하지 않으면 생성
-        if not os.path.exists(r'C:\Users\Yeon Je Chan\Desktop\shcrm'):
-            os.makedirs(r'C:\Users\Yeon Je Chan\Desktop\shcrm')
-
-        # 이미지 저장
-        image.save(save_path)
+    async def lookup_category_keywords(self, business_number):
+        # 같은 사업자번호는 캐시된 조회 결과 사용
+        if self.lookup_cache is not None:
+            return await self.lookup_cache.get_or_fetch(business_number, self.fetch_category_keywords)
+        return await self.fetch_category_keywords(business_number.replace("-", ""))
 
-        # URL 생성
-        file_url = f"http://shcrm.ddns.net:8080/file/{os.path.basename(save_path)}"
-        return file_url
+    async def fetch_category_keywords(self, business_number_clean):
+        """사업자번호 하나의 상호명/업종 조회 (정보가 없으면 None)"""
+        with metrics.stage_timer("bizno_lookup"):
+            return await self.lookup_backend.lookup(business_number_clean)
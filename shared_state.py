@@ -0,0 +1,132 @@
+import errno
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# 여러 워커 프로세스가 함께 쓰는 상태 (환경 변수로 조정)
+# 잠금 파일과 공유 저장소(SQLite)를 두는 디렉터리
+SHARED_STATE_DIR = os.environ.get("SHARED_STATE_DIR", "shared")
+# 1이면 결과 캐시/작업 상태를 공유 저장소에도 기록 (serve.py는 기본으로 켬)
+SHARED_CACHE = os.environ.get("SHARED_CACHE", "0") == "1"
+SHARED_STORE_FILE = "state.sqlite3"
+SHARED_BUSY_TIMEOUT = float(os.environ.get("SHARED_BUSY_TIMEOUT", "10"))
+
+
+class LockBusy(Exception):
+    """다른 프로세스가 잠금을 잡고 있는 경우 (blocking=False일 때)"""
+
+
+@contextmanager
+def file_lock(path, blocking=True):
+    """fcntl 파일 잠금 (같은 파일을 쓰는 프로세스끼리 배타적, 프로세스가 죽으면 자동 해제)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EACCES):
+                raise LockBusy(path)
+            raise
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def lock_path(name, directory=None):
+    return os.path.join(directory or SHARED_STATE_DIR, f"{name}.lock")
+
+
+def connect_shared_sqlite(path, timeout=SHARED_BUSY_TIMEOUT):
+    """여러 프로세스가 동시에 읽고 쓰는 SQLite 연결 (WAL, 잠금 대기)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SharedStore:
+    """네임스페이스별 key -> JSON 값을 저장하는 로컬 디스크 저장소 (워커 프로세스 간 공유)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(SHARED_STATE_DIR, SHARED_STORE_FILE)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # fork 전에 연 연결은 자식 프로세스에서 쓰지 않고 새로 엶
+        if self._conn is None or self._pid != os.getpid():
+            conn = connect_shared_sqlite(self.path)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared_state ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, namespace, key, max_age=None):
+        """저장된 값 (없거나 max_age초보다 오래되었으면 None)"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, updated_at FROM shared_state WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, payload, time.time())
+            )
+            conn.commit()
+
+    def items(self, namespace, max_age=None):
+        """네임스페이스의 (key, 값) 목록 (max_age초보다 오래된 항목 제외)"""
+        since = time.time() - max_age if max_age is not None else 0
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key, value FROM shared_state WHERE namespace = ? AND updated_at >= ?", (namespace, since)
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def delete(self, namespace, key):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM shared_state WHERE namespace = ? AND key = ?", (namespace, key))
+            conn.commit()
+
+    def prune(self, namespace, max_age):
+        """max_age초보다 오래된 항목 삭제 (삭제한 개수 반환)"""
+        with self._lock:
+            conn = self._connection()
+            deleted = conn.execute(
+                "DELETE FROM shared_state WHERE namespace = ? AND updated_at < ?", (namespace, time.time() - max_age)
+            ).rowcount
+            conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def shared_store():
+    """SHARED_CACHE=1이면 공유 저장소, 아니면 None (단일 프로세스는 메모리만 사용)"""
+    return SharedStore() if SHARED_CACHE else None
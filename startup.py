@@ -0,0 +1,126 @@
+import asyncio
+import importlib
+import logging
+import os
+import sys
+import time
+
+# 시작/준비 상태 설정 (환경 변수로 조정)
+# 0이면 예전처럼 startup에서 OCR Reader, ChromeDriver, 모델 로드가 끝날 때까지 기다림
+STARTUP_BACKGROUND_WARMUP = os.environ.get("STARTUP_BACKGROUND_WARMUP", "1") == "1"
+# /readyz가 200을 반환하려면 준비되어야 하는 구성 요소
+READY_REQUIRED_COMPONENTS = [
+    name.strip() for name in os.environ.get("READY_REQUIRED_COMPONENTS", "ocr,lookup,database").split(",") if name.strip()
+]
+READY_DB_TIMEOUT = float(os.environ.get("READY_DB_TIMEOUT", "2"))
+
+# main이 이 모듈을 가장 먼저 import하므로 앱 모듈 import 시간의 기준점으로 사용
+PROCESS_STARTED = time.perf_counter()
+
+PENDING, STARTING, READY, FAILED, DISABLED = "pending", "starting", "ready", "failed", "disabled"
+
+# 무거운 라이브러리별 첫 import 시간 (초)
+import_times = {}
+
+
+def timed_import(name):
+    """모듈을 처음 쓸 때 import하고 걸린 시간을 기록 (이미 로드되어 있으면 그대로 반환)"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    import_times[name] = round(time.perf_counter() - started, 3)
+    logging.info(f"{name} import 완료 ({import_times[name]}초)")
+    return module
+
+
+class Component:
+    """구성 요소 하나의 준비 상태"""
+
+    def __init__(self, name, state=PENDING):
+        self.name = name
+        self.state = state
+        self.error = None
+        self.seconds = None
+        self.started = None
+
+    def to_dict(self):
+        return {"state": self.state, "error": self.error, "seconds": self.seconds}
+
+
+class Readiness:
+    """구성 요소별 준비 상태와 백그라운드 준비 작업"""
+
+    def __init__(self, required=READY_REQUIRED_COMPONENTS, background=STARTUP_BACKGROUND_WARMUP):
+        self.required = list(required)
+        self.background = background
+        self.components = {}
+        self._tasks = set()
+        self.app_import_seconds = None
+        self.started_at = None
+
+    def component(self, name):
+        if name not in self.components:
+            self.components[name] = Component(name)
+        return self.components[name]
+
+    def set(self, name, state, error=None):
+        component = self.component(name)
+        component.state = state
+        component.error = error
+        return component
+
+    def is_ready(self, name):
+        return name in self.components and self.components[name].state == READY
+
+    def mark_app_imported(self):
+        """startup 시작 시점에 호출 (모듈 import에 걸린 시간 기록)"""
+        self.started_at = time.time()
+        self.app_import_seconds = round(time.perf_counter() - PROCESS_STARTED, 3)
+
+    async def _warm(self, name, func):
+        component = self.set(name, STARTING)
+        component.started = time.perf_counter()
+        try:
+            await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"{name} 준비 중 오류 발생: {str(e)}")
+            self.set(name, FAILED, str(e))
+        else:
+            self.set(name, READY)
+        finally:
+            component.seconds = round(time.perf_counter() - component.started, 3)
+
+    async def warm(self, name, func):
+        """func()를 실행해 구성 요소를 준비 (백그라운드 모드면 기다리지 않고 바로 반환)"""
+        if not self.background:
+            await self._warm(name, func)
+            return
+        self.set(name, PENDING)
+        task = asyncio.create_task(self._warm(name, func))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def report(self):
+        missing = [name for name in self.required if not self.is_ready(name)]
+        return {
+            "ready": not missing,
+            # serve.py 멀티 워커에서 어느 워커가 응답했는지 구분
+            "pid": os.getpid(),
+            "waiting_for": missing,
+            "components": {name: component.to_dict() for name, component in self.components.items()},
+            "imports": {
+                "app_import_seconds": self.app_import_seconds,
+                "lazy_imports": dict(import_times),
+            },
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at else None,
+        }
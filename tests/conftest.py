@@ -0,0 +1,31 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# 모듈이 저장소 최상위에 있으므로 tests/에서 바로 import할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import shared_state
+
+
+@pytest.fixture
+def insert_usage(tmp_path, monkeypatch):
+    """사용금액 테이블만 있는 SQLite DB로 database 엔진을 바꾸고, 행을 넣는 함수를 돌려줌"""
+    path = tmp_path / "usage.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE 사용금액 (id INTEGER PRIMARY KEY, date TEXT, category TEXT, payment_method TEXT, amount REAL)"
+        )
+    monkeypatch.setattr(database, "DB_URL", f"sqlite:///{path}")
+    monkeypatch.setattr(shared_state, "SHARED_STATE_DIR", str(tmp_path / "shared"))
+    database.dispose()
+
+    def insert(*rows):
+        with sqlite3.connect(path) as conn:
+            conn.executemany("INSERT INTO 사용금액 (date, category, payment_method, amount) VALUES (?, ?, ?, ?)", rows)
+
+    yield insert
+    database.dispose()
@@ -0,0 +1,69 @@
+import asyncio
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import main
+from service import ImageProcessor
+
+
+class FakePreprocessor:
+    def process(self, data):
+        if data == b"broken":
+            return None, {}
+        return np.full((20 + len(data), 30), 255, dtype=np.uint8), {}
+
+
+class FakeArchiver:
+    def archive(self, data, filename):
+        return f"/files/{filename}"
+
+
+class FakeOCRPool:
+    """Reader 수(size)만큼 동시에 readtext_batched를 받는 풀"""
+
+    def __init__(self, size):
+        self.size = size
+        self.running = 0
+        self.max_running = 0
+        self.batches = []
+
+    async def readtext_batched(self, images, batch_size=1):
+        assert len({image.shape for image in images}) == 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.batches.append(len(images))
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return [[] for _ in images]
+
+
+def test_batch_chunks_run_concurrently_across_pool():
+    pool = FakeOCRPool(size=2)
+    reads = []
+
+    async def read(name):
+        reads.append(name)
+        return b"broken" if name == "f3" else name.encode()
+
+    async def scenario():
+        processor = ImageProcessor(None, pool, preprocessor=FakePreprocessor(), archiver=FakeArchiver())
+        names = [f"f{i}" for i in range(7)]
+        return await processor.process_images([(name, name) for name in names], batch_size=2, read=read)
+
+    outputs = asyncio.run(scenario())
+    assert pool.max_running == 2
+    assert sorted(pool.batches) == [1, 1, 2, 2]
+    assert sorted(reads) == [f"f{i}" for i in range(7)]
+    assert isinstance(outputs[3], Exception)
+    assert [output[1] for i, output in enumerate(outputs) if i != 3] == [f"/files/f{i}" for i in range(7) if i != 3]
+
+
+def test_batch_endpoint_rejects_too_many_files_and_large_batch_size():
+    client = TestClient(main.app)
+    files = [("files", (f"{i}.png", b"x", "image/png")) for i in range(main.MAX_BATCH_FILES + 1)]
+    assert client.post("/extract/batch", files=files).status_code == 413
+
+    response = client.post(f"/extract/batch?batch_size={main.MAX_BATCH_SIZE + 1}", files=files[:1])
+    assert response.status_code == 422
+    assert client.post("/extract/batch?batch_size=0", files=files[:1]).status_code == 422
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bizno_lookup import HttpLookupBackend
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "bizno_article.html")
+NUMBER = "1248100998"
+
+
+@pytest.fixture
+def bizno_server():
+    """저장해 둔 bizno.net 페이지를 /article/<사업자번호>로 돌려주는 로컬 서버"""
+    with open(FIXTURE_PATH, "rb") as f:
+        page = f.read()
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            requests.append(self.path)
+            found = self.path == f"/article/{NUMBER}"
+            body = page if found else b"<html><body>not found</body></html>"
+            self.send_response(200 if found else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}/article/", requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_backend_parses_saved_page(bizno_server):
+    base_url, requests = bizno_server
+
+    async def scenario():
+        backend = HttpLookupBackend(base_url=base_url, retries=0)
+        try:
+            return await backend.lookup(NUMBER), await backend.lookup("2208162510")
+        finally:
+            await backend.close()
+
+    found, missing = asyncio.run(scenario())
+    assert found == {
+        "상호명": "(주)테스트상사",
+        "대분류": "도매 및 소매업",
+        "중분류": "소매업; 자동차 제외",
+        "소분류": "음·식료품 및 담배 소매업",
+        "세분류": "기타 음·식료품 위주 종합 소매업",
+        "세세분류": "편의점",
+    }
+    assert missing is None
+    assert requests == [f"/article/{NUMBER}", "/article/2208162510"]
@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+from browser_pool import WebDriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_close_waits_for_background_recycle_before_quitting():
+    created = []
+
+    def create_driver():
+        # 첫 브라우저 이후의 재시작은 close()가 불릴 때까지 끝나지 않도록 느리게
+        if created:
+            time.sleep(0.3)
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    async def scenario():
+        pool = WebDriverPool(size=1, max_pages=1)
+        pool._create_driver = create_driver
+        await pool.start()
+        await pool.run(lambda driver: None)  # max_pages에 닿아 반납 시 백그라운드 재시작
+        assert len(pool._background) == 1
+        await asyncio.sleep(0.05)
+        await pool.close()
+        return pool
+
+    pool = asyncio.run(scenario())
+    assert not pool._background
+    assert len(created) == 2
+    assert all(driver.quit_called for driver in created)
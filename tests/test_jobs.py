@@ -0,0 +1,171 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from bizno_cache import BiznoLookupCache
+from jobs import JobQueue, JobQueueFull
+from result_cache import ReceiptResultCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def wait_until(condition, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("조건을 기다리다 시간 초과")
+
+
+def test_cancelled_job_does_not_cancel_coalesced_extract():
+    async def scenario():
+        cache = ReceiptResultCache(phash_distance=0)
+        queue = JobQueue(workers=1)
+        queue.start()
+        started, release = asyncio.Event(), asyncio.Event()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            started.set()
+            await release.wait()
+            return {"상호명": "테스트"}
+
+        async def handler(job):
+            result, _ = await cache.get_or_compute(b"receipt", compute)
+            return result
+
+        job = await queue.submit(handler)
+        await started.wait()
+        # 작업이 계산 중인 같은 이미지로 /extract 요청이 들어와서 결과를 기다리는 중
+        extract = asyncio.create_task(cache.get_or_compute(b"receipt", compute))
+        await wait_until(lambda: cache.counters["coalesced"] == 1)
+
+        await queue.cancel(job.id)
+        await wait_until(lambda: job.finished)
+        release.set()
+
+        result, duplicate = await asyncio.wait_for(extract, 2)
+        await queue.stop()
+        return job, result, duplicate, calls, cache
+
+    job, result, duplicate, calls, cache = run(scenario())
+    assert job.status == "cancelled"
+    assert job.handler is None
+    assert result == {"상호명": "테스트"} and duplicate
+    assert len(calls) == 1
+    # 취소된 쪽이 시작한 계산 결과도 캐시에 남음
+    assert cache.stats()["entries"] == 1 and cache.stats()["inflight"] == 0
+
+
+def test_cancelled_lookup_does_not_cancel_coalesced_lookup(tmp_path):
+    async def scenario():
+        cache = BiznoLookupCache(path=str(tmp_path / "bizno.sqlite3"))
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def fetch(number):
+            started.set()
+            await release.wait()
+            return {"업종": "소매업"}
+
+        owner = asyncio.create_task(cache.get_or_fetch("123-45-67891", fetch))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_fetch("1234567891", fetch))
+        await wait_until(lambda: cache.counters["coalesced"] == 1)
+
+        owner.cancel()
+        release.set()
+        value = await asyncio.wait_for(waiter, 2)
+        cache.close()
+        return owner, value
+
+    owner, value = run(scenario())
+    assert owner.cancelled()
+    assert value == {"업종": "소매업"}
+
+
+class ThreadRecordingStore:
+    """호출된 스레드를 기록하는 공유 저장소 대역"""
+
+    def __init__(self):
+        self.data = {}
+        self.threads = set()
+
+    def get(self, namespace, key, max_age=None):
+        self.threads.add(threading.current_thread())
+        return self.data.get((namespace, key))
+
+    def set(self, namespace, key, value):
+        self.threads.add(threading.current_thread())
+        self.data[(namespace, key)] = value
+
+    def prune(self, namespace, max_age):
+        self.threads.add(threading.current_thread())
+
+
+def test_job_store_is_used_off_the_event_loop():
+    store = ThreadRecordingStore()
+
+    async def scenario():
+        queue = JobQueue(workers=1, store=store)
+        queue.start()
+
+        async def handler(job):
+            return {"상호명": "테스트"}
+
+        job = await queue.submit(handler)
+        await wait_until(lambda: job.finished)
+        await wait_until(lambda: store.data[("job", job.id)]["status"] == "done")
+        queue.jobs.clear()  # 다른 워커가 받은 작업처럼 공유 저장소에서 조회
+        shared = await queue.lookup(job.id)
+        await queue.stop()
+        return shared
+
+    shared = run(scenario())
+    assert shared["status"] == "done" and shared["result"] == {"상호명": "테스트"}
+    assert store.threads and threading.main_thread() not in store.threads
+
+
+def test_cancelled_queued_job_frees_queue_slot():
+    async def scenario():
+        queue = JobQueue(workers=1, max_queue=1, store=None)
+        queue.start()
+        release = asyncio.Event()
+
+        async def blocking(job):
+            await release.wait()
+            return {}
+
+        async def quick(job):
+            return {"상호명": "테스트"}
+
+        running = await queue.submit(blocking)
+        await wait_until(lambda: running.status == "running")
+        queued = await queue.submit(quick)
+        with pytest.raises(JobQueueFull):
+            await queue.submit(quick)
+
+        await queue.cancel(queued.id)
+        assert queue.stats()["queue_depth"] == 0
+        accepted = await queue.submit(quick)
+        release.set()
+        await wait_until(lambda: accepted.finished)
+        await queue.stop()
+        return queued, accepted
+
+    queued, accepted = run(scenario())
+    assert queued.status == "cancelled"
+    assert accepted.status == "done" and accepted.result == {"상호명": "테스트"}
+
+
+def test_submit_rejects_non_http_webhook_url():
+    client = TestClient(main.app)
+    files = {"file": ("receipt.png", b"x", "image/png")}
+    for url in ("file:///etc/passwd", "ftp://example.com/hook", "javascript:alert(1)", "http://"):
+        response = client.post("/extract/jobs", params={"webhook_url": url}, files=files)
+        assert response.status_code == 400, url
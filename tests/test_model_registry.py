@@ -0,0 +1,90 @@
+import asyncio
+from datetime import date
+
+import predict
+import training
+from model_registry import ModelRegistry
+
+CATEGORIES = ["식비", "교통비", "소모품비"]
+
+
+def seed_months(insert_usage, months):
+    insert_usage(*(
+        (f"{month}-15", category, "법인카드", 10000 * (index + 1) + 500 * offset)
+        for offset, month in enumerate(months)
+        for index, category in enumerate(CATEGORIES)
+    ))
+
+
+def test_data_change_keeps_model_and_promotion_reloads(insert_usage, tmp_path, monkeypatch):
+    artifact_dir = str(tmp_path / "models")
+    seed_months(insert_usage, [f"{year}-{month:02d}" for year in (2024, 2025) for month in range(1, 13)])
+    first = training.run_training_job(artifact_dir, engine="ridge")["version"]
+
+    loads = []
+    load_artifact = training.load_artifact
+
+    def counting_load_artifact(version, artifact_dir=training.MODEL_ARTIFACT_DIR):
+        loads.append(version)
+        return load_artifact(version, artifact_dir)
+
+    monkeypatch.setattr(training, "load_artifact", counting_load_artifact)
+    registry = ModelRegistry(artifact_dir=artifact_dir, legacy_model_path=str(tmp_path / "missing.h5"))
+    state = registry.get_or_load()
+    assert loads == [first]
+
+    # 새 행만 들어오면 모델은 그대로 두고 피벗/스케일된 데이터만 다시 만듦
+    insert_usage(("2025-12-20", "식비", "현금", 70000))
+    refreshed = registry.refresh_if_stale()
+    assert loads == [first]
+    assert refreshed.model is state.model and refreshed.scaler is state.scaler
+    assert refreshed.version > state.version and refreshed.model_version == state.model_version
+    assert refreshed.df_pivot.loc["2025-12", "식비"] == state.df_pivot.loc["2025-12", "식비"] + 70000
+    assert registry.refresh_if_stale() is refreshed
+
+    # 다른 버전이 승격되면 모델을 다시 로드
+    second = training.run_training_job(artifact_dir, engine="ridge")["version"]
+    training.promote(second, artifact_dir)
+    reloaded = registry.refresh_if_stale()
+    assert loads[-1] == second
+    assert reloaded.artifact_version == second and reloaded.model_version > refreshed.model_version
+
+
+def test_scaler_is_fit_on_training_months_only(insert_usage, tmp_path):
+    artifact_dir = str(tmp_path / "models")
+    seed_months(insert_usage, [f"{year}-{month:02d}" for year in (2024, 2025) for month in range(1, 13)])
+    # 검증 구간(마지막 2개월)에만 있는 큰 값은 스케일 범위에 들어가면 안 됨
+    insert_usage(("2025-12-20", "식비", "현금", 900000))
+    version = training.run_training_job(artifact_dir, holdout_months=2, engine="ridge")["version"]
+
+    _, scaler, categories = training.load_artifact(version, artifact_dir)
+    assert scaler.data_max_[categories.index("식비")] == 10000 + 500 * 21
+
+
+def test_forecast_reuses_tenant_scaler_until_data_changes(insert_usage, tmp_path, monkeypatch):
+    artifact_dir = str(tmp_path / "models")
+    seed_months(insert_usage, [f"{year}-{month:02d}" for year in (2024, 2025) for month in range(1, 13)])
+    training.run_training_job(artifact_dir, engine="ridge")
+    registry = ModelRegistry(artifact_dir=artifact_dir, legacy_model_path=str(tmp_path / "missing.h5"))
+
+    loads = []
+    load_monthly_pivot = predict.load_monthly_pivot
+
+    def counting_load_monthly_pivot(*args, **kwargs):
+        if kwargs.get("through_month") is not None:  # 예측용 부서별 피벗만 셈
+            loads.append(kwargs["through_month"])
+        return load_monthly_pivot(*args, **kwargs)
+
+    monkeypatch.setattr(predict, "load_monthly_pivot", counting_load_monthly_pivot)
+    as_of = date(2025, 12, 1)
+    first = asyncio.run(registry.forecast(horizon=1, as_of=as_of))
+    # 예측 결과 캐시에 없는 더 긴 기간도 같은 데이터면 스케일러를 다시 맞추지 않음
+    longer = asyncio.run(registry.forecast(horizon=3, as_of=as_of))
+    assert len(loads) == 1
+    assert longer[None]["예측_사용량"]["2026-01"] == first[None]["예측_사용량"]["2026-01"]
+
+    # 데이터가 바뀌어 상태가 새로 만들어지면 다시 맞춤
+    insert_usage(("2025-12-20", "식비", "현금", 70000))
+    registry.refresh_if_stale()
+    asyncio.run(registry.forecast(horizon=6, as_of=as_of))
+    assert len(loads) == 2
@@ -0,0 +1,60 @@
+import sqlite3
+from datetime import date
+
+import amount_of_use
+import database
+from monthly_aggregates import MonthlyAggregateStore
+
+
+def test_incremental_refresh_matches_full_scan(insert_usage):
+    store = MonthlyAggregateStore()
+    insert_usage(
+        ("2026-01-05", "식비", "법인카드", 12000),
+        ("2026-01-20", "교통비", "현금", 3500),
+        ("2026-02-02", "식비", "법인카드", 8000),
+        ("2026-02-10", "소모품비", "계좌이체", 45000),
+    )
+    assert store.refresh(today=date(2026, 2, 15)) == amount_of_use.get_monthly_data()
+
+    # 지난 달에 늦게 들어온 행, 이번 달 행, 처음 보는 계정과목
+    insert_usage(
+        ("2026-01-31", "식비", "현금", 7000),
+        ("2026-02-14", "교통비", "법인카드", 2500),
+        ("2026-02-14", "통신비", "계좌이체", 55000),
+    )
+    assert store.refresh(today=date(2026, 2, 15)) == amount_of_use.get_monthly_data()
+
+    # 월이 바뀌면 2월은 직전 지난 달이 되어 안전 구간으로 다시 계산됨
+    insert_usage(
+        ("2026-02-28", "식비", "법인카드", 9000),
+        ("2026-03-02", "교통비", "현금", 4000),
+    )
+    snapshot = store.refresh(today=date(2026, 3, 3))
+    assert snapshot == amount_of_use.get_monthly_data()
+    assert [month["month"] for month in snapshot["monthly_totals"]] == ["2026-01", "2026-02", "2026-03"]
+    assert snapshot["monthly_totals"][1]["total"] == 8000 + 45000 + 2500 + 55000 + 9000
+
+
+def test_refresh_picks_up_late_committed_and_future_rows(insert_usage):
+    store = MonthlyAggregateStore()
+    insert_usage(
+        ("2025-11-10", "식비", "법인카드", 10000),
+        ("2026-02-03", "교통비", "현금", 3000),
+        ("2026-03-01", "식비", "계좌이체", 6000),
+    )
+    # 다음 달 날짜로 미리 들어온 행
+    insert_usage(("2026-04-10", "통신비", "계좌이체", 55000))
+    assert store.refresh(today=date(2026, 3, 5)) == amount_of_use.get_monthly_data()
+
+    # 먼저 id를 받았지만 high-water mark보다 늦게 커밋된 지난 달 행 (id가 더 작음)
+    with sqlite3.connect(database.DB_URL.removeprefix("sqlite:///")) as conn:
+        conn.execute("DELETE FROM 사용금액 WHERE date = '2026-02-03'")
+        conn.execute("INSERT INTO 사용금액 (id, date, category, payment_method, amount) VALUES (2, '2026-02-03', '교통비', '현금', 4500)")
+    # 오래된 달에 새로 들어온 행
+    insert_usage(("2025-11-20", "식비", "현금", 2000))
+    assert store.refresh(today=date(2026, 3, 5)) == amount_of_use.get_monthly_data()
+
+    # 미래 달이 이번 달이 되어도 그대로 맞음
+    snapshot = store.refresh(today=date(2026, 4, 12))
+    assert snapshot == amount_of_use.get_monthly_data()
+    assert [month["month"] for month in snapshot["monthly_totals"]] == ["2025-11", "2026-02", "2026-03", "2026-04"]
@@ -0,0 +1,85 @@
+import asyncio
+import sqlite3
+
+import cv2
+import numpy as np
+
+from result_cache import ReceiptResultCache
+
+
+def encode(image):
+    return cv2.imencode(".png", image)[1].tobytes()
+
+
+def test_near_duplicate_reuses_fields_but_archives_new_upload():
+    image = np.tile(np.linspace(0, 255, 256, dtype=np.uint8), (256, 1))
+    original, similar = encode(image), encode(np.clip(image.astype(int) + 1, 0, 255).astype(np.uint8))
+    assert original != similar
+    archived = []
+
+    def archive(data):
+        archived.append(data)
+        return f"/files/{len(archived)}.png"
+
+    async def compute():
+        return {"사업자번호": ["123-45-67891"], "이미지_URL": archive(original)}
+
+    async def scenario():
+        cache = ReceiptResultCache(phash_distance=4)
+        first, _ = await cache.get_or_compute(original, compute, archive=lambda: archive(original))
+        second, duplicate = await cache.get_or_compute(similar, compute, archive=lambda: archive(similar))
+        return cache, first, second, duplicate
+
+    cache, first, second, duplicate = asyncio.run(scenario())
+    assert duplicate and cache.counters["near_hits"] == 1
+    assert second["사업자번호"] == first["사업자번호"]
+    assert first["이미지_URL"] == "/files/1.png"
+    assert second["이미지_URL"] == "/files/2.png"
+    assert archived == [original, similar]
+
+
+class FailingStore:
+    """잠겨서 읽기/쓰기가 모두 실패하는 공유 저장소"""
+
+    path = "locked.sqlite3"
+
+    def get(self, namespace, key, max_age=None):
+        raise sqlite3.OperationalError("database is locked")
+
+    def set(self, namespace, key, value):
+        raise sqlite3.OperationalError("database is locked")
+
+    def prune(self, namespace, max_age):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_store_failure_does_not_lose_computed_result():
+    async def compute():
+        return {"상호명": "테스트"}
+
+    async def scenario():
+        cache = ReceiptResultCache(store=FailingStore())
+        first = await cache.get_or_compute(b"receipt", compute)
+        second = await cache.get_or_compute(b"receipt", compute)
+        return cache, first, second
+
+    cache, first, second = asyncio.run(scenario())
+    assert first == ({"상호명": "테스트"}, False)
+    assert second == ({"상호명": "테스트"}, True)
+    assert cache.counters["store_errors"] == 2
+
+
+def test_disabled_cache_skips_shared_store():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"상호명": "테스트"}
+
+    async def scenario():
+        cache = ReceiptResultCache(max_entries=0, store=FailingStore())
+        return cache, [await cache.get_or_compute(b"receipt", compute) for _ in range(2)]
+
+    cache, results = asyncio.run(scenario())
+    assert cache.store is None
+    assert results == [({"상호명": "테스트"}, False)] * 2 and len(calls) == 2
@@ -0,0 +1,74 @@
+"""serve.py처럼 fork 전에 부모에서 로드한 easyocr Reader가 자식 프로세스에서도 같은 결과를 내는지 확인"""
+import asyncio
+import json
+import os
+import signal
+import time
+
+import pytest
+
+pytest.importorskip("easyocr")
+
+import cv2
+import numpy as np
+
+from ocr_pool import OCRReaderPool
+
+FORK_TIMEOUT = 300
+
+
+def text_image(text="12345"):
+    image = np.full((80, 320), 255, dtype=np.uint8)
+    cv2.putText(image, text, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.8, 0, 3)
+    return image
+
+
+def read_texts(pool, image):
+    async def run():
+        # 워커 시작과 같은 경로 (미리 로드한 Reader 확인 추론 포함)
+        await pool.start()
+        try:
+            return [text for _, text, _ in await pool.readtext(image)]
+        finally:
+            await pool.close()
+
+    return asyncio.run(run())
+
+
+def test_preloaded_reader_works_in_forked_child():
+    image = text_image()
+    pool = OCRReaderPool(size=1, languages=["en"], gpu=False)
+    pool.preload()
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.close(read_fd)
+            os.write(write_fd, json.dumps({"texts": read_texts(pool, image), "preloaded": pool.preloaded}).encode())
+            code = 0
+        finally:
+            os._exit(code)
+
+    os.close(write_fd)
+    deadline = time.monotonic() + FORK_TIMEOUT
+    status = None
+    while time.monotonic() < deadline:
+        finished, status = os.waitpid(pid, os.WNOHANG)
+        if finished:
+            break
+        time.sleep(0.1)
+    else:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        pytest.fail(f"fork한 프로세스에서 OCR이 {FORK_TIMEOUT}초 안에 끝나지 않았습니다.")
+    with os.fdopen(read_fd, "rb") as f:
+        output = f.read()
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    child = json.loads(output)
+    assert child["preloaded"] == 1
+    # fork 이후 부모에서 같은 Reader로 읽은 결과와 비교
+    assert child["texts"] == read_texts(pool, image)
+    assert "12345" in "".join(child["texts"])
@@ -0,0 +1,61 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+import main
+
+LIMIT = 2 * 1024 * 1024
+
+
+def make_client(calls):
+    app = FastAPI()
+    app.router.route_class = main.UploadRoute
+    app.add_middleware(main.UploadSizeLimit, limits={"/upload": LIMIT})
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        data = await main.read_upload(file)
+        return {"size": len(data), "rolled_to_disk": file.file._rolled}
+
+    return TestClient(app)
+
+
+def test_rejects_declared_oversize_body_before_handler():
+    calls = []
+    response = make_client(calls).post("/upload", files={"file": ("big.png", b"x" * (LIMIT + 1), "image/png")})
+    assert response.status_code == 413
+    assert calls == []
+
+
+def test_rejects_chunked_body_while_reading():
+    calls = []
+    boundary = "limit-test"
+    head = f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="big.png"\r\nContent-Type: image/png\r\n\r\n'
+
+    def body():
+        # Content-Length 없이 조각으로 보냄 (chunked)
+        yield head.encode()
+        for _ in range(LIMIT // 8192 + 2):
+            yield b"x" * 8192
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = make_client(calls).post(
+        "/upload", content=body(), headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    assert response.status_code == 413
+    assert calls == []
+
+
+def test_upload_below_limit_stays_in_memory():
+    calls = []
+    # starlette 기본값(1MB)이면 임시 파일로 옮겨지는 크기
+    size = 1536 * 1024
+    response = make_client(calls).post("/upload", files={"file": ("receipt.png", b"x" * size, "image/png")})
+    assert response.status_code == 200
+    assert response.json() == {"size": size, "rolled_to_disk": False}
+
+
+def test_spool_threshold_covers_max_upload():
+    assert main.UploadParser.spool_max_size >= main.MAX_UPLOAD_BYTES
+    # starlette 전역 설정은 그대로 둠
+    assert main.MultiPartParser.spool_max_size == 1024 * 1024
@@ -0,0 +1,354 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+
+import forecasting
+import predict
+import shared_state
+
+# 재학습 스케줄러 설정 (환경 변수로 조정)
+MODEL_ARTIFACT_DIR = os.environ.get("MODEL_ARTIFACT_DIR", "models")
+TRAIN_INTERVAL_SECONDS = float(os.environ.get("TRAIN_INTERVAL_SECONDS", str(7 * 24 * 3600)))
+TRAIN_CHECK_SECONDS = float(os.environ.get("TRAIN_CHECK_SECONDS", "3600"))
+TRAIN_MIN_NEW_MONTHS = int(os.environ.get("TRAIN_MIN_NEW_MONTHS", "1"))
+TRAIN_VALIDATION_MONTHS = int(os.environ.get("TRAIN_VALIDATION_MONTHS", "2"))
+# 승격되지 않은 버전은 최근 N개만 남기고 삭제
+TRAIN_KEEP_REJECTED = int(os.environ.get("TRAIN_KEEP_REJECTED", "5"))
+# 학습 프로세스가 이 시간 안에 끝나지 않으면 종료
+TRAIN_TIMEOUT_SECONDS = float(os.environ.get("TRAIN_TIMEOUT_SECONDS", str(6 * 3600)))
+
+LOOK_BACK = 12
+CURRENT_POINTER = "current.json"
+TRAINING_LOCK = ".training.lock"
+
+
+def current_pointer_path(artifact_dir=MODEL_ARTIFACT_DIR):
+    return os.path.join(artifact_dir, CURRENT_POINTER)
+
+
+def training_lock_path(artifact_dir=MODEL_ARTIFACT_DIR):
+    return os.path.join(artifact_dir, TRAINING_LOCK)
+
+
+def current_version(artifact_dir=MODEL_ARTIFACT_DIR):
+    """현재 서비스 중인 모델 버전 (없으면 None)"""
+    path = current_pointer_path(artifact_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["version"]
+
+
+def read_meta(version, artifact_dir=MODEL_ARTIFACT_DIR):
+    with open(os.path.join(artifact_dir, version, "meta.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def version_names(artifact_dir=MODEL_ARTIFACT_DIR):
+    """학습이 끝난 버전 이름 (오래된 순)"""
+    if not os.path.isdir(artifact_dir):
+        return []
+    # '.'으로 시작하는 이름은 작성 중인 임시 디렉터리와 잠금 파일
+    return [
+        version for version in sorted(os.listdir(artifact_dir))
+        if not version.startswith(".") and os.path.exists(os.path.join(artifact_dir, version, "meta.json"))
+    ]
+
+
+def list_versions(artifact_dir=MODEL_ARTIFACT_DIR):
+    """버전별 학습 기록 (오래된 순)"""
+    return [read_meta(version, artifact_dir) for version in version_names(artifact_dir)]
+
+
+def latest_version(artifact_dir=MODEL_ARTIFACT_DIR):
+    """승격 여부와 상관없이 가장 최근에 학습한 버전 (없으면 None)"""
+    versions = version_names(artifact_dir)
+    return versions[-1] if versions else None
+
+
+def prune_versions(artifact_dir=MODEL_ARTIFACT_DIR, keep_rejected=TRAIN_KEEP_REJECTED):
+    """승격되지 않은 버전 중 최근 keep_rejected개를 제외하고 삭제 (삭제한 버전 목록 반환)
+
+    현재 버전과 한 번이라도 승격된 버전은 되돌릴 수 있도록 남김
+    """
+    current = current_version(artifact_dir)
+    rejected = [
+        version for version in version_names(artifact_dir)
+        if version != current and not read_meta(version, artifact_dir).get("promoted")
+    ]
+    removed = rejected[:max(0, len(rejected) - keep_rejected)]
+    for version in removed:
+        shutil.rmtree(os.path.join(artifact_dir, version), ignore_errors=True)
+    return removed
+
+
+def _write_json(path, data):
+    # 임시 파일에 쓴 뒤 rename해서 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 함
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def promote(version, artifact_dir=MODEL_ARTIFACT_DIR):
+    _write_json(current_pointer_path(artifact_dir), {"version": version, "promoted_at": time.time()})
+
+
+def load_artifact(version, artifact_dir=MODEL_ARTIFACT_DIR):
+    """버전 디렉터리에서 모델, 스케일러, 계정과목 목록 로드"""
+    version_dir = os.path.join(artifact_dir, version)
+    model = forecasting.load_forecaster(version_dir)
+    with open(os.path.join(version_dir, "scaler.pkl"), "rb") as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(version_dir, "categories.json"), encoding="utf-8") as f:
+        categories = json.load(f)
+    return model, scaler, categories
+
+
+def scale_with(scaler, categories, df_pivot):
+    """저장된 스케일러/계정과목 순서에 맞춰 월별 피벗을 변환"""
+    df_aligned = df_pivot.reindex(columns=categories, fill_value=0)
+    return scaler.transform(df_aligned), df_aligned
+
+
+def validation_loss(model, scaler, categories, df_pivot, holdout_months):
+    """마지막 holdout_months개월을 한 달씩 예측했을 때의 MSE (원 단위, 검증할 수 없으면 None)"""
+    if holdout_months <= 0:
+        return None
+    scaled, df_aligned = scale_with(scaler, categories, df_pivot)
+    n = len(scaled)
+    if n - holdout_months < LOOK_BACK:
+        return None
+
+    windows = np.stack([scaled[t - LOOK_BACK:t] for t in range(n - holdout_months, n)])
+    predicted = scaler.inverse_transform(model.predict(windows, verbose=0))
+    actual = df_aligned.to_numpy()[n - holdout_months:]
+    return float(np.mean((predicted - actual) ** 2))
+
+
+def run_training_job(artifact_dir=MODEL_ARTIFACT_DIR, holdout_months=TRAIN_VALIDATION_MONTHS, engine=None, lock=True):
+    """별도 프로세스에서 실행되는 학습 작업: 새 버전을 만들고 더 나으면 승격
+
+    여러 워커 프로세스가 동시에 학습하거나 current.json을 덮어쓰지 않도록 파일 잠금 안에서 실행
+    (다른 프로세스가 학습 중이면 shared_state.LockBusy). 호출한 쪽이 이미 잠금을 잡았으면 lock=False
+    """
+    if not lock:
+        return _train_and_promote(artifact_dir, holdout_months, engine)
+    with shared_state.file_lock(training_lock_path(artifact_dir), blocking=False):
+        return _train_and_promote(artifact_dir, holdout_months, engine)
+
+
+def _train_and_promote(artifact_dir, holdout_months, engine):
+    started = time.time()
+    from sklearn.preprocessing import MinMaxScaler
+
+    df_pivot = predict.load_monthly_pivot()
+    categories = df_pivot.columns.tolist()
+
+    # 검증 구간의 값이 스케일 범위에 새어 들어가지 않도록 학습 구간으로만 스케일러를 맞춤
+    train_pivot = df_pivot.iloc[:-holdout_months] if holdout_months > 0 else df_pivot
+    if len(train_pivot) <= LOOK_BACK + 1:
+        raise ValueError(f"학습 데이터가 부족합니다 ({len(df_pivot)}개월)")
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    train_scaled = scaler.fit_transform(train_pivot)
+
+    version = datetime.now().strftime("%Y%m%d%H%M%S")
+    while os.path.exists(os.path.join(artifact_dir, version)):
+        version += "_1"
+    # 임시 디렉터리에 모두 쓴 뒤 rename해서 읽는 쪽이 반쯤 쓰인 버전을 보지 않도록 함
+    version_dir = os.path.join(artifact_dir, f".{version}.{os.getpid()}.tmp")
+    os.makedirs(version_dir, exist_ok=True)
+
+    # 검증 구간을 제외하고 학습 (엔진은 FORECAST_ENGINE 설정)
+    model = forecasting.create_forecaster(engine).fit(train_scaled)
+    model.save(version_dir)
+    with open(os.path.join(version_dir, "scaler.pkl"), "wb") as f:
+        pickle.dump(scaler, f)
+    _write_json(os.path.join(version_dir, "categories.json"), categories)
+
+    val_loss = validation_loss(model, scaler, categories, df_pivot, holdout_months)
+
+    # 현재 모델도 같은 검증 구간으로 평가
+    current = current_version(artifact_dir)
+    current_loss = None
+    if current is not None:
+        current_model, current_scaler, current_categories = load_artifact(current, artifact_dir)
+        if current_categories == categories:
+            current_loss = validation_loss(current_model, current_scaler, current_categories, df_pivot, holdout_months)
+
+    promoted = current is None or current_loss is None or (val_loss is not None and val_loss < current_loss)
+
+    meta = {
+        "version": version,
+        "engine": model.name,
+        "trained_at": started,
+        "duration_seconds": round(time.time() - started, 3),
+        "data_start": str(df_pivot.index[0]),
+        "data_end": str(df_pivot.index[-1]),
+        "months": len(df_pivot),
+        "holdout_months": holdout_months,
+        "categories": categories,
+        "val_loss": val_loss,
+        "previous_version": current,
+        "previous_val_loss": current_loss,
+        "promoted": promoted,
+    }
+    _write_json(os.path.join(version_dir, "meta.json"), meta)
+    os.rename(version_dir, os.path.join(artifact_dir, version))
+
+    if promoted:
+        promote(version, artifact_dir)
+    removed = prune_versions(artifact_dir)
+    if removed:
+        logging.info(f"승격되지 않은 모델 버전 {len(removed)}개 삭제: {', '.join(removed)}")
+    return meta
+
+
+def _training_process(sender, artifact_dir, holdout_months):
+    """학습 프로세스 진입점: 결과(또는 오류 메시지)를 파이프로 돌려줌"""
+    try:
+        sender.send((run_training_job(artifact_dir, holdout_months, None, False), None))
+    except Exception as e:
+        sender.send((None, str(e)))
+    finally:
+        sender.close()
+
+
+def _wait_training_process(receiver, process, timeout):
+    """학습 프로세스의 결과를 기다림 (timeout초가 지나면 프로세스를 종료)"""
+    try:
+        if not receiver.poll(timeout):
+            process.terminate()
+            process.join()
+            raise TimeoutError(f"학습이 {timeout:.0f}초 안에 끝나지 않아 종료했습니다.")
+        try:
+            meta, error = receiver.recv()
+        except EOFError:
+            process.join()
+            raise RuntimeError(f"학습 프로세스가 결과 없이 종료되었습니다 (exit code {process.exitcode}).") from None
+        process.join()
+    finally:
+        receiver.close()
+    if error is not None:
+        raise RuntimeError(error)
+    return meta
+
+
+def months_between(start_month, end_month):
+    """'YYYY-MM' 두 개 사이의 개월 수"""
+    start_year, start_mon = map(int, start_month[:7].split("-"))
+    end_year, end_mon = map(int, end_month[:7].split("-"))
+    return (end_year - start_year) * 12 + (end_mon - start_mon)
+
+
+class TrainingScheduler:
+    """주기적으로 또는 새 월 데이터가 쌓이면 별도 프로세스에서 재학습"""
+
+    def __init__(self, registry, artifact_dir=MODEL_ARTIFACT_DIR, interval_seconds=TRAIN_INTERVAL_SECONDS,
+                 check_seconds=TRAIN_CHECK_SECONDS, min_new_months=TRAIN_MIN_NEW_MONTHS,
+                 holdout_months=TRAIN_VALIDATION_MONTHS, timeout_seconds=TRAIN_TIMEOUT_SECONDS):
+        self.registry = registry
+        self.artifact_dir = artifact_dir
+        self.interval_seconds = interval_seconds
+        self.check_seconds = check_seconds
+        self.min_new_months = min_new_months
+        self.holdout_months = holdout_months
+        self.timeout_seconds = timeout_seconds
+        self._process = None
+        self._task = None
+        self._manual = None
+        self.running = False
+        self.last_result = None
+        self.last_error = None
+
+    def should_train(self):
+        # 승격되지 않은 시도도 기준으로 삼아야 검증에서 진 뒤 매 확인 주기마다 다시 학습하지 않음
+        version = latest_version(self.artifact_dir)
+        if version is None:
+            return True
+        meta = read_meta(version, self.artifact_dir)
+        if time.time() - meta["trained_at"] >= self.interval_seconds:
+            return True
+        _, last_date = predict.get_data_signature()
+        return months_between(meta["data_end"], last_date) >= self.min_new_months
+
+    async def run_once(self):
+        """학습 작업을 한 번 실행하고, 승격되면 레지스트리 갱신"""
+        if self.running:
+            return None
+        self.running = True
+        try:
+            with shared_state.file_lock(training_lock_path(self.artifact_dir), blocking=False):
+                # TensorFlow 상태를 물려받지 않도록 spawn으로 새 프로세스 생성 (stop()에서 종료할 수 있도록 핸들 보관)
+                context = multiprocessing.get_context("spawn")
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_training_process, args=(sender, self.artifact_dir, self.holdout_months))
+                process.start()
+                sender.close()
+                self._process = process
+                try:
+                    meta = await asyncio.to_thread(_wait_training_process, receiver, process, self.timeout_seconds)
+                finally:
+                    self._process = None
+            self.last_result, self.last_error = meta, None
+            logging.info(f"모델 학습 완료 (버전 {meta['version']}, 검증 손실 {meta['val_loss']}, 승격 {meta['promoted']})")
+            if meta["promoted"]:
+                await asyncio.to_thread(self.registry.refresh_if_stale)
+            return meta
+        except shared_state.LockBusy:
+            # 여러 워커로 실행 중이면 다른 워커가 학습하고, 이 워커는 승격된 버전을 주기적으로 다시 읽음
+            logging.info("다른 프로세스에서 모델을 학습 중이므로 건너뜁니다.")
+            return None
+        except Exception as e:
+            self.last_error = str(e)
+            logging.error(f"모델 학습 중 오류 발생: {str(e)}")
+            return None
+        finally:
+            self.running = False
+
+    def trigger(self):
+        """스케줄과 상관없이 바로 학습 시작 (이미 학습 중이면 False)"""
+        if self.running or (self._manual is not None and not self._manual.done()):
+            return False
+        self._manual = asyncio.create_task(self.run_once())
+        return True
+
+    async def _loop(self):
+        while True:
+            try:
+                if await asyncio.to_thread(self.should_train):
+                    await self.run_once()
+            except Exception as e:
+                logging.error(f"재학습 조건 확인 중 오류 발생: {str(e)}")
+            await asyncio.sleep(self.check_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        process = self._process
+        if process is not None and process.is_alive():
+            # 학습 프로세스는 서버가 종료된 뒤에도 남아 있으므로(고아 프로세스) 직접 종료하고 기다림
+            process.terminate()
+            await asyncio.to_thread(process.join, 5)
+
+    def status(self):
+        return {
+            "running": self.running,
+            "current_version": current_version(self.artifact_dir),
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "versions": list_versions(self.artifact_dir),
+        }
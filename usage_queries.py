@@ -0,0 +1,97 @@
+import os
+import re
+
+import numpy as np
+from sqlalchemy import text
+
+import database
+
+# 서버 측 커서로 한 번에 가져올 행 수
+STREAM_BATCH_ROWS = int(os.environ.get("STREAM_BATCH_ROWS", "10000"))
+# 부서/테넌트를 구분하는 열 이름 (비어 있으면 부서별 조회 불가)
+USAGE_TENANT_COLUMN = os.environ.get("USAGE_TENANT_COLUMN", "")
+if USAGE_TENANT_COLUMN and not re.fullmatch(r"\w+", USAGE_TENANT_COLUMN):
+    raise ValueError(f"USAGE_TENANT_COLUMN은 열 이름이어야 합니다: {USAGE_TENANT_COLUMN}")
+
+
+def month_expression(dialect_name=None):
+    """DB 종류에 맞는 'YYYY-MM' 변환식"""
+    if (dialect_name or database.dialect_name()) == "sqlite":
+        return "strftime('%Y-%m', date)"
+    return "DATE_FORMAT(date, '%Y-%m')"
+
+
+def date_range_condition(start=None, end=None):
+    """파라미터로 넘길 날짜 범위 조건 (end는 포함하지 않음)"""
+    conditions, params = [], {}
+    if start is not None:
+        conditions.append("date >= :start")
+        params["start"] = start
+    if end is not None:
+        conditions.append("date < :end")
+        params["end"] = end
+    return conditions, params
+
+
+def tenant_condition(tenant=None):
+    """부서/테넌트 조건 (tenant가 None이면 전체)"""
+    if tenant is None:
+        return [], {}
+    if not USAGE_TENANT_COLUMN:
+        raise ValueError("USAGE_TENANT_COLUMN이 설정되지 않아 부서별로 조회할 수 없습니다.")
+    return [f"{USAGE_TENANT_COLUMN} = :tenant"], {"tenant": tenant}
+
+
+def filters(start=None, end=None, tenant=None):
+    conditions, params = date_range_condition(start, end)
+    tenant_conditions, tenant_params = tenant_condition(tenant)
+    return conditions + tenant_conditions, {**params, **tenant_params}
+
+
+def stream_grouped(conn, key_column, where=None, params=None, by_month=True):
+    """(월, key)별 또는 key별 SUM(amount)를 SQL에서 계산하고 서버 측 커서로 나눠서 읽음"""
+    select_month = f"{month_expression(conn.dialect.name)} AS month, " if by_month else ""
+    group_month = "month, " if by_month else ""
+    conditions = ["date IS NOT NULL", f"{key_column} IS NOT NULL"] + list(where or [])
+    query = text(f"""
+        SELECT {select_month}{key_column} AS group_key, SUM(amount) AS amount
+        FROM 사용금액
+        WHERE {' AND '.join(conditions)}
+        GROUP BY {group_month}group_key
+    """)
+    result = conn.execution_options(stream_results=True, yield_per=STREAM_BATCH_ROWS).execute(query, params or {})
+    for partition in result.partitions():
+        yield partition
+
+
+def _collect(partitions, columns):
+    """스트리밍된 행들을 열 단위 NumPy 배열로 모음"""
+    chunks = [[] for _ in range(columns)]
+    for partition in partitions:
+        for index, values in enumerate(zip(*partition)):
+            chunks[index].append(np.asarray(values, dtype=float if index == columns - 1 else object))
+    return [
+        np.concatenate(parts) if parts else np.empty(0, dtype=float if index == columns - 1 else object)
+        for index, parts in enumerate(chunks)
+    ]
+
+
+def monthly_matrix(key_column, start=None, end=None, tenant=None):
+    """월 x key 합계 행렬 (월 목록, key 목록, 행렬)"""
+    conditions, params = filters(start, end, tenant)
+    with database.connect() as conn:
+        months, keys, amounts = _collect(stream_grouped(conn, key_column, conditions, params), 3)
+
+    month_labels, month_index = np.unique(months.astype(str), return_inverse=True)
+    key_labels, key_index = np.unique(keys.astype(str), return_inverse=True)
+    matrix = np.zeros((len(month_labels), len(key_labels)))
+    np.add.at(matrix, (month_index, key_index), amounts)
+    return month_labels.tolist(), key_labels.tolist(), matrix
+
+
+def totals_by(key_column, start=None, end=None, tenant=None):
+    """기간 내 key별 합계 (key 목록, 합계 배열)"""
+    conditions, params = filters(start, end, tenant)
+    with database.connect() as conn:
+        keys, amounts = _collect(stream_grouped(conn, key_column, conditions, params, by_month=False), 2)
+    return keys.astype(str).tolist(), amounts